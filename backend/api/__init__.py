@@ -4,6 +4,7 @@ from __future__ import annotations
 
 __all__ = [
     "DefaultPagination",
+    "KeysetPagination",
     "IsOwnerOrReadOnly",
     "AutoModelViewSet",
     "AppointmentViewSet",
@@ -20,6 +21,10 @@ def __getattr__(name: str):
     if name == "DefaultPagination":
         from api.pagination import DefaultPagination as attr
 
+        return attr
+    if name == "KeysetPagination":
+        from api.pagination import KeysetPagination as attr
+
         return attr
     if name == "IsOwnerOrReadOnly":
         from api.permissions import IsOwnerOrReadOnly as attr
@@ -0,0 +1,392 @@
+"""Free appointment slots from opening hours and existing bookings.
+
+For each business-day the engine subtracts the booked intervals from the
+day's opening windows and caches the remaining free intervals. Slots for a
+service are then cut from those intervals on a fixed grid, which is cheap
+enough to do per request, so one cached day serves every service and step.
+
+Bookings for a range are read with one query against the
+``(business, scheduled_for, ends_at)`` index. Appointments never run longer
+than :data:`appointments.models.MAX_LENGTH`, so the scan starts that far
+before the range instead of at the business's first booking and costs
+O(log n + k). Appointment writes retire the cached days they touch, and
+opening hour or time zone changes retire all of a business's days at once,
+when their transaction commits.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from functools import partial
+from time import time_ns
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from appointments.models import Appointment
+from business.models import BusinessProfile, OpeningHours
+from services.models import Service
+
+__all__ = [
+    "AvailabilityQuerySerializer",
+    "AvailabilitySerializer",
+    "LocalDaysSerializer",
+    "Slot",
+    "SlotConflict",
+    "find_slots",
+    "forget_appointments",
+    "free_intervals",
+]
+
+KEY_PREFIX = "availability"
+CACHE_TIMEOUT = 60 * 60 * 24
+MAX_RANGE_DAYS = 31
+
+Interval = tuple[int, int]
+
+
+class SlotConflict(APIException):
+    """The booking overlaps an appointment that still holds its slot."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("The requested time slot is no longer available.")
+    default_code = "slot_unavailable"
+
+
+@dataclass(frozen=True)
+class Slot:
+    start: datetime
+    end: datetime
+
+
+def _version_key(business_id: int, day: date | None = None) -> str:
+    scope = "all" if day is None else day.isoformat()
+    return f"{KEY_PREFIX}:ver:{business_id}:{scope}"
+
+
+def _fresh_version() -> int:
+    # Seeding from the clock keeps an evicted counter from restarting at a
+    # value that stale entries were stored under.
+    return time_ns() // 1_000_000
+
+
+def _bump_now(keys: Iterable[str]) -> None:
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _fresh_version(), timeout=None)
+
+
+def _bump(keys: Iterable[str], using: str | None = None) -> None:
+    # Bumping before commit would let a reader that still sees the old rows
+    # cache them under the new version for a whole CACHE_TIMEOUT.
+    transaction.on_commit(partial(_bump_now, list(keys)), using=using)
+
+
+def _day_keys(business_id: int, days: Sequence[date]) -> dict[date, str]:
+    """Return the cache key of each day under the current versions.
+
+    A key embeds the business-wide version (opening hours, time zone) and the
+    day's own version (bookings), so a write makes older entries unreachable
+    instead of deleting them. Versions are bumped once the write commits: a
+    reader that ran before then stored its result under the old version,
+    which nobody asks for again.
+    """
+
+    version_keys = [
+        _version_key(business_id),
+        *(_version_key(business_id, day) for day in days),
+    ]
+    versions = cache.get_many(version_keys)
+    for key in version_keys:
+        if key not in versions:
+            cache.add(key, _fresh_version(), timeout=None)
+            versions[key] = cache.get(key)
+    business_version = versions[version_keys[0]]
+    return {
+        day: (
+            f"{KEY_PREFIX}:{business_id}:{business_version}:{day.isoformat()}:"
+            f"{versions[_version_key(business_id, day)]}"
+        )
+        for day in days
+    }
+
+
+def _local_midnight(day: date, tzinfo) -> int:
+    return int(datetime.combine(day, time.min, tzinfo=tzinfo).timestamp())
+
+
+def _opening_windows(
+    day: date, hours: Sequence[tuple[time, time]], tzinfo
+) -> list[Interval]:
+    windows = sorted(
+        (
+            int(datetime.combine(day, opens_at, tzinfo=tzinfo).timestamp()),
+            int(datetime.combine(day, closes_at, tzinfo=tzinfo).timestamp()),
+        )
+        for opens_at, closes_at in hours
+    )
+    merged: list[list[int]] = []
+    for start, end in windows:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def _subtract(windows: Sequence[Interval], busy: Sequence[Interval]) -> list[Interval]:
+    """Return ``windows`` minus ``busy``; both sorted by start."""
+
+    free: list[Interval] = []
+    index = 0
+    for start, end in windows:
+        while index < len(busy) and busy[index][1] <= start:
+            index += 1
+        cursor = start
+        scan = index
+        while scan < len(busy) and busy[scan][0] < end:
+            busy_start, busy_end = busy[scan]
+            if busy_start > cursor:
+                free.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            scan += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
+
+
+def free_intervals(
+    business: BusinessProfile, days: Sequence[date]
+) -> dict[date, tuple[int, list[Interval]]]:
+    """Return ``{day: (local midnight, free intervals)}`` as epoch seconds.
+
+    Cached days cost one ``get_many``; the rest are computed together with one
+    query for opening hours and one for the bookings overlapping them.
+    """
+
+    keys = _day_keys(business.pk, days)
+    cached = cache.get_many(keys.values())
+    result = {day: cached[key] for day, key in keys.items() if key in cached}
+    missing = [day for day in days if day not in result]
+    if not missing:
+        return result
+
+    tzinfo = business.tzinfo
+    hours: dict[int, list[tuple[time, time]]] = {}
+    for weekday, opens_at, closes_at in OpeningHours.objects.filter(
+        business=business
+    ).values_list("weekday", "opens_at", "closes_at"):
+        hours.setdefault(weekday, []).append((opens_at, closes_at))
+
+    range_start = datetime.combine(min(missing), time.min, tzinfo=tzinfo)
+    range_end = datetime.combine(
+        max(missing) + timedelta(days=1), time.min, tzinfo=tzinfo
+    )
+    busy = [
+        (int(start.timestamp()), int(end.timestamp()))
+        for start, end in Appointment.objects.filter(business=business)
+        .holding_slots()
+        .overlapping(range_start, range_end)
+        .order_by("scheduled_for")
+        .values_list("scheduled_for", "ends_at")
+    ]
+
+    computed = {}
+    for day in missing:
+        windows = _opening_windows(day, hours.get(day.weekday(), ()), tzinfo)
+        computed[day] = (_local_midnight(day, tzinfo), _subtract(windows, busy))
+    cache.set_many({keys[day]: value for day, value in computed.items()}, CACHE_TIMEOUT)
+    result.update(computed)
+    return result
+
+
+def find_slots(
+    business: BusinessProfile,
+    service: Service,
+    days: Sequence[date],
+    *,
+    step_minutes: int = 15,
+    now: datetime | None = None,
+) -> dict[date, list[Slot]]:
+    """Return the free slots for ``service`` on each of ``days``.
+
+    Slots start on a ``step_minutes`` grid counted from local midnight, fit
+    entirely inside one free interval and do not start in the past.
+    """
+
+    tzinfo = business.tzinfo
+    duration = service.duration_minutes * 60
+    step = step_minutes * 60
+    earliest = int((now or timezone.now()).timestamp())
+    slots: dict[date, list[Slot]] = {}
+    for day, (midnight, intervals) in sorted(free_intervals(business, days).items()):
+        found = slots[day] = []
+        for start, end in intervals:
+            first = max(start, earliest)
+            cursor = midnight + -(-(first - midnight) // step) * step
+            while cursor + duration <= end:
+                found.append(
+                    Slot(
+                        datetime.fromtimestamp(cursor, tzinfo),
+                        datetime.fromtimestamp(cursor + duration, tzinfo),
+                    )
+                )
+                cursor += step
+    return slots
+
+
+def _touched_days(start: datetime, end: datetime) -> Iterable[date]:
+    # Local dates are within a day of UTC dates, so widening by one day on
+    # each side covers every business time zone without looking it up.
+    day = start.astimezone(UTC).date() - timedelta(days=1)
+    last = end.astimezone(UTC).date() + timedelta(days=1)
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def forget_appointments(
+    appointments: Iterable[Appointment], using: str | None = None
+) -> None:
+    """Retire the cached days the appointments occupied before and after a write.
+
+    The days are retired when the current transaction on ``using`` commits.
+    """
+
+    keys: set[str] = set()
+    for appointment in appointments:
+        for business_id, _service, start, end in (
+            getattr(appointment, "_loaded_span", None) or (None,) * 4,
+            appointment.span,
+        ):
+            if business_id is None or start is None or end is None:
+                continue
+            keys.update(
+                _version_key(business_id, day) for day in _touched_days(start, end)
+            )
+    if keys:
+        _bump(keys, using)
+
+
+def _on_appointment_change(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        forget_appointments([instance], using)
+
+
+def _on_schedule_change(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    business_id = instance.pk if sender is BusinessProfile else instance.business_id
+    _bump([_version_key(business_id)], using)
+
+
+def _connect_signals() -> None:
+    for name, signal in (("save", post_save), ("delete", post_delete)):
+        signal.connect(
+            _on_appointment_change,
+            sender=Appointment,
+            dispatch_uid=f"availability-{name}-appointment",
+        )
+        for model in (OpeningHours, BusinessProfile):
+            signal.connect(
+                _on_schedule_change,
+                sender=model,
+                dispatch_uid=f"availability-{name}-{model._meta.model_name}",
+            )
+
+
+_connect_signals()
+
+
+class LocalDaysSerializer(serializers.Serializer):
+    """Validate a range of local dates of ``context["business"]``.
+
+    Sets ``attrs["days"]`` to every date from ``date_from`` through
+    ``date_to``, a week from today by default.
+    """
+
+    max_range_days = MAX_RANGE_DAYS
+
+    date_from = serializers.DateField(
+        required=False, help_text="First local date; defaults to today."
+    )
+    date_to = serializers.DateField(
+        required=False,
+        help_text="Last local date (inclusive); defaults to a week.",
+    )
+
+    default_error_messages = {
+        "range_order": _("date_to must not be before date_from."),
+        "range_size": _("At most {days} days can be requested at once."),
+    }
+
+    def validate(self, attrs):
+        business = self.context["business"]
+        date_from = (
+            attrs.get("date_from") or timezone.now().astimezone(business.tzinfo).date()
+        )
+        date_to = attrs.get("date_to") or date_from + timedelta(days=6)
+        if date_to < date_from:
+            raise serializers.ValidationError(
+                {"date_to": [self.error_messages["range_order"]]}
+            )
+        if (date_to - date_from).days >= self.max_range_days:
+            message = str(self.error_messages["range_size"]).format(
+                days=self.max_range_days
+            )
+            raise serializers.ValidationError({"date_to": [message]})
+        attrs["days"] = [
+            date_from + timedelta(days=offset)
+            for offset in range((date_to - date_from).days + 1)
+        ]
+        return attrs
+
+
+class AvailabilityQuerySerializer(LocalDaysSerializer):
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.all())
+    step = serializers.IntegerField(
+        required=False,
+        default=15,
+        min_value=5,
+        max_value=240,
+        help_text="Minutes between candidate start times.",
+    )
+
+    default_error_messages = {
+        "foreign_service": _("The service is not offered by this business."),
+    }
+
+    def validate(self, attrs):
+        if attrs["service"].business_id != self.context["business"].pk:
+            raise serializers.ValidationError(
+                {"service": [self.error_messages["foreign_service"]]}
+            )
+        return super().validate(attrs)
+
+
+class SlotSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+
+class AvailabilityDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    slots = SlotSerializer(many=True)
+
+
+class AvailabilitySerializer(serializers.Serializer):
+    business = serializers.IntegerField()
+    service = serializers.IntegerField()
+    timezone = serializers.CharField()
+    duration_minutes = serializers.IntegerField()
+    step_minutes = serializers.IntegerField()
+    days = AvailabilityDaySerializer(many=True)
@@ -0,0 +1,298 @@
+"""Bulk create, update and delete actions for auto-configured viewsets."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from typing import Any, ClassVar
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models, router, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.openapi import AutoSchema
+from drf_spectacular.utils import inline_serializer
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from api.cache import bump_generation_on_commit
+from api.search import reindex
+from api.serializers import PrefetchedPrimaryKeyRelatedField
+
+__all__ = ["BulkAutoSchema", "BulkModelMixin"]
+
+BULK_ACTIONS = frozenset({"bulk_create", "bulk_update", "bulk_destroy"})
+
+
+@lru_cache(maxsize=None)
+def _bulk_update_serializer(serializer_class: type[serializers.Serializer]):
+    """Return ``serializer_class`` with a required primary key, for the schema."""
+
+    pk_name = serializer_class.Meta.model._meta.pk.name
+    name = serializer_class.__name__.replace("AutoSerializer", "BulkUpdateSerializer")
+    return type(
+        name, (serializer_class,), {pk_name: serializers.IntegerField(required=True)}
+    )
+
+
+class BulkAutoSchema(AutoSchema):
+    """Describe bulk actions as arrays of the view's serializer."""
+
+    def get_request_serializer(self):
+        view_action = getattr(self.view, "action", None)
+        if view_action == "bulk_create":
+            return self.view.get_serializer_class()(many=True)
+        if view_action == "bulk_update":
+            serializer_class = _bulk_update_serializer(self.view.get_serializer_class())
+            return serializer_class(many=True, partial=True)
+        if view_action == "bulk_destroy":
+            return inline_serializer(
+                name="BulkDestroyRequest",
+                fields={"ids": serializers.ListField(child=serializers.IntegerField())},
+            )
+        return super().get_request_serializer()
+
+    def get_response_serializers(self):
+        view_action = getattr(self.view, "action", None)
+        if view_action == "bulk_create":
+            return {
+                status.HTTP_201_CREATED: self.view.get_serializer_class()(many=True)
+            }
+        if view_action == "bulk_update":
+            return self.view.get_serializer_class()(many=True)
+        if view_action == "bulk_destroy":
+            return {status.HTTP_204_NO_CONTENT: None}
+        return super().get_response_serializers()
+
+    def _get_paginator(self):
+        if getattr(self.view, "action", None) in BULK_ACTIONS:
+            return None
+        return super()._get_paginator()
+
+
+class BulkModelMixin:
+    """Add ``POST``/``PATCH``/``DELETE`` on ``<prefix>/bulk/`` to a viewset.
+
+    Payloads are validated in one pass and written with ``bulk_create`` or
+    ``bulk_update`` inside a single transaction. Validation stops the whole
+    batch and reports errors keyed by the index of each failing item, the way
+    ``ListSerializer`` does. Foreign
+    keys are resolved with one ``in_bulk`` query per relation. Rows to update or
+    delete are looked up through ``get_queryset()``, so the view's scoping
+    applies. Rows written are checked against it again before commit, and
+    ``get_create_kwargs()`` is applied to created rows just like
+    ``perform_create``.
+
+    Bulk writes skip ``Model.save()`` and send no ``post_save`` signals. Views
+    override :meth:`prepare_bulk_instances` for fields ``save()`` derives and
+    extend :meth:`after_bulk_write`, which refreshes search documents and the
+    response cache. Deletes go through ``QuerySet.delete()``, which still
+    signals per row.
+    """
+
+    bulk_max_items: ClassVar[int] = 500
+    schema = BulkAutoSchema()
+
+    not_a_list_message = _("Expected a list of items.")
+    empty_message = _("At least one item is required.")
+    too_many_message = _("At most {limit} items are allowed per request.")
+    not_found_message = _("Not found.")
+    duplicate_message = _("Duplicate item.")
+    out_of_scope_message = _("You do not have permission to write this item.")
+
+    def _bulk_items(self, data: Any) -> list[Any]:
+        if not isinstance(data, list):
+            raise ValidationError({"non_field_errors": [self.not_a_list_message]})
+        if not data:
+            raise ValidationError({"non_field_errors": [self.empty_message]})
+        if len(data) > self.bulk_max_items:
+            message = str(self.too_many_message).format(limit=self.bulk_max_items)
+            raise ValidationError({"non_field_errors": [message]})
+        return data
+
+    def _pk_value(self, value: Any) -> Any:
+        """Return ``value`` converted to the model's pk type, or ``None``."""
+
+        if value in (None, "") or isinstance(value, bool):
+            return None
+        try:
+            return self.model._meta.pk.to_python(value)
+        except (TypeError, ValueError, DjangoValidationError):
+            return None
+
+    def _bulk_context(self, serializer_class, items: Sequence[Any]) -> dict[str, Any]:
+        """Return a serializer context with the payload's foreign keys prefetched."""
+
+        context = self.get_serializer_context()
+        related: dict[str, dict[Any, models.Model]] = {}
+        for name, field in serializer_class(context=context).fields.items():
+            if field.read_only or not isinstance(
+                field, PrefetchedPrimaryKeyRelatedField
+            ):
+                continue
+            related_pk = field.get_queryset().model._meta.pk
+            keys = set()
+            for item in items:
+                if not isinstance(item, Mapping) or item.get(name) in (None, ""):
+                    continue
+                try:
+                    keys.add(related_pk.to_python(item[name]))
+                except (TypeError, ValueError, DjangoValidationError):
+                    continue
+            related[name] = field.get_queryset().in_bulk(keys) if keys else {}
+        context["related_objects"] = related
+        return context
+
+    def _check_scope(self, instances: Sequence[models.Model]) -> None:
+        """Fail the batch if any written row falls outside ``get_queryset()``."""
+
+        visible = set(
+            self.get_queryset()
+            .filter(pk__in=[instance.pk for instance in instances])
+            .values_list("pk", flat=True)
+        )
+        errors = {
+            index: {"non_field_errors": [self.out_of_scope_message]}
+            for index, instance in enumerate(instances)
+            if instance.pk not in visible
+        }
+        if errors:
+            raise ValidationError(errors)
+
+    def prepare_bulk_instances(
+        self, instances: Sequence[models.Model]
+    ) -> Sequence[str]:
+        """Fill in derived fields ``save()`` would set; return their names.
+
+        Runs inside the write transaction, so it may also lock rows or raise
+        to abort the batch.
+        """
+
+        return ()
+
+    def after_bulk_write(self, instances: Sequence[models.Model], using: str) -> None:
+        """Do the work ``post_save`` receivers would have done for ``instances``."""
+
+        reindex(self.model, [instance.pk for instance in instances], using)
+        bump_generation_on_commit(self.model, using)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request: Request, *args, **kwargs):
+        """Create every item of a JSON list, or none of them."""
+
+        items = self._bulk_items(request.data)
+        serializer_class = self.get_serializer_class()
+        serializer = serializer_class(
+            data=items, many=True, context=self._bulk_context(serializer_class, items)
+        )
+        serializer.is_valid(raise_exception=True)
+
+        model = self.model
+        extra = self.get_create_kwargs()
+        using = router.db_for_write(model)
+        with transaction.atomic(using=using):
+            if model._meta.many_to_many:
+                instances = serializer.save(**extra)
+            else:
+                instances = [
+                    model(**{**data, **extra}) for data in serializer.validated_data
+                ]
+                self.prepare_bulk_instances(instances)
+                model._default_manager.db_manager(using).bulk_create(instances)
+            self._check_scope(instances)
+            self.after_bulk_write(instances, using)
+
+        data = self.get_serializer(instances, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request: Request, *args, **kwargs):
+        """Partially update the rows identified by each item's ``id``."""
+
+        items = self._bulk_items(request.data)
+        model = self.model
+        pk_name = model._meta.pk.name
+        keys = [
+            self._pk_value(item.get(pk_name)) if isinstance(item, Mapping) else None
+            for item in items
+        ]
+        found = self.get_queryset().in_bulk([key for key in keys if key is not None])
+
+        serializer_class = self.get_serializer_class()
+        context = self._bulk_context(serializer_class, items)
+        errors: dict[int, Any] = {}
+        changes: list[tuple[models.Model, dict[str, Any]]] = []
+        seen: set[Any] = set()
+        for index, (key, item) in enumerate(zip(keys, items)):
+            if key is None or key not in found:
+                errors[index] = {pk_name: [self.not_found_message]}
+                continue
+            if key in seen:
+                errors[index] = {pk_name: [self.duplicate_message]}
+                continue
+            seen.add(key)
+            serializer = serializer_class(
+                found[key], data=item, partial=True, context=context
+            )
+            if serializer.is_valid():
+                changes.append((found[key], serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+        if errors:
+            raise ValidationError(errors)
+
+        now = timezone.now()
+        auto_now = [
+            field
+            for field in model._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        ]
+        fields: set[str] = {field.name for field in auto_now}
+        for instance, data in changes:
+            for name, value in data.items():
+                setattr(instance, name, value)
+                fields.add(name)
+            for field in auto_now:
+                setattr(instance, field.attname, now)
+        instances = [instance for instance, _data in changes]
+
+        using = router.db_for_write(model)
+        with transaction.atomic(using=using):
+            fields.update(self.prepare_bulk_instances(instances))
+            model._default_manager.db_manager(using).bulk_update(instances, fields)
+            self._check_scope(instances)
+            self.after_bulk_write(instances, using)
+
+        return Response(self.get_serializer(instances, many=True).data)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request: Request, *args, **kwargs):
+        """Delete the rows listed in the ``{"ids": [...]}`` request body."""
+
+        data = request.data if isinstance(request.data, Mapping) else {}
+        try:
+            ids = self._bulk_items(data.get("ids"))
+        except ValidationError as exc:
+            raise ValidationError({"ids": exc.detail["non_field_errors"]})
+
+        keys = [self._pk_value(value) for value in ids]
+        found = set(
+            self.get_queryset()
+            .filter(pk__in=[key for key in keys if key is not None])
+            .values_list("pk", flat=True)
+        )
+        errors = {
+            index: [self.not_found_message]
+            for index, key in enumerate(keys)
+            if key not in found
+        }
+        if errors:
+            raise ValidationError({"ids": errors})
+
+        using = router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            self.model._default_manager.db_manager(using).filter(pk__in=found).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,196 @@
+"""Read-through response cache for list and detail endpoints.
+
+Responses are stored in Django's cache framework under a key that embeds the
+current *generation* of every model the response depends on. Saving or
+deleting a row bumps its model's generation with one ``incr``, which orphans
+all cached responses built from the old data without having to find them.
+Orphans simply expire. The bump waits for the write's transaction to commit:
+a reader in between still sees the old rows, and would otherwise cache them
+under the new generation. Writes that bypass model signals
+(``QuerySet.update``) must call :func:`bump_generation_on_commit` themselves.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections.abc import Iterable, Sequence
+from functools import partial
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+
+__all__ = [
+    "bump_generation",
+    "bump_generation_on_commit",
+    "cache_key",
+    "cache_stats",
+    "get_cached_response",
+    "record_lookup",
+    "register_cached_models",
+    "related_models",
+    "store_response",
+]
+
+KEY_PREFIX = "api:resp"
+STORED_HEADERS = ("ETag", "Last-Modified")
+_registered: set[type[models.Model]] = set()
+
+
+def _generation_key(model: type[models.Model]) -> str:
+    return f"{KEY_PREFIX}:gen:{model._meta.label_lower}"
+
+
+def _fresh_generation() -> int:
+    # Seeding from the clock keeps a generation that was evicted from the
+    # cache from restarting at a value older entries were stored under.
+    return time.time_ns() // 1_000_000
+
+
+def bump_generation(model: type[models.Model]) -> None:
+    """Invalidate every cached response that depends on ``model``."""
+
+    key = _generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _fresh_generation(), timeout=None)
+
+
+def bump_generation_on_commit(
+    model: type[models.Model], using: str | None = None
+) -> None:
+    """Bump ``model``'s generation once the current transaction commits."""
+
+    transaction.on_commit(partial(bump_generation, model), using=using)
+
+
+def _generations(dependencies: Sequence[type[models.Model]]) -> list[int]:
+    keys = [_generation_key(model) for model in dependencies]
+    current = cache.get_many(keys)
+    for key in keys:
+        if key not in current:
+            cache.add(key, _fresh_generation(), timeout=None)
+            current[key] = cache.get(key)
+    return [current[key] for key in keys]
+
+
+def related_models(
+    model: type[models.Model], paths: Iterable[str]
+) -> tuple[type[models.Model], ...]:
+    """Return the models reached by following ``__``-separated ``paths``."""
+
+    found: list[type[models.Model]] = []
+    for path in paths:
+        current = model
+        for name in path.split("__"):
+            try:
+                field = current._meta.get_field(name)
+            except FieldDoesNotExist:
+                break
+            if not field.is_relation or field.related_model is None:
+                break
+            current = field.related_model
+            found.append(current)
+    return tuple(dict.fromkeys(found))
+
+
+def register_cached_models(models_: Iterable[type[models.Model]]) -> None:
+    """Bump a model's generation whenever one of its rows is saved or deleted."""
+
+    for model in models_:
+        if model in _registered:
+            continue
+        _registered.add(model)
+
+        def on_change(sender, raw=False, using=None, **kwargs):
+            if not raw:
+                bump_generation_on_commit(sender, using)
+
+        uid = f"response-cache-{model._meta.label}"
+        post_save.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+
+
+def cache_key(
+    view_name: str,
+    scope: str,
+    dependencies: Sequence[type[models.Model]],
+    request,
+    lookup: Iterable[tuple[str, str]] = (),
+) -> str:
+    """Return the cache key for ``request`` against the current generations."""
+
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+    fingerprint = repr(
+        (
+            request.get_host(),
+            request.path,
+            getattr(request, "accepted_media_type", ""),
+            params,
+            sorted(lookup),
+            _generations(dependencies),
+        )
+    )
+    digest = hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+    return f"{KEY_PREFIX}:{view_name}:{scope}:{digest}"
+
+
+def get_cached_response(key: str) -> HttpResponse | None:
+    """Return the stored response for ``key``, if any."""
+
+    stored = cache.get(key)
+    if stored is None:
+        return None
+    content, content_type, headers = stored
+    response = HttpResponse(content, content_type=content_type)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def store_response(key: str, response, timeout: int) -> None:
+    """Render ``response`` and store its body and validators under ``key``."""
+
+    response.render()
+    headers = {
+        name: response[name] for name in STORED_HEADERS if response.has_header(name)
+    }
+    cache.set(key, (response.content, response["Content-Type"], headers), timeout)
+
+
+def _stats_key(view_name: str, outcome: str) -> str:
+    return f"{KEY_PREFIX}:stats:{view_name}:{outcome}"
+
+
+def record_lookup(view_name: str, hit: bool) -> None:
+    """Count a cache hit or miss for ``view_name``."""
+
+    key = _stats_key(view_name, "hit" if hit else "miss")
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def cache_stats(view_names: Iterable[str]) -> dict[str, dict[str, int]]:
+    """Return ``{"hits": n, "misses": n}`` for each of ``view_names``."""
+
+    names = list(view_names)
+    keys = [_stats_key(name, outcome) for name in names for outcome in ("hit", "miss")]
+    counts = cache.get_many(keys)
+    return {
+        name: {
+            "hits": counts.get(_stats_key(name, "hit"), 0),
+            "misses": counts.get(_stats_key(name, "miss"), 0),
+        }
+        for name in names
+    }
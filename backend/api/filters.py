@@ -3,12 +3,28 @@
 from __future__ import annotations
 
 from collections.abc import Iterable
+from datetime import datetime, time, timedelta
 from typing import Sequence
 
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from django.utils import timezone
+from django.utils.encoding import force_str
+from django.utils.translation import gettext_lazy as _
 from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
+from rest_framework import filters as drf_filters
+from rest_framework.exceptions import ValidationError
 
-__all__ = ["build_filterset_for_model"]
+from api.indexes import indexed_leading_fields
+
+__all__ = [
+    "DayFilter",
+    "IndexedOrderingFilter",
+    "build_filterset_for_model",
+    "indexed_ordering_fields",
+]
 
 
 def _resolve_filter_fields(model: type[models.Model], fields: Iterable[str] | None) -> Sequence[str]:
@@ -27,15 +43,137 @@ def _resolve_filter_fields(model: type[models.Model], fields: Iterable[str] | No
     return tuple(dict.fromkeys(resolved))
 
 
+class DayFilter(filters.DateFilter):
+    """Match datetimes falling on a calendar day of the current time zone.
+
+    Unlike the ``__date`` transform, the day becomes a half-open range on the
+    column itself, so an index on it still serves the lookup.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        tzinfo = timezone.get_current_timezone()
+        start = datetime.combine(value, time.min, tzinfo=tzinfo)
+        end = datetime.combine(value + timedelta(days=1), time.min, tzinfo=tzinfo)
+        if self.distinct:
+            qs = qs.distinct()
+        return self.get_method(qs)(
+            **{f"{self.field_name}__gte": start, f"{self.field_name}__lt": end}
+        )
+
+
+def _model_field(model: type[models.Model], path: str) -> models.Field | None:
+    field = None
+    for name in path.split(LOOKUP_SEP):
+        if field is not None:
+            if not field.is_relation:
+                return None
+            model = field.related_model
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+    return field
+
+
 def build_filterset_for_model(
     model: type[models.Model], *, fields: Iterable[str] | None = None
 ) -> type[filters.FilterSet]:
-    """Return a ``FilterSet`` subclass configured for the given model."""
+    """Return a ``FilterSet`` subclass configured for the given model.
+
+    Fields match exactly. Date and datetime fields also accept ``__gte`` and
+    ``__lt`` bounds, and datetime fields a ``__date`` day bucket, so ranges
+    such as a calendar week stay index range scans.
+    """
 
     resolved_fields = _resolve_filter_fields(model, fields)
 
-    meta_attrs: dict[str, object] = {"model": model, "fields": resolved_fields}
+    lookups: dict[str, list[str]] = {}
+    declared: dict[str, filters.Filter] = {}
+    for name in resolved_fields:
+        field = _model_field(model, name)
+        lookups[name] = ["exact"]
+        if isinstance(field, models.DateField):
+            lookups[name] += ["gte", "lt"]
+        if isinstance(field, models.DateTimeField):
+            declared[f"{name}{LOOKUP_SEP}date"] = DayFilter(field_name=name)
+
+    meta_attrs: dict[str, object] = {"model": model, "fields": lookups}
     meta = type("Meta", (), meta_attrs)
 
     filterset_name = f"{model.__name__}AutoFilterSet"
-    return type(filterset_name, (filters.FilterSet,), {"Meta": meta})
+    return type(filterset_name, (filters.FilterSet,), {"Meta": meta, **declared})
+
+
+def indexed_ordering_fields(model: type[models.Model]) -> tuple[str, ...]:
+    """Return the concrete fields of ``model`` whose ordering an index can serve.
+
+    Relations are excluded: ordering by a foreign key sorts by the related
+    model's ``Meta.ordering`` through a join, which the local index cannot serve.
+    """
+
+    leading = indexed_leading_fields(model)
+    return tuple(
+        field.name
+        for field in model._meta.concrete_fields
+        if field.name in leading and not field.is_relation
+    )
+
+
+class IndexedOrderingFilter(drf_filters.OrderingFilter):
+    """Ordering filter restricted to orderings the database can serve from an index.
+
+    The allowed fields default to those leading an index on the view's model.
+    Views may set ``ordering_fields`` to an explicit sequence to override the
+    derived set. Unknown or unindexed terms are rejected with a 400 response
+    instead of being dropped silently.
+    """
+
+    invalid_ordering_message = _(
+        "Unsupported ordering '{term}'. Allowed fields: {allowed}."
+    )
+
+    def get_valid_fields(self, queryset, view, context=None):  # type: ignore[override]
+        explicit = getattr(view, "ordering_fields", None)
+        if explicit is not None and explicit != "__all__":
+            return [(name, name) for name in explicit]
+
+        model = getattr(view, "model", None)
+        if model is None and queryset is not None:
+            model = queryset.model
+        if model is None:
+            return []
+        return [(name, name) for name in indexed_ordering_fields(model)]
+
+    def remove_invalid_fields(self, queryset, fields, view, request):  # type: ignore[override]
+        context = {"request": request}
+        valid_fields = [
+            name for name, _label in self.get_valid_fields(queryset, view, context)
+        ]
+        for term in fields:
+            if term.lstrip("-") not in valid_fields:
+                message = force_str(self.invalid_ordering_message).format(
+                    term=term, allowed=", ".join(valid_fields)
+                )
+                raise ValidationError({self.ordering_param: [message]})
+        return list(fields)
+
+    def get_schema_operation_parameters(self, view):  # type: ignore[override]
+        allowed = [name for name, _label in self.get_valid_fields(None, view)]
+        return [
+            {
+                "name": self.ordering_param,
+                "required": False,
+                "in": "query",
+                "description": force_str(self.ordering_description),
+                "schema": {
+                    "type": "array",
+                    "items": {
+                        "type": "string",
+                        "enum": [*allowed, *(f"-{name}" for name in allowed)],
+                    },
+                },
+                "explode": False,
+            },
+        ]
@@ -0,0 +1,147 @@
+"""Introspection helpers for the database indexes declared on models."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Sequence
+
+from django.db import models
+
+__all__ = [
+    "COVERED",
+    "MISSING",
+    "PARTIAL",
+    "declared_indexes",
+    "index_coverage",
+    "indexed_leading_fields",
+    "is_indexed_ordering",
+]
+
+COVERED = "covered"
+PARTIAL = "partial"
+MISSING = "missing"
+
+
+def _field_name(model: type[models.Model], name: str) -> str:
+    name = name.lstrip("-")
+    if name == "pk":
+        return model._meta.pk.name
+    return name
+
+
+def declared_indexes(model: type[models.Model]) -> tuple[tuple[str, ...], ...]:
+    """Return the column tuples of every plain B-tree index on ``model``.
+
+    Field names are returned without direction prefixes. Partial and
+    expression indexes are skipped because they cannot serve arbitrary
+    filters or orderings.
+    """
+
+    opts = model._meta
+    indexes: list[tuple[str, ...]] = []
+
+    for field in opts.concrete_fields:
+        if field.primary_key or field.unique or field.db_index:
+            indexes.append((field.name,))
+
+    for index in opts.indexes:
+        if getattr(index, "condition", None) is not None or not index.fields:
+            continue
+        indexes.append(tuple(_field_name(model, name) for name in index.fields))
+
+    for constraint in opts.constraints:
+        if not isinstance(constraint, models.UniqueConstraint):
+            continue
+        if constraint.condition is not None or not constraint.fields:
+            continue
+        indexes.append(tuple(constraint.fields))
+
+    for fields in opts.unique_together:
+        indexes.append(tuple(fields))
+
+    return tuple(dict.fromkeys(indexes))
+
+
+def indexed_leading_fields(model: type[models.Model]) -> frozenset[str]:
+    """Return the names of fields that lead at least one index on ``model``."""
+
+    return frozenset(columns[0] for columns in declared_indexes(model))
+
+
+def is_indexed_ordering(model: type[models.Model], ordering: Iterable[str]) -> bool:
+    """Return whether the database can walk ``ordering`` using an index.
+
+    Only the leading term matters: PostgreSQL can scan an index in either
+    direction and finish ties with an incremental sort, whereas an unindexed
+    leading term always forces a full sort of the filtered rows.
+    """
+
+    terms: Sequence[str] = tuple(ordering)
+    if not terms:
+        return True
+    leading = _field_name(model, terms[0])
+    if "__" in leading or leading not in indexed_leading_fields(model):
+        return False
+    # Ordering by a relation sorts by the related model's Meta.ordering.
+    return not model._meta.get_field(leading).is_relation
+
+
+def index_coverage(
+    model: type[models.Model],
+    equality: Iterable[str] = (),
+    ordering: Iterable[str] = (),
+    range_field: str | None = None,
+) -> str:
+    """Classify how well the declared indexes serve a query shape.
+
+    ``equality`` lists the fields compared with ``=``/``IN``, ``range_field``
+    a field bounded with ``<``/``>=`` (or a day), and ``ordering`` the
+    ``ORDER BY`` terms. Returns :data:`COVERED` when one index leads with
+    every equality field (in any order) followed by the range field, if any,
+    and that column is also the leading ordering field; :data:`PARTIAL` when
+    an index only narrows the rows and the database still has to filter or
+    sort them, and :data:`MISSING` otherwise.
+    """
+
+    wanted = frozenset(_field_name(model, name) for name in equality)
+    bounded = _field_name(model, range_field) if range_field else None
+    if bounded in wanted:
+        bounded = None
+    # Terms pinned by an equality lookup are constant and need no sorting.
+    order_terms = tuple(
+        name
+        for name in (_field_name(model, term) for term in ordering)
+        if name not in wanted
+    )
+    leading_order = order_terms[0] if order_terms else None
+
+    if any(_is_unique(model, name) for name in wanted):
+        return COVERED
+
+    coverage = MISSING
+    for columns in declared_indexes(model):
+        matched = 0
+        while matched < len(columns) and columns[matched] in wanted:
+            matched += 1
+        if matched < len(wanted):
+            if matched:
+                coverage = PARTIAL
+            continue
+        remainder = columns[matched:]
+        # Equality columns first, then at most one range column: the index
+        # is ordered by the range column within the equality prefix.
+        trailing = bounded or leading_order
+        if remainder and remainder[0] == trailing:
+            if bounded is None or leading_order in (None, bounded):
+                return COVERED
+            coverage = PARTIAL
+        elif trailing is None:
+            return COVERED
+        elif wanted or (remainder and remainder[0] == leading_order):
+            coverage = PARTIAL
+    return coverage
+
+
+def _is_unique(model: type[models.Model], name: str) -> bool:
+    field = model._meta.get_field(name)
+    return bool(field.primary_key or field.unique)
@@ -2,9 +2,28 @@
 
 from __future__ import annotations
 
-from rest_framework.pagination import PageNumberPagination
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Mapping, Sequence
+from decimal import Decimal
+from typing import Any
 
-__all__ = ["DefaultPagination"]
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.encoding import force_str
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.indexes import is_indexed_ordering
+
+__all__ = ["DefaultPagination", "KeysetPagination"]
 
 
 class DefaultPagination(PageNumberPagination):
@@ -13,3 +32,264 @@ class DefaultPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """Keyset (seek) pagination over a composite, index-backed ordering.
+
+    Pages are fetched with ``WHERE (a, b) < (:a, :b) ORDER BY a, b LIMIT n``
+    instead of ``OFFSET`` so deep pages cost the same as the first one, and
+    no ``COUNT(*)`` is issued unless the client asks for an estimate with
+    ``?count=estimate``. The primary key is always appended to the ordering
+    as a tie-breaker, which keeps cursors stable when rows share a
+    timestamp.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at",)
+    count_query_param = "count"
+    count_query_description = _(
+        "Set to `estimate` to include an approximate total row count."
+    )
+    unindexed_ordering_message = _(
+        "Ordering by '{field}' is not supported by an index."
+    )
+    nullable_ordering_message = _(
+        "Ordering by nullable field '{field}' is not supported."
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):  # type: ignore[override]
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.estimated_count = None
+        if request.query_params.get(self.count_query_param) == "estimate":
+            self.estimated_count = self.estimate_count(queryset)
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["reverse"])
+        ordering = self._reversed(self.ordering) if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, cursor["position"]))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        return rows
+
+    def get_ordering(self, request, queryset, view):  # type: ignore[override]
+        ordering: Sequence[str] | None = None
+        for backend in getattr(view, "filter_backends", ()):
+            if not issubclass(backend, OrderingFilter):
+                continue
+            if request.query_params.get(backend.ordering_param):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    self._validate_ordering(ordering)
+            break
+
+        if not ordering:
+            ordering = (
+                getattr(view, "ordering", None)
+                or queryset.model._meta.ordering
+                or self.ordering
+            )
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        pk_name = self.model._meta.pk.name
+        terms = [
+            term.replace("pk", pk_name) if term.lstrip("-") == "pk" else term
+            for term in ordering
+        ]
+        if not any(term.lstrip("-") == pk_name for term in terms):
+            terms.append(pk_name)
+        return tuple(terms)
+
+    def _validate_ordering(self, ordering: Sequence[str]) -> None:
+        if not is_indexed_ordering(self.model, ordering):
+            self._reject(self.unindexed_ordering_message, ordering[0])
+        for term in ordering:
+            name = term.lstrip("-")
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                self._reject(self.unindexed_ordering_message, term)
+            if field.null:
+                self._reject(self.nullable_ordering_message, term)
+
+    @staticmethod
+    def _reject(message, term: str) -> None:
+        raise ValidationError(
+            {"ordering": [force_str(message).format(field=term.lstrip("-"))]}
+        )
+
+    @staticmethod
+    def _reversed(ordering: Sequence[str]) -> tuple[str, ...]:
+        return tuple(
+            term[1:] if term.startswith("-") else f"-{term}" for term in ordering
+        )
+
+    @staticmethod
+    def _seek_filter(ordering: Sequence[str], position: Sequence[Any]) -> Q:
+        """Build the lexicographic ``row > position`` predicate for ``ordering``."""
+
+        condition = Q()
+        for index, term in enumerate(ordering):
+            name = term.lstrip("-")
+            lookup = "lt" if term.startswith("-") else "gt"
+            clause = Q(**{f"{name}__{lookup}": position[index]})
+            for prior_term, prior_value in zip(ordering[:index], position[:index]):
+                clause &= Q(**{prior_term.lstrip("-"): prior_value})
+            condition |= clause
+        return condition
+
+    def estimate_count(self, queryset) -> int:
+        """Return an approximate row count for ``queryset``.
+
+        PostgreSQL answers from the planner's row estimate, which costs the
+        same as planning the query. Other backends fall back to ``COUNT(*)``.
+        """
+
+        queryset = queryset.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return queryset.count()
+
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def _position_for(self, row: Any) -> list[Any]:
+        position: list[Any] = []
+        for term in self.ordering:
+            field = self.model._meta.get_field(term.lstrip("-"))
+            if isinstance(row, Mapping):
+                value = row.get(field.attname, row.get(field.name))
+            else:
+                value = getattr(row, field.attname)
+            position.append(value)
+        return position
+
+    def decode_cursor(self, request):  # type: ignore[override]
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(padded.encode("ascii")))
+            if payload["o"] != list(self.ordering):
+                raise ValueError("cursor ordering mismatch")
+            raw_position = payload["p"]
+            if len(raw_position) != len(self.ordering):
+                raise ValueError("cursor position mismatch")
+            position = [
+                self.model._meta.get_field(term.lstrip("-")).to_python(value)
+                for term, value in zip(self.ordering, raw_position)
+            ]
+            reverse = bool(payload.get("r", 0))
+        except (
+            binascii.Error,
+            DjangoValidationError,
+            KeyError,
+            TypeError,
+            UnicodeError,
+            ValueError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return {"position": position, "reverse": reverse}
+
+    def encode_cursor(self, cursor):  # type: ignore[override]
+        payload = {
+            "o": list(self.ordering),
+            "p": [self._encode_value(value) for value in cursor["position"]],
+        }
+        if cursor["reverse"]:
+            payload["r"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        encoded = urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+        url = remove_query_param(self.base_url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def _encode_value(value: Any) -> Any:
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def get_next_link(self):  # type: ignore[override]
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(
+            {"position": self._position_for(self.page[-1]), "reverse": False}
+        )
+
+    def get_previous_link(self):  # type: ignore[override]
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return None
+        return self.encode_cursor(
+            {"position": self._position_for(self.page[0]), "reverse": True}
+        )
+
+    def get_paginated_response(self, data):  # type: ignore[override]
+        payload: dict[str, Any] = {}
+        if self.estimated_count is not None:
+            payload["count"] = self.estimated_count
+        payload["next"] = self.get_next_link()
+        payload["previous"] = self.get_previous_link()
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):  # type: ignore[override]
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"] = {
+            "count": {
+                "type": "integer",
+                "description": "Approximate total, present only when requested.",
+                "example": 123,
+            },
+            **response_schema["properties"],
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):  # type: ignore[override]
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": force_str(self.count_query_description),
+                "schema": {"type": "string", "enum": ["estimate"]},
+            }
+        )
+        return parameters
@@ -0,0 +1,93 @@
+"""Dashboard totals read from the per-day rollups of :mod:`business.rollups`.
+
+A range of local days costs two index range scans, one per rollup table,
+however many appointments and payments the business has.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import date
+from decimal import Decimal
+
+from rest_framework import serializers
+
+from api.availability import LocalDaysSerializer
+from business.models import BusinessProfile, DailyBookings, DailyRevenue
+
+__all__ = [
+    "RollupQuerySerializer",
+    "RollupsSerializer",
+    "build_rollups",
+]
+
+MAX_RANGE_DAYS = 366
+
+
+def _revenue(totals: dict[str, list]) -> list[dict]:
+    return [
+        {"currency": currency, "payments": payments, "revenue": revenue}
+        for currency, (payments, revenue) in sorted(totals.items())
+    ]
+
+
+def build_rollups(business: BusinessProfile, days: Sequence[date]) -> dict:
+    """Return ``{totals, days}`` for ``days``, with zeros for quiet days."""
+
+    first, last = days[0], days[-1]
+    bookings = dict(
+        DailyBookings.objects.filter(
+            business=business, day__gte=first, day__lte=last
+        ).values_list("day", "bookings")
+    )
+    revenue: dict[date, dict[str, list]] = defaultdict(dict)
+    totals: dict[str, list] = defaultdict(lambda: [0, Decimal("0.00")])
+    for day, currency, payments, amount in DailyRevenue.objects.filter(
+        business=business, day__gte=first, day__lte=last
+    ).values_list("day", "currency", "payments", "revenue"):
+        revenue[day][currency] = [payments, amount]
+        totals[currency][0] += payments
+        totals[currency][1] += amount
+    return {
+        "totals": {
+            "bookings": sum(bookings.values()),
+            "revenue": _revenue(totals),
+        },
+        "days": [
+            {
+                "date": day,
+                "bookings": bookings.get(day, 0),
+                "revenue": _revenue(revenue.get(day, {})),
+            }
+            for day in days
+        ],
+    }
+
+
+class RollupQuerySerializer(LocalDaysSerializer):
+    max_range_days = MAX_RANGE_DAYS
+
+
+class RevenueSerializer(serializers.Serializer):
+    currency = serializers.CharField()
+    payments = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class RollupTotalsSerializer(serializers.Serializer):
+    bookings = serializers.IntegerField()
+    revenue = RevenueSerializer(many=True)
+
+
+class RollupDaySerializer(RollupTotalsSerializer):
+    date = serializers.DateField()
+
+
+class RollupsSerializer(serializers.Serializer):
+    business = serializers.IntegerField()
+    timezone = serializers.CharField()
+    totals = RollupTotalsSerializer(
+        help_text="Appointments holding a slot and completed payments."
+    )
+    days = RollupDaySerializer(many=True)
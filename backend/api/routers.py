@@ -9,6 +9,7 @@ from api.viewsets import (
     BusinessProfileViewSet,
     ListingViewSet,
     NotificationViewSet,
+    OpeningHoursViewSet,
     PaymentTransactionViewSet,
     ServiceViewSet,
     UserViewSet,
@@ -19,6 +20,7 @@ __all__ = ["router"]
 router = DefaultRouter()
 router.register("users", UserViewSet, basename="users")
 router.register("businesses", BusinessProfileViewSet, basename="businesses")
+router.register("opening-hours", OpeningHoursViewSet, basename="opening-hours")
 router.register("services", ServiceViewSet, basename="services")
 router.register("listings", ListingViewSet, basename="listings")
 router.register("appointments", AppointmentViewSet, basename="appointments")
@@ -0,0 +1,483 @@
+"""Pluggable full-text search for model-backed list endpoints.
+
+Each model exposed with ``search_fields`` gets a denormalised search document
+that is rewritten whenever the row, or a related row contributing to one of
+its search fields, is saved. Lookups then hit a single indexed document
+instead of chaining ``UPPER(...) LIKE '%x%'`` across joins.
+
+PostgreSQL stores documents in :class:`common.models.SearchDocument` (GIN over
+a ``tsvector`` plus a trigram index for e-mail addresses). SQLite keeps them
+in an FTS5 virtual table, which mirrors the behaviour closely enough for
+development and tests. Any other backend falls back to DRF's ``SearchFilter``.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, models
+from django.db.models import F, FloatField, Func, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import import_string
+from rest_framework import filters as drf_filters
+
+__all__ = [
+    "FullTextSearchFilter",
+    "PostgresSearchBackend",
+    "SQLiteSearchBackend",
+    "SearchBackend",
+    "get_search_backend",
+    "register_searchable",
+    "reindex",
+    "searchable_models",
+]
+
+FTS_TABLE = "common_searchdocument_fts"
+# FTS rows are keyed by ``content_type * FTS_ROWID_STRIDE + object_id`` so a
+# document can be looked up by rowid, the only indexed column of the table.
+FTS_ROWID_STRIDE = 1 << 40
+SEARCH_INDEX_CHUNK_SIZE = 500
+_TOKEN_RE = re.compile(r"[^\w@.+-]+", re.UNICODE)
+
+
+@dataclass
+class SearchSpec:
+    """Search fields registered for a model and the local columns they read."""
+
+    model: type[models.Model]
+    fields: tuple[str, ...]
+    local_fields: frozenset[str] = field(default_factory=frozenset)
+    relations: tuple[str, ...] = ()
+
+    def queryset(self, using: str = "default") -> models.QuerySet:
+        """Return the rows of ``model`` with every searched relation joined."""
+
+        queryset = self.model._default_manager.using(using).all()
+        if self.relations:
+            queryset = queryset.select_related(*self.relations)
+        return queryset
+
+
+_registry: dict[type[models.Model], SearchSpec] = {}
+
+
+def searchable_models() -> tuple[SearchSpec, ...]:
+    """Return the registered search specifications."""
+
+    return tuple(_registry.values())
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterable[list[Any]]:
+    batch: list[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _split_terms(terms: str) -> list[str]:
+    return [token for token in _TOKEN_RE.split(terms) if token]
+
+
+def _resolve_path(instance: models.Model, path: str) -> tuple[Any, models.Field | None]:
+    value: Any = instance
+    model_field: models.Field | None = None
+    for part in path.split("__"):
+        if value is None:
+            return None, model_field
+        model_field = value._meta.get_field(part)
+        value = getattr(value, part, None)
+    return value, model_field
+
+
+class SearchBackend:
+    """Interface for search document storage and lookup."""
+
+    vendor: str = ""
+
+    def __init__(self, using: str = "default") -> None:
+        self.using = using
+
+    def build_document(self, instance: models.Model) -> tuple[str, str]:
+        """Return ``(text, emails)`` for ``instance`` from its search fields."""
+
+        spec = _registry[type(instance)]
+        text: list[str] = []
+        emails: list[str] = []
+        for path in spec.fields:
+            value, model_field = _resolve_path(instance, path)
+            if value in (None, ""):
+                continue
+            if isinstance(model_field, models.EmailField):
+                emails.append(str(value))
+            else:
+                text.append(str(value))
+        return " ".join(text), " ".join(emails)
+
+    def _documents(self, instances: Iterable[models.Model]):
+        """Yield ``(content_type, pk, {"document": ..., "emails": ...})`` rows."""
+
+        content_types = ContentType.objects.db_manager(self.using)
+        for instance in instances:
+            text, emails = self.build_document(instance)
+            content_type = content_types.get_for_model(instance)
+            yield content_type, instance.pk, {"document": text, "emails": emails}
+
+    def index(self, instances: Iterable[models.Model]) -> None:
+        """Write the documents of ``instances``, replacing existing ones."""
+
+        raise NotImplementedError
+
+    def remove(self, model: type[models.Model], pk: Any) -> None:
+        raise NotImplementedError
+
+    def search(self, queryset: models.QuerySet, terms: str) -> models.QuerySet:
+        raise NotImplementedError
+
+    def setup(self) -> None:
+        """Create any storage the backend needs outside the ORM."""
+
+    @staticmethod
+    def _rank_ordering(queryset: models.QuerySet) -> tuple[Any, ...]:
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return ("-search_rank", *ordering)
+
+
+class PostgresSearchBackend(SearchBackend):
+    """``tsvector``/GIN search with trigram matching for e-mail addresses."""
+
+    vendor = "postgresql"
+    # Content mixes Persian and English; the simple configuration avoids
+    # applying English stemming to everything.
+    config = "simple"
+
+    def index(self, instances: Iterable[models.Model]) -> None:
+        from django.contrib.postgres.search import SearchVector
+
+        from common.models import SearchDocument
+
+        documents = SearchDocument.objects.using(self.using)
+        for batch in _batched(instances, SEARCH_INDEX_CHUNK_SIZE):
+            rows = [
+                SearchDocument(content_type=content_type, object_id=pk, **fields)
+                for content_type, pk, fields in self._documents(batch)
+            ]
+            documents.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["content_type", "object_id"],
+                update_fields=["document", "emails"],
+            )
+            by_type: dict[int, list[Any]] = {}
+            for row in rows:
+                by_type.setdefault(row.content_type_id, []).append(row.object_id)
+            for content_type_id, object_ids in by_type.items():
+                documents.filter(
+                    content_type_id=content_type_id, object_id__in=object_ids
+                ).update(vector=SearchVector("document", config=self.config))
+
+    def remove(self, model: type[models.Model], pk: Any) -> None:
+        from common.models import SearchDocument
+
+        content_type = ContentType.objects.db_manager(self.using).get_for_model(model)
+        SearchDocument.objects.using(self.using).filter(
+            content_type=content_type, object_id=pk
+        ).delete()
+
+    def _query(self, terms: str):
+        from django.contrib.postgres.search import SearchQuery
+
+        lexemes = [
+            "'{}':*".format(token.replace("'", "").replace("\\", ""))
+            for token in _split_terms(terms)
+        ]
+        return SearchQuery(" & ".join(lexemes), config=self.config, search_type="raw")
+
+    def search(self, queryset: models.QuerySet, terms: str) -> models.QuerySet:
+        from django.contrib.postgres.search import SearchRank
+
+        from common.models import SearchDocument
+
+        if not _split_terms(terms):
+            return queryset
+        query = self._query(terms)
+        content_type = ContentType.objects.db_manager(self.using).get_for_model(
+            queryset.model
+        )
+        documents = SearchDocument.objects.using(self.using).filter(
+            Q(vector=query) | Q(emails__icontains=terms.strip()),
+            content_type=content_type,
+        )
+        rank = documents.filter(object_id=OuterRef("pk")).annotate(
+            rank=SearchRank(F("vector"), query)
+        )
+        queryset = queryset.filter(pk__in=documents.values("object_id")).annotate(
+            search_rank=Subquery(rank.values("rank")[:1], output_field=FloatField())
+        )
+        return queryset.order_by(*self._rank_ordering(queryset))
+
+
+class _BM25Rank(Func):
+    """Relevance of the FTS row ``rowid`` for ``match``; higher is better.
+
+    bm25() scores are negative, lower meaning more relevant.
+    """
+
+    template = (
+        f"(SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %(expressions)s)"
+    )
+    arg_joiner = " AND rowid = "
+    arity = 2
+    output_field = FloatField()
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 stand-in used for local development and the test-suite.
+
+    The bm25() rank is a correlated subquery per matching row, which keeps the
+    queryset composable but grows with the number of matches; it is meant for
+    development-sized data, not production.
+    """
+
+    vendor = "sqlite"
+
+    def setup(self) -> None:
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "document, content_type UNINDEXED, object_id UNINDEXED)"
+            )
+
+    def index(self, instances: Iterable[models.Model]) -> None:
+        with connections[self.using].cursor() as cursor:
+            for batch in _batched(instances, SEARCH_INDEX_CHUNK_SIZE):
+                rows = [
+                    (content_type.pk, pk, f"{fields['document']} {fields['emails']}")
+                    for content_type, pk, fields in self._documents(batch)
+                ]
+                # Content type and id are unindexed FTS columns: each DELETE
+                # scans the table, so issue one per content type and batch.
+                by_type: dict[int, list[Any]] = {}
+                for content_type_id, pk, _text in rows:
+                    by_type.setdefault(content_type_id, []).append(pk)
+                for content_type_id, pks in by_type.items():
+                    cursor.execute(
+                        f"DELETE FROM {FTS_TABLE} WHERE content_type = %s "
+                        "AND object_id IN ({})".format(", ".join(["%s"] * len(pks))),
+                        [content_type_id, *pks],
+                    )
+                cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE} "
+                    "(rowid, document, content_type, object_id) "
+                    "VALUES (%s, %s, %s, %s)",
+                    [
+                        (
+                            content_type_id * FTS_ROWID_STRIDE + pk,
+                            text.strip(),
+                            content_type_id,
+                            pk,
+                        )
+                        for content_type_id, pk, text in rows
+                    ],
+                )
+
+    def remove(self, model: type[models.Model], pk: Any) -> None:
+        content_type = ContentType.objects.db_manager(self.using).get_for_model(model)
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE content_type = %s AND object_id = %s",
+                [content_type.pk, pk],
+            )
+
+    def search(self, queryset: models.QuerySet, terms: str) -> models.QuerySet:
+        tokens = _split_terms(terms)
+        if not tokens:
+            return queryset
+        match = " ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+        content_type = ContentType.objects.db_manager(self.using).get_for_model(
+            queryset.model
+        )
+        matches = RawSQL(
+            f"SELECT object_id FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND content_type = %s",
+            [match, content_type.pk],
+        )
+        queryset = queryset.filter(pk__in=matches).annotate(
+            search_rank=_BM25Rank(
+                Value(match), F("pk") + content_type.pk * FTS_ROWID_STRIDE
+            )
+        )
+        return queryset.order_by(*self._rank_ordering(queryset))
+
+
+DEFAULT_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using: str = "default") -> SearchBackend | None:
+    """Return the search backend for the ``using`` database alias.
+
+    ``API_SEARCH_BACKEND`` may name a backend class explicitly; otherwise one
+    is chosen from the database vendor. ``None`` means no full-text support.
+    """
+
+    dotted_path = getattr(settings, "API_SEARCH_BACKEND", None)
+    if dotted_path:
+        return import_string(dotted_path)(using)
+    backend_class = DEFAULT_BACKENDS.get(connections[using].vendor)
+    if backend_class is None:
+        return None
+    return backend_class(using)
+
+
+def _reindex(instances: Iterable[models.Model], using: str) -> None:
+    backend = get_search_backend(using)
+    if backend is not None:
+        backend.index(instances)
+
+
+def reindex(
+    model: type[models.Model], pks: Iterable[Any], using: str = "default"
+) -> None:
+    """Rewrite the documents of the ``model`` rows ``pks`` in batched queries.
+
+    For writes that send no ``post_save`` signal, such as ``bulk_create`` and
+    ``bulk_update``. Searched relations are joined up front.
+    """
+
+    spec = _registry.get(model)
+    if spec is None:
+        return
+    rows = spec.queryset(using).filter(pk__in=list(pks))
+    _reindex(rows.iterator(chunk_size=SEARCH_INDEX_CHUNK_SIZE), using)
+
+
+def _touches(update_fields: Iterable[str] | None, names: frozenset[str]) -> bool:
+    return update_fields is None or not names.isdisjoint(update_fields)
+
+
+def register_searchable(model: type[models.Model], fields: Sequence[str]) -> None:
+    """Keep search documents for ``model`` built from ``fields`` up to date.
+
+    Saving a ``model`` row rewrites its document. Saving a related row that
+    feeds one of the fields (``business__name`` on a service, say) rewrites
+    the documents of the dependent rows. Saves restricted with
+    ``update_fields`` to columns no search field reads are ignored.
+    """
+
+    fields = tuple(dict.fromkeys(fields))
+    local: set[str] = set()
+    relations: list[str] = []
+    dependencies: dict[type[models.Model], dict[str, set[str]]] = {}
+    for path in fields:
+        parts = path.split("__")
+        current = model
+        for depth, part in enumerate(parts):
+            model_field = current._meta.get_field(part)
+            if depth == 0:
+                local.update({model_field.name, getattr(model_field, "attname", part)})
+            if not model_field.is_relation:
+                break
+            related = model_field.related_model
+            prefix = "__".join(parts[: depth + 1])
+            relations.append(prefix)
+            next_part = parts[depth + 1] if depth + 1 < len(parts) else "pk"
+            related_field = related._meta.get_field(
+                related._meta.pk.name if next_part == "pk" else next_part
+            )
+            dependencies.setdefault(related, {}).setdefault(prefix, set()).update(
+                {related_field.name, getattr(related_field, "attname", next_part)}
+            )
+            current = related
+
+    spec = SearchSpec(
+        model=model,
+        fields=fields,
+        local_fields=frozenset(local),
+        relations=tuple(dict.fromkeys(relations)),
+    )
+    _registry[model] = spec
+
+    def on_save(
+        sender, instance, raw=False, using="default", update_fields=None, **kwargs
+    ):
+        if raw or not _touches(update_fields, spec.local_fields):
+            return
+        _reindex([instance], using)
+
+    def on_delete(sender, instance, using="default", **kwargs):
+        backend = get_search_backend(using)
+        if backend is not None:
+            backend.remove(model, instance.pk)
+
+    post_save.connect(
+        on_save, sender=model, weak=False, dispatch_uid=f"search-{model._meta.label}"
+    )
+    post_delete.connect(
+        on_delete,
+        sender=model,
+        weak=False,
+        dispatch_uid=f"search-delete-{model._meta.label}",
+    )
+
+    for related, prefixes in dependencies.items():
+        for prefix, names in prefixes.items():
+            watched = frozenset(names)
+
+            def on_related_save(
+                sender,
+                instance,
+                created=False,
+                raw=False,
+                using="default",
+                update_fields=None,
+                _prefix=prefix,
+                _watched=watched,
+                **kwargs,
+            ):
+                # A freshly created row cannot have dependents yet.
+                if created or raw or not _touches(update_fields, _watched):
+                    return
+                dependents = spec.queryset(using).filter(**{_prefix: instance})
+                _reindex(dependents.iterator(chunk_size=SEARCH_INDEX_CHUNK_SIZE), using)
+
+            post_save.connect(
+                on_related_save,
+                sender=related,
+                weak=False,
+                dispatch_uid=f"search-{model._meta.label}-{prefix}",
+            )
+
+
+class FullTextSearchFilter(drf_filters.SearchFilter):
+    """``SearchFilter`` drop-in that queries the indexed search documents.
+
+    Results are ranked by relevance unless the request asks for an explicit
+    ordering or the view uses keyset pagination, which always walks its own
+    ordering. Without a full-text backend for the database the standard
+    ``icontains`` behaviour is used.
+    """
+
+    def filter_queryset(self, request, queryset, view):  # type: ignore[override]
+        terms = request.query_params.get(self.search_param, "")
+        terms = terms.replace("\x00", "").strip()
+        if not terms or not self.get_search_fields(view, request):
+            return queryset
+        if queryset.model not in _registry:
+            return super().filter_queryset(request, queryset, view)
+        backend = get_search_backend(queryset.db)
+        if backend is None:
+            return super().filter_queryset(request, queryset, view)
+        return backend.search(queryset, terms)
@@ -2,13 +2,50 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
-from typing import Sequence
+from collections.abc import Callable, Iterable, Mapping
+from copy import copy
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, ClassVar, Sequence
 
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import models
-from rest_framework import serializers
+from rest_framework import relations, serializers
+from rest_framework.settings import api_settings
 
-__all__ = ["build_model_serializer"]
+__all__ = [
+    "FastModelSerializer",
+    "PrefetchedPrimaryKeyRelatedField",
+    "build_model_serializer",
+    "build_transition_serializer",
+    "schema_doc_excludes",
+    "serializer_relation_paths",
+]
+
+Converter = Callable[[Any], Any] | None
+# (output name, attribute getter, converter or ``None`` for identity, column)
+FieldStep = tuple[str, Callable[[Any], Any], Converter, str | None]
+FieldPlan = tuple[FieldStep, ...]
+
+# Field types whose ``to_representation`` depends only on the attribute value,
+# never on the request, context or parent serializer.
+_PLAIN_FIELD_TYPES: tuple[type[serializers.Field], ...] = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.DateField,
+    serializers.DateTimeField,
+    serializers.DecimalField,
+    serializers.DurationField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.TimeField,
+    serializers.UUIDField,
+)
+
+_SERIALIZER_CACHE: dict[tuple[Any, ...], type[serializers.ModelSerializer]] = {}
 
 
 def _resolve_serializer_fields(
@@ -26,22 +63,295 @@ def _resolve_serializer_fields(
     return tuple(dict.fromkeys(resolved))
 
 
+class PrefetchedPrimaryKeyRelatedField(relations.PrimaryKeyRelatedField):
+    """``PrimaryKeyRelatedField`` that can resolve keys from prefetched rows.
+
+    Bulk writes put ``{field_name: {pk: instance}}`` under the
+    ``related_objects`` context key, loaded with one ``in_bulk`` query per
+    relation, instead of issuing a ``get()`` per item and relation.
+    """
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get("related_objects", {}).get(self.field_name)
+        if prefetched is None or self.pk_field is not None or isinstance(data, bool):
+            return super().to_internal_value(data)
+        try:
+            key = self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            return super().to_internal_value(data)
+        try:
+            return prefetched[key]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+def _column_for(model: type[models.Model], source: str) -> str | None:
+    """Return the database column attribute backing ``source``, if any."""
+
+    try:
+        model_field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete or model_field.many_to_many:
+        return None
+    return model_field.attname
+
+
+def _plan_field(
+    model: type[models.Model], field: serializers.Field
+) -> FieldStep | None:
+    """Return the plan step for ``field`` or ``None`` if it is unsupported."""
+
+    if len(field.source_attrs) != 1:
+        return None
+    source = field.source_attrs[0]
+
+    if type(field) in (
+        relations.PrimaryKeyRelatedField,
+        PrefetchedPrimaryKeyRelatedField,
+    ):
+        if field.pk_field is not None:
+            return None
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or not model_field.many_to_one:
+            return None
+        # Reading the ``<name>_id`` column matches DRF's PKOnlyObject shortcut.
+        attname = model_field.attname
+        return field.field_name, attrgetter(attname), None, attname
+
+    if isinstance(field, _PLAIN_FIELD_TYPES):
+        column = _column_for(model, source)
+        return field.field_name, attrgetter(source), field.to_representation, column
+    return None
+
+
+class FastModelSerializer(serializers.ModelSerializer):
+    """``ModelSerializer`` that renders instances from a per-class field plan.
+
+    DRF rebuilds the field mapping via ``get_fields()`` for every serializer
+    instance and walks generic ``get_attribute`` machinery for every value.
+    The plan resolves each readable field to a plain attribute getter and its
+    ``to_representation`` once per class, so list pages are rendered in a
+    tight loop. Classes with fields the plan cannot express safely (nested
+    serializers, hyperlinks, files, dotted sources) fall back to the regular
+    ``ModelSerializer`` path. Input validation is unaffected.
+
+    When every planned field maps to a database column, :meth:`render_rows`
+    renders ``values()`` rows with the same plan, skipping model
+    instantiation altogether.
+    """
+
+    _field_plan: ClassVar[FieldPlan | None]
+
+    @classmethod
+    def get_field_plan(cls) -> FieldPlan | None:
+        try:
+            return cls.__dict__["_field_plan"]
+        except KeyError:
+            pass
+
+        model = cls.Meta.model
+        steps = []
+        # The template instance keeps the planned fields bound to a parent.
+        template = cls()
+        for field in template._readable_fields:
+            step = _plan_field(model, field)
+            if step is None:
+                plan = None
+                break
+            steps.append(step)
+        else:
+            plan = tuple(steps)
+
+        cls._field_plan = plan
+        return plan
+
+    def to_representation(self, instance):
+        plan = self.get_field_plan()
+        if plan is None or not isinstance(instance, models.Model):
+            return super().to_representation(instance)
+
+        ret = {}
+        for name, getter, convert, _column in plan:
+            value = getter(instance)
+            if value is None or convert is None:
+                ret[name] = value
+            else:
+                ret[name] = convert(value)
+        return ret
+
+    @classmethod
+    def get_value_columns(cls) -> tuple[str, ...] | None:
+        """Return the ``values()`` columns :meth:`render_rows` needs, if any."""
+
+        plan = cls.get_field_plan()
+        if plan is None or any(column is None for *_, column in plan):
+            return None
+        return tuple(dict.fromkeys(column for *_, column in plan))
+
+    @classmethod
+    def render_rows(cls, rows: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        """Render ``values()`` rows exactly as :meth:`to_representation` would."""
+
+        plan = cls.get_field_plan()
+        rendered = []
+        for row in rows:
+            ret = {}
+            for name, _getter, convert, column in plan:
+                value = row[column]
+                if value is None or convert is None:
+                    ret[name] = value
+                else:
+                    ret[name] = convert(value)
+            rendered.append(ret)
+        return rendered
+
+
+def _forward_relation_path(model: type[models.Model], attrs: Sequence[str]) -> str:
+    """Return the longest ``select_related`` path along ``attrs`` from ``model``."""
+
+    path: list[str] = []
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.many_to_many or field.one_to_many:
+            break
+        path.append(attr)
+        model = field.related_model
+    return "__".join(path)
+
+
+@lru_cache(maxsize=None)
+def serializer_relation_paths(
+    serializer_class: type[serializers.ModelSerializer],
+) -> tuple[str, ...]:
+    """Return the single-valued relations ``serializer_class`` reads from.
+
+    Primary-key relations are served by the local ``<name>_id`` column and
+    need no join; nested serializers, string/slug relations and dotted
+    sources dereference the related row.
+    """
+
+    plan = getattr(serializer_class, "get_field_plan", lambda: None)()
+    if plan is not None:
+        return ()
+
+    model = serializer_class.Meta.model
+    paths: list[str] = []
+    for field in serializer_class()._readable_fields:
+        attrs = list(field.source_attrs)
+        if isinstance(field, relations.RelatedField):
+            if field.use_pk_only_optimization():
+                attrs = attrs[:-1]
+        elif not isinstance(field, serializers.BaseSerializer):
+            attrs = attrs[:-1]
+        path = _forward_relation_path(model, attrs)
+        if path:
+            paths.append(path)
+    return tuple(dict.fromkeys(paths))
+
+
+def schema_doc_excludes() -> list[type]:
+    """Keep :class:`FastModelSerializer`'s docstring out of schema descriptions."""
+
+    from drf_spectacular.plumbing import get_lib_doc_excludes
+
+    return [*get_lib_doc_excludes(), FastModelSerializer]
+
+
+def _validate_check_constraints(self, attrs):
+    """Report ``CheckConstraint`` violations as validation errors, not ``500``s.
+
+    ``ModelSerializer`` validates unique constraints only. The candidate row is
+    the instance being updated (if any) with ``attrs`` applied.
+    """
+
+    model = self.Meta.model
+    checks = [
+        constraint
+        for constraint in model._meta.constraints
+        if isinstance(constraint, models.CheckConstraint)
+    ]
+    if not checks:
+        return attrs
+
+    candidate = copy(self.instance) if self.instance is not None else model()
+    concrete = {field.name for field in model._meta.concrete_fields}
+    for name, value in attrs.items():
+        if name in concrete:
+            setattr(candidate, name, value)
+    messages = []
+    for constraint in checks:
+        try:
+            constraint.validate(model, candidate)
+        except DjangoValidationError as exc:
+            messages.extend(exc.messages)
+    if messages:
+        raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: messages})
+    return attrs
+
+
 def build_model_serializer(
     model: type[models.Model],
     *,
     fields: Iterable[str] | None = None,
     read_only_fields: Iterable[str] | None = None,
+    fast: bool = False,
 ) -> type[serializers.ModelSerializer]:
-    """Create a ``ModelSerializer`` subclass for ``model``."""
+    """Create a ``ModelSerializer`` subclass for ``model``.
+
+    Classes are cached per configuration, so repeated calls return the same
+    class. Pass ``fast=True`` to build on :class:`FastModelSerializer`. Unlike
+    a plain ``ModelSerializer`` the class also enforces the model's check
+    constraints.
+    """
 
     resolved_fields = _resolve_serializer_fields(model, fields)
     read_only = tuple(dict.fromkeys(read_only_fields or ()))
 
+    cache_key = (model, resolved_fields, read_only, fast)
+    cached = _SERIALIZER_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
     meta_attrs: dict[str, object] = {"model": model, "fields": resolved_fields}
     if read_only:
         meta_attrs["read_only_fields"] = read_only
 
     meta = type("Meta", (), meta_attrs)
     serializer_name = f"{model.__name__}AutoSerializer"
+    base = FastModelSerializer if fast else serializers.ModelSerializer
+
+    serializer = type(
+        serializer_name,
+        (base,),
+        {
+            "Meta": meta,
+            "serializer_related_field": PrefetchedPrimaryKeyRelatedField,
+            "validate": _validate_check_constraints,
+        },
+    )
+    _SERIALIZER_CACHE[cache_key] = serializer
+    return serializer
+
+
+@lru_cache(maxsize=None)
+def build_transition_serializer(
+    model: type[models.Model],
+) -> type[serializers.Serializer]:
+    """Create the ``{"status": ...}`` request serializer for ``model`` transitions.
+
+    Classes are cached per model, like :func:`build_model_serializer`.
+    """
 
-    return type(serializer_name, (serializers.ModelSerializer,), {"Meta": meta})
+    status = model._meta.get_field("status")
+    return type(
+        f"{model.__name__}TransitionSerializer",
+        (serializers.Serializer,),
+        {"status": serializers.ChoiceField(choices=status.choices)},
+    )
@@ -2,28 +2,71 @@
 
 from __future__ import annotations
 
-from collections.abc import Sequence
+import hashlib
+import uuid
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from functools import partial
 from typing import ClassVar, TypeVar
 
-from django.core.exceptions import ImproperlyConfigured
-from django.db import models
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
 from django_filters import rest_framework as django_filters
-from rest_framework import filters as drf_filters
-from rest_framework import permissions, status, viewsets
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
+from rest_framework import permissions, serializers, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, PermissionDenied, ValidationError
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from api.filters import build_filterset_for_model
-from api.pagination import DefaultPagination
-from api.serializers import build_model_serializer
-from appointments.models import Appointment
-from business.models import BusinessProfile
+from api.availability import (
+    AvailabilityQuerySerializer,
+    AvailabilitySerializer,
+    SlotConflict,
+    find_slots,
+    forget_appointments,
+)
+from api.bulk import BulkModelMixin
+from api.calendar import CalendarQuerySerializer, CalendarSerializer, build_calendar
+from api.cache import (
+    cache_key,
+    get_cached_response,
+    record_lookup,
+    register_cached_models,
+    related_models,
+    store_response,
+)
+from api.export import ExportModelMixin
+from api.filters import (
+    IndexedOrderingFilter,
+    build_filterset_for_model,
+    indexed_ordering_fields,
+)
+from api.pagination import DefaultPagination, KeysetPagination
+from api.rollups import RollupQuerySerializer, RollupsSerializer, build_rollups
+from api.search import FullTextSearchFilter, register_searchable
+from api.serializers import (
+    build_model_serializer,
+    build_transition_serializer,
+    serializer_relation_paths,
+)
+from appointments.models import Appointment, SlotUnavailable, is_overlap_violation
+from business.models import BusinessProfile, OpeningHours
+from business.rollups import touch_appointments
+from common.models import TransitionError
 from marketplace.models import Listing
 from notifications.adapters import MockNotificationService
-from notifications.models import Notification
-from payments.adapters import MockPaymentGateway
+from notifications.models import Notification, UnreadCount
+from notifications.serializers import BroadcastSerializer, MarkReadSerializer
+from notifications.tasks import fan_out_notifications
+from payments.adapters import PaymentStatus, get_payment_gateway
 from payments.models import PaymentTransaction
+from payments.tasks import capture_payment, capture_payment_batch
 from services.models import Service
 from users.models import User
 
@@ -33,32 +76,62 @@ __all__ = [
     "AutoModelViewSet",
     "UserViewSet",
     "BusinessProfileViewSet",
+    "OpeningHoursViewSet",
     "ServiceViewSet",
     "ListingViewSet",
     "AppointmentViewSet",
     "PaymentTransactionViewSet",
     "NotificationViewSet",
+    "CaptureInProgress",
+    "StatusConflict",
 ]
 
 
-class AutoModelViewSet(viewsets.ModelViewSet):
+class StatusConflict(APIException):
+    """The requested status change is not allowed from the current status."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_code = "invalid_transition"
+
+
+class CaptureInProgress(APIException):
+    """Another idempotency key already claimed the payment's capture."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A capture with a different idempotency key is in progress."
+    default_code = "capture_in_progress"
+
+
+class AutoModelViewSet(ExportModelMixin, viewsets.ModelViewSet):
     """Base class that auto-wires serializer, filterset and pagination."""
 
     model: ClassVar[type[ModelT] | None] = None
     serializer_fields: ClassVar[Sequence[str] | None] = None
     serializer_read_only_fields: ClassVar[Sequence[str] | None] = None
+    serializer_fast_path: ClassVar[bool] = True
     filterset_fields: ClassVar[Sequence[str] | None | bool] = None
     select_related: ClassVar[Sequence[str]] = ()
     prefetch_related: ClassVar[Sequence[str]] = ()
+    lean_list: ClassVar[bool] = False
+    # Seconds to cache list/retrieve responses for; ``None`` disables caching.
+    cache_timeout: ClassVar[int | None] = None
+    cache_dependencies: ClassVar[Sequence[type[models.Model]]] = ()
+    # Answer If-None-Match / If-Modified-Since from ``updated_at`` validators.
+    conditional_requests: ClassVar[bool] = True
+    # Read budgets include the page query, the count query and authentication.
+    query_budget: ClassVar[int | Mapping[str, int] | None] = {
+        "list": 4,
+        "retrieve": 3,
+    }
 
     pagination_class = DefaultPagination
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = (
         django_filters.DjangoFilterBackend,
-        drf_filters.SearchFilter,
-        drf_filters.OrderingFilter,
+        FullTextSearchFilter,
+        IndexedOrderingFilter,
     )
-    ordering_fields = "__all__"
+    ordering_fields: ClassVar[Sequence[str] | None] = None
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -76,7 +149,10 @@ class AutoModelViewSet(viewsets.ModelViewSet):
 
         if getattr(cls, "serializer_class", None) is None:
             cls.serializer_class = build_model_serializer(
-                model, fields=serializer_fields, read_only_fields=read_only
+                model,
+                fields=serializer_fields,
+                read_only_fields=read_only,
+                fast=cls.serializer_fast_path,
             )
 
         filterset_fields = getattr(cls, "filterset_fields", None)
@@ -92,6 +168,32 @@ class AutoModelViewSet(viewsets.ModelViewSet):
                 model, fields=candidate_fields
             )
 
+        search_fields = getattr(cls, "search_fields", None)
+        if search_fields:
+            register_searchable(model, search_fields)
+
+        if cls.cache_timeout:
+            register_cached_models(cls.get_cache_dependencies())
+
+    @classmethod
+    def get_cache_dependencies(cls) -> tuple[type[models.Model], ...]:
+        """Return the models whose writes invalidate this view's cached responses.
+
+        Besides the view's own model these are the models reached through
+        ``search_fields`` (their rows feed the search documents) and
+        ``select_related``, plus any listed in ``cache_dependencies``.
+        """
+
+        paths = [
+            field.lstrip("^=@$") for field in getattr(cls, "search_fields", None) or ()
+        ]
+        paths.extend(cls.select_related)
+        return tuple(
+            dict.fromkeys(
+                [cls.model, *related_models(cls.model, paths), *cls.cache_dependencies]
+            )
+        )
+
     @staticmethod
     def _default_read_only_fields_for_model(model: type[models.Model]) -> Sequence[str]:
         fields: set[str] = set()
@@ -109,8 +211,13 @@ class AutoModelViewSet(viewsets.ModelViewSet):
             raise ImproperlyConfigured("AutoModelViewSet subclasses must define a model")
 
         queryset = model._default_manager.all()
-        if self.select_related:
-            queryset = queryset.select_related(*self.select_related)
+        select_related = self.get_select_related()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        else:
+            only_fields = self.get_only_fields()
+            if only_fields:
+                queryset = queryset.only(*only_fields)
         if self.prefetch_related:
             queryset = queryset.prefetch_related(*self.prefetch_related)
 
@@ -122,6 +229,277 @@ class AutoModelViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def get_select_related(self) -> tuple[str, ...]:
+        """Return the joins the serializer needs to render this request.
+
+        Declared ``select_related`` paths are kept only when the serializer
+        dereferences them; primary-key relations read the local ``<name>_id``
+        column instead. Filters, search and ordering join in their own
+        ``WHERE``/``ORDER BY`` clauses, which ``select_related`` cannot save.
+        """
+
+        needed = serializer_relation_paths(self.get_serializer_class())
+        declared = [
+            path
+            for path in self.select_related
+            if any(
+                path == other
+                or path.startswith(f"{other}__")
+                or other.startswith(f"{path}__")
+                for other in needed
+            )
+        ]
+        return tuple(dict.fromkeys([*declared, *needed]))
+
+    def get_only_fields(self) -> tuple[str, ...]:
+        """Return the columns read-only actions load, deferring the rest.
+
+        Only columns the serializer renders, the primary key and possible
+        ordering columns are fetched, so unrendered wide text columns stay in
+        the database. Writes load full rows so model methods and ``save()``
+        see every field.
+        """
+
+        if getattr(self, "action", None) not in ("list", "retrieve", "export"):
+            return ()
+        serializer_class = self.get_serializer_class()
+        get_value_columns = getattr(serializer_class, "get_value_columns", None)
+        columns = get_value_columns() if get_value_columns is not None else None
+        if columns is None:
+            return ()
+
+        opts = self.model._meta
+        names = {field.attname: field.name for field in opts.concrete_fields}
+        if self.ordering_fields is not None:
+            ordering_fields = self.ordering_fields
+        else:
+            ordering_fields = indexed_ordering_fields(self.model)
+        ordering = (
+            *ordering_fields,
+            *(getattr(self, "ordering", None) or ()),
+            *opts.ordering,
+        )
+        wanted = [
+            opts.pk.name,
+            *(names[column] for column in columns),
+            *(term.lstrip("-") for term in ordering if isinstance(term, str)),
+        ]
+        concrete = set(names.values())
+        return tuple(name for name in dict.fromkeys(wanted) if name in concrete)
+
+    def get_create_kwargs(self) -> dict[str, object]:
+        """Return attributes forced onto every row this view creates."""
+
+        return {}
+
+    def perform_create(self, serializer):  # type: ignore[override]
+        serializer.save(**self.get_create_kwargs())
+
+    def get_cache_scope(self, request: Request) -> str:
+        """Return the audience a cached response may be shared with."""
+
+        user = request.user
+        if getattr(user, "is_staff", False):
+            return "staff"
+        return f"user:{user.pk}"
+
+    def get_list_validators(self, queryset) -> tuple[str, datetime | None]:
+        """Return ``(etag, None)`` for a filtered list queryset.
+
+        The ETag comes from one aggregate query: ``MAX(updated_at)`` moves on
+        every insert or update and the row count moves on every delete. Lists
+        send no ``Last-Modified``: deleting an older row leaves the maximum
+        unchanged, and HTTP dates cannot tell writes within a second apart.
+        """
+
+        summary = queryset.order_by().aggregate(
+            last_modified=Max("updated_at"), count=Count("pk")
+        )
+        return self._make_etag(summary["last_modified"], summary["count"]), None
+
+    def get_detail_validators(self, queryset, kwargs) -> tuple[str, datetime] | None:
+        """Return ``(etag, last_modified)`` for the requested row, if it exists."""
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = (
+            queryset.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            .values_list("pk", "updated_at")
+            .first()
+        )
+        if row is None:
+            return None
+        pk, last_modified = row
+        return self._make_etag(pk, last_modified), last_modified
+
+    def _make_etag(self, *parts) -> str:
+        fields = getattr(self.get_serializer_class().Meta, "fields", None)
+        fingerprint = repr((type(self).__name__, self.action, fields, *parts))
+        return f'W/"{hashlib.sha256(fingerprint.encode()).hexdigest()[:32]}"'
+
+    def _supports_conditional_requests(self) -> bool:
+        if not self.conditional_requests:
+            return False
+        try:
+            self.model._meta.get_field("updated_at")
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str | None, last_modified):
+        if isinstance(last_modified, str):
+            last_modified = parse_http_date_safe(last_modified)
+        elif last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None and etag:
+            response["ETag"] = etag
+        return response
+
+    def _conditional_read(self, request: Request, kwargs, render, get_validators):
+        """Serve a read from the response cache, a ``304`` or ``render()``.
+
+        A cached response carries its own validators, so conditional requests
+        against it cost no query. Otherwise the validators are computed with one
+        cheap query and compared before ``render()`` serializes anything.
+        """
+
+        key = None
+        if self.cache_timeout:
+            view_name = type(self).__name__
+            key = cache_key(
+                f"{view_name}.{self.action}",
+                self.get_cache_scope(request),
+                self.get_cache_dependencies(),
+                request,
+                ((name, str(value)) for name, value in kwargs.items()),
+            )
+            cached = get_cached_response(key)
+            record_lookup(view_name, hit=cached is not None)
+            if cached is not None:
+                cached["X-Cache"] = "HIT"
+                not_modified = self._not_modified(
+                    request, cached.get("ETag"), cached.get("Last-Modified")
+                )
+                return not_modified or cached
+
+        validators = None
+        if self._supports_conditional_requests():
+            validators = get_validators()
+        if validators is not None:
+            not_modified = self._not_modified(request, *validators)
+            if not_modified is not None:
+                return not_modified
+
+        response = render()
+        if response.status_code == status.HTTP_200_OK:
+            if validators is not None:
+                etag, last_modified = validators
+                response["ETag"] = etag
+                if last_modified is not None:
+                    response["Last-Modified"] = http_date(last_modified.timestamp())
+            if key is not None:
+                self._response_cache_key = key
+                response["X-Cache"] = "MISS"
+        return response
+
+    def handle_exception(self, exc):
+        if isinstance(exc, TransitionError):
+            exc = StatusConflict(str(exc))
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, "_response_cache_key", None)
+        if key is not None:
+            store_response(key, response, self.cache_timeout)
+        return response
+
+    def get_filtered_queryset(self):
+        """Return ``filter_queryset(get_queryset())``, built once per request."""
+
+        queryset = getattr(self, "_filtered_queryset", None)
+        if queryset is None:
+            queryset = self._filtered_queryset = self.filter_queryset(
+                self.get_queryset()
+            )
+        return queryset
+
+    def retrieve(self, request: Request, *args, **kwargs):  # type: ignore[override]
+        render = partial(super().retrieve, request, *args, **kwargs)
+
+        def get_validators():
+            return self.get_detail_validators(self.get_filtered_queryset(), kwargs)
+
+        return self._conditional_read(request, kwargs, render, get_validators)
+
+    def list(self, request: Request, *args, **kwargs):  # type: ignore[override]
+        def get_validators():
+            return self.get_list_validators(self.get_filtered_queryset())
+
+        return self._conditional_read(request, kwargs, self._list, get_validators)
+
+    def _list(self):
+        queryset = self.get_filtered_queryset()
+        columns = self._lean_list_columns()
+        if columns is not None:
+            serializer_class = self.get_serializer_class()
+            rows = self._lean_queryset(queryset, columns)
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(serializer_class.render_rows(page))
+            return Response(serializer_class.render_rows(rows))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def _lean_list_columns(self) -> Sequence[str] | None:
+        """Return the ``values()`` columns for a lean list, if it applies."""
+
+        if not self.lean_list:
+            return None
+        serializer_class = self.get_serializer_class()
+        get_value_columns = getattr(serializer_class, "get_value_columns", None)
+        if get_value_columns is None:
+            return None
+        return get_value_columns()
+
+    def _lean_queryset(self, queryset, columns: Sequence[str]):
+        """Reduce ``queryset`` to ``values()`` rows carrying ``columns``.
+
+        Joins only needed for rendering instances are dropped. Ordering columns
+        are kept on the rows so cursor pagination can read page positions.
+        """
+
+        opts = queryset.model._meta
+        ordering = (
+            *queryset.query.order_by,
+            *(getattr(self, "ordering", None) or ()),
+            *opts.ordering,
+        )
+        extra = [opts.pk.attname]
+        for term in ordering:
+            if not isinstance(term, str):
+                continue
+            try:
+                field = opts.get_field(term.lstrip("-"))
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                extra.append(field.attname)
+
+        return (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .values(*dict.fromkeys([*columns, *extra]))
+        )
+
 
 class UserViewSet(AutoModelViewSet):
     """Viewset for user accounts."""
@@ -139,7 +517,32 @@ class UserViewSet(AutoModelViewSet):
     search_fields = ("email", "full_name")
 
 
-class BusinessProfileViewSet(AutoModelViewSet):
+FAN_OUT_RESPONSE = inline_serializer(
+    name="FanOutResponse", fields={"task": serializers.CharField()}
+)
+
+
+MARK_READ_RESPONSE = inline_serializer(
+    name="MarkReadResponse", fields={"marked": serializers.IntegerField()}
+)
+
+
+def _fan_out(request: Request, business_id: int | None = None) -> Response:
+    """Validate a :class:`BroadcastSerializer` body and queue its fan-out.
+
+    The recipients are the customers of ``business_id``, or every active
+    user; the task creates and delivers their notifications in chunks.
+    """
+
+    message = BroadcastSerializer(data=request.data)
+    message.is_valid(raise_exception=True)
+    task = fan_out_notifications.delay(
+        **message.validated_data, business_id=business_id
+    )
+    return Response({"task": task.id}, status=status.HTTP_202_ACCEPTED)
+
+
+class BusinessProfileViewSet(BulkModelMixin, AutoModelViewSet):
     """Viewset for business profiles."""
 
     model = BusinessProfile
@@ -148,18 +551,144 @@ class BusinessProfileViewSet(AutoModelViewSet):
         "owner",
         "name",
         "description",
+        "timezone",
         "created_at",
         "updated_at",
     )
     serializer_read_only_fields = ("owner",)
     select_related = ("owner",)
     search_fields = ("name", "description", "owner__email")
+    cache_timeout = 300
+    query_budget = {**AutoModelViewSet.query_budget, "calendar": 3, "rollups": 4}
+
+    def get_create_kwargs(self) -> dict[str, object]:
+        return {"owner": self.request.user}
+
+    @extend_schema(
+        parameters=[AvailabilityQuerySerializer],
+        responses=AvailabilitySerializer,
+    )
+    @action(detail=True, methods=["get"], url_path="availability")
+    def availability(self, request: Request, *args, **kwargs):
+        """List the free start times for a service over a range of days."""
+
+        business = self.get_object()
+        query = AvailabilityQuerySerializer(
+            data=request.query_params, context={"business": business}
+        )
+        query.is_valid(raise_exception=True)
+        service = query.validated_data["service"]
+        step = query.validated_data["step"]
+        slots = find_slots(
+            business, service, query.validated_data["days"], step_minutes=step
+        )
+        payload = {
+            "business": business.pk,
+            "service": service.pk,
+            "timezone": business.timezone,
+            "duration_minutes": service.duration_minutes,
+            "step_minutes": step,
+            "days": [
+                {"date": day, "slots": [vars(slot) for slot in day_slots]}
+                for day, day_slots in slots.items()
+            ],
+        }
+        return Response(AvailabilitySerializer(payload).data)
+
+    @extend_schema(
+        parameters=[CalendarQuerySerializer],
+        responses=CalendarSerializer,
+    )
+    @action(detail=True, methods=["get"], url_path="calendar")
+    def calendar(self, request: Request, *args, **kwargs):
+        """Summarise and list a business's appointments for each local day."""
+
+        business = self.get_object()
+        if not (request.user.is_staff or business.owner_id == request.user.pk):
+            raise PermissionDenied
+        query = CalendarQuerySerializer(
+            data=request.query_params, context={"business": business}
+        )
+        query.is_valid(raise_exception=True)
+        payload = {
+            "business": business.pk,
+            "timezone": business.timezone,
+            "days": build_calendar(business, query.validated_data["days"]),
+        }
+        return Response(CalendarSerializer(payload).data)
+
+    @extend_schema(
+        parameters=[RollupQuerySerializer],
+        responses=RollupsSerializer,
+    )
+    @action(detail=True, methods=["get"], url_path="rollups")
+    def rollups(self, request: Request, *args, **kwargs):
+        """Report bookings and completed-payment revenue per local day."""
+
+        business = self.get_object()
+        if not (request.user.is_staff or business.owner_id == request.user.pk):
+            raise PermissionDenied
+        query = RollupQuerySerializer(
+            data=request.query_params, context={"business": business}
+        )
+        query.is_valid(raise_exception=True)
+        payload = {
+            "business": business.pk,
+            "timezone": business.timezone,
+            **build_rollups(business, query.validated_data["days"]),
+        }
+        return Response(RollupsSerializer(payload).data)
+
+    @extend_schema(request=BroadcastSerializer, responses=FAN_OUT_RESPONSE)
+    @action(detail=True, methods=["post"], url_path="notify-customers")
+    def notify_customers(self, request: Request, *args, **kwargs):
+        """Notify every customer who has booked with the business."""
+
+        business = self.get_object()
+        if not (request.user.is_staff or business.owner_id == request.user.pk):
+            raise PermissionDenied
+        return _fan_out(request, business.pk)
+
+
+class OpeningHoursViewSet(AutoModelViewSet):
+    """Viewset for the weekly opening hours of a business."""
+
+    model = OpeningHours
+    serializer_fields = (
+        "id",
+        "business",
+        "weekday",
+        "opens_at",
+        "closes_at",
+        "created_at",
+        "updated_at",
+    )
+
+    def get_queryset(self):  # type: ignore[override]
+        queryset = super().get_queryset()
+        user = self.request.user
+        if getattr(user, "is_staff", False):
+            return queryset
+        return queryset.filter(business__owner=user)
+
+    def _check_business(self, serializer) -> None:
+        business = serializer.validated_data.get("business")
+        if business is None:
+            business = serializer.instance.business
+        user = self.request.user
+        if not (user.is_staff or business.owner_id == user.pk):
+            raise PermissionDenied
 
     def perform_create(self, serializer):  # type: ignore[override]
-        serializer.save(owner=self.request.user)
+        self._check_business(serializer)
+        super().perform_create(serializer)
+
+    def perform_update(self, serializer):  # type: ignore[override]
+        self._check_business(serializer)
+        super().perform_update(serializer)
 
 
-class ServiceViewSet(AutoModelViewSet):
+class ServiceViewSet(BulkModelMixin, AutoModelViewSet):
     """Viewset for services offered by businesses."""
 
     model = Service
@@ -174,6 +703,7 @@ class ServiceViewSet(AutoModelViewSet):
     )
     select_related = ("business",)
     search_fields = ("name", "description", "business__name")
+    cache_timeout = 300
 
     def get_queryset(self):  # type: ignore[override]
         queryset = super().get_queryset()
@@ -183,7 +713,7 @@ class ServiceViewSet(AutoModelViewSet):
         return queryset.filter(business__owner=user)
 
 
-class ListingViewSet(AutoModelViewSet):
+class ListingViewSet(BulkModelMixin, AutoModelViewSet):
     """Viewset for marketplace listings."""
 
     model = Listing
@@ -201,6 +731,7 @@ class ListingViewSet(AutoModelViewSet):
         "service__name",
         "business__name",
     )
+    cache_timeout = 300
 
     def get_queryset(self):  # type: ignore[override]
         queryset = super().get_queryset()
@@ -210,7 +741,7 @@ class ListingViewSet(AutoModelViewSet):
         return queryset.filter(business__owner=user)
 
 
-class AppointmentViewSet(AutoModelViewSet):
+class AppointmentViewSet(BulkModelMixin, AutoModelViewSet):
     """Viewset for appointments."""
 
     model = Appointment
@@ -220,13 +751,16 @@ class AppointmentViewSet(AutoModelViewSet):
         "business",
         "service",
         "scheduled_for",
+        "ends_at",
         "status",
         "notes",
         "created_at",
         "updated_at",
     )
+    serializer_read_only_fields = ("status",)
     select_related = ("customer", "business", "service")
     search_fields = ("customer__email", "status", "business__name", "service__name")
+    lean_list = True
 
     def get_queryset(self):  # type: ignore[override]
         queryset = super().get_queryset()
@@ -235,6 +769,36 @@ class AppointmentViewSet(AutoModelViewSet):
             return queryset
         return queryset.filter(customer=user)
 
+    def handle_exception(self, exc):
+        # Overlaps are caught by Appointment.claim_slots(), or on PostgreSQL by
+        # the exclusion constraint when two bookings race past that check.
+        if isinstance(exc, SlotUnavailable) or (
+            isinstance(exc, IntegrityError) and is_overlap_violation(exc)
+        ):
+            exc = SlotConflict()
+        return super().handle_exception(exc)
+
+    @extend_schema(request=build_transition_serializer(Appointment))
+    @action(detail=True, methods=["post"], url_path="transition")
+    def transition(self, request: Request, *args, **kwargs):
+        """Move the appointment to another status, such as ``cancelled``."""
+
+        appointment = self.get_object()
+        serializer = build_transition_serializer(Appointment)(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        appointment.transition_to(serializer.validated_data["status"])
+        return Response(self.get_serializer(appointment).data)
+
+    def prepare_bulk_instances(self, instances):
+        fields = Appointment.set_ends_at(instances)
+        Appointment.claim_slots(instances)
+        return fields
+
+    def after_bulk_write(self, instances, using):
+        super().after_bulk_write(instances, using)
+        forget_appointments(instances, using)
+        touch_appointments(instances, using)
+
 
 class PaymentTransactionViewSet(AutoModelViewSet):
     """Viewset for payment transactions."""
@@ -247,30 +811,119 @@ class PaymentTransactionViewSet(AutoModelViewSet):
         "currency",
         "status",
         "external_reference",
+        "capture_key",
         "created_at",
         "updated_at",
     )
-    serializer_read_only_fields = ("status", "external_reference")
+    serializer_read_only_fields = ("status", "external_reference", "capture_key")
     select_related = ("appointment",)
     search_fields = ("status", "currency", "appointment__customer__email")
-    gateway_class = MockPaymentGateway
-
-    def perform_create(self, serializer):  # type: ignore[override]
-        serializer.save(status="pending")
 
+    def get_create_kwargs(self) -> dict[str, object]:
+        return {"status": PaymentStatus.PENDING}
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "Idempotency-Key",
+                str,
+                OpenApiParameter.HEADER,
+                description=(
+                    "Capture in the background and answer 202; repeated requests "
+                    "with the same key join the first one."
+                ),
+            )
+        ],
+    )
     @action(detail=True, methods=["post"], url_path="capture")
     def capture(self, request: Request, *args, **kwargs):
+        """Charge the payment now, or in the background given an idempotency key."""
+
         payment = self.get_object()
-        gateway = self.gateway_class()
-        result = gateway.charge(
+        key = request.headers.get("Idempotency-Key")
+        if key is not None:
+            return self._capture_async(payment, key.strip())
+        if not payment.can_transition(PaymentStatus.COMPLETED):
+            raise TransitionError(payment.status, PaymentStatus.COMPLETED)
+        result = get_payment_gateway().charge(
             amount=payment.amount,
             currency=payment.currency,
             metadata={"reference": str(payment.pk)},
         )
-        payment.mark_completed(result.reference)
+        payment.transition_to(result.status, external_reference=result.reference)
         serializer = self.get_serializer(payment)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        request=None,
+        responses=inline_serializer(
+            name="BulkCaptureResponse",
+            fields={
+                "batch": serializers.CharField(),
+                "chunks": serializers.IntegerField(),
+                "payments": serializers.IntegerField(),
+            },
+        ),
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-capture")
+    def bulk_capture(self, request: Request, *args, **kwargs):
+        """Queue every unclaimed pending payment for capture in batches (staff)."""
+
+        if not request.user.is_staff:
+            raise PermissionDenied
+        batch = f"bulk-{uuid.uuid4().hex}"
+        chunk_size = settings.PAYMENT_BULK_CAPTURE_CHUNK
+        chunks = payments = 0
+        while True:
+            key = f"{batch}:{chunks}"
+            claimed = PaymentTransaction.objects.claim_pending(key, chunk_size)
+            if not claimed:
+                break
+            transaction.on_commit(partial(capture_payment_batch.delay, key))
+            chunks += 1
+            payments += claimed
+            if claimed < chunk_size:
+                break
+        return Response(
+            {"batch": batch, "chunks": chunks, "payments": payments},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    def _capture_async(self, payment: PaymentTransaction, key: str) -> Response:
+        """Claim the payment's capture for ``key`` and queue it once.
+
+        The claim is a conditional ``UPDATE``, so of concurrent requests only
+        one enqueues the task. Requests repeating the key get the payment's
+        current state; another key gets ``409`` while the payment is pending.
+        """
+
+        if not key or len(key) > 255:
+            raise ValidationError(
+                {"Idempotency-Key": ["Send a key of 1 to 255 characters."]}
+            )
+        with transaction.atomic():
+            claimed = PaymentTransaction.objects.filter(
+                pk=payment.pk, status=PaymentStatus.PENDING, capture_key=""
+            ).update(capture_key=key, updated_at=timezone.now())
+            if claimed:
+                transaction.on_commit(lambda: capture_payment.delay(payment.pk, key))
+        payment.refresh_from_db()
+        if payment.capture_key != key:
+            if payment.can_transition(PaymentStatus.COMPLETED):
+                raise CaptureInProgress
+            raise TransitionError(payment.status, PaymentStatus.COMPLETED)
+
+        location = self.reverse_action("detail", args=[payment.pk])
+        return Response(
+            self.get_serializer(payment).data,
+            status=(
+                status.HTTP_202_ACCEPTED
+                if payment.status == PaymentStatus.PENDING
+                else status.HTTP_200_OK
+            ),
+            headers={"Location": location},
+        )
+
 
 class NotificationViewSet(AutoModelViewSet):
     """Viewset for user notifications."""
@@ -288,7 +941,10 @@ class NotificationViewSet(AutoModelViewSet):
     serializer_read_only_fields = ("read_at",)
     select_related = ("recipient",)
     search_fields = ("subject", "body", "recipient__email")
+    pagination_class = KeysetPagination
+    lean_list = True
     notification_service_class = MockNotificationService
+    query_budget = {**AutoModelViewSet.query_budget, "unread_count": 2}
 
     def get_queryset(self):  # type: ignore[override]
         queryset = super().get_queryset()
@@ -297,6 +953,46 @@ class NotificationViewSet(AutoModelViewSet):
             return queryset
         return queryset.filter(recipient=user)
 
+    @extend_schema(
+        responses=inline_serializer(
+            name="UnreadCountResponse", fields={"unread": serializers.IntegerField()}
+        )
+    )
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request: Request, *args, **kwargs):
+        """Return the number of the user's unread notifications."""
+
+        return Response({"unread": UnreadCount.for_user(request.user.pk)})
+
+    @extend_schema(request=None, responses=MARK_READ_RESPONSE)
+    @action(detail=False, methods=["post"], url_path="mark-all-read")
+    def mark_all_read(self, request: Request, *args, **kwargs):
+        """Mark every unread notification of the user read."""
+
+        marked = Notification.objects.mark_read(request.user.pk)
+        return Response({"marked": marked})
+
+    @extend_schema(request=MarkReadSerializer, responses=MARK_READ_RESPONSE)
+    @action(detail=False, methods=["post"], url_path="mark-read")
+    def mark_read(self, request: Request, *args, **kwargs):
+        """Mark the listed notifications of the user read; others are ignored."""
+
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        marked = Notification.objects.mark_read(
+            request.user.pk, serializer.validated_data["ids"]
+        )
+        return Response({"marked": marked})
+
+    @extend_schema(request=BroadcastSerializer, responses=FAN_OUT_RESPONSE)
+    @action(detail=False, methods=["post"], url_path="broadcast")
+    def broadcast(self, request: Request, *args, **kwargs):
+        """Notify every active user (staff)."""
+
+        if not request.user.is_staff:
+            raise PermissionDenied
+        return _fan_out(request)
+
     @action(detail=False, methods=["post"], url_path="send-test")
     def send_test_notification(self, request: Request, *args, **kwargs):
         notification_service = self.notification_service_class()
@@ -0,0 +1,49 @@
+"""Authentication for websocket connections.
+
+Browsers cannot set headers on a websocket handshake, so the access token
+from ``/api/v1/auth/jwt/create/`` is read from the ``token`` query parameter
+and, for other clients, from an ``Authorization: Bearer`` header.
+"""
+
+from __future__ import annotations
+
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+__all__ = ["JWTAuthMiddleware"]
+
+
+def _raw_token(scope) -> str | None:
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    if query.get("token"):
+        return query["token"][0]
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token
+    return None
+
+
+@database_sync_to_async
+def _authenticate(raw_token: str | None):
+    if not raw_token:
+        return AnonymousUser()
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Set ``scope["user"]`` from a simplejwt access token, or anonymous."""
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope, user=await _authenticate(_raw_token(scope)))
+        return await super().__call__(scope, receive, send)
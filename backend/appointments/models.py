@@ -2,15 +2,114 @@
 
 from __future__ import annotations
 
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.fields import (
+    DateTimeRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
+from django.db import IntegrityError, connections, models, router, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
 from business.models import BusinessProfile
-from common.models import TimeStampedModel
-from services.models import Service
+from common.constraints import PostgresExclusionConstraint
+from common.fields import ChoiceCodeField
+from common.models import StatusMachineMixin, TimeStampedModel
+from services.models import MAX_DURATION_MINUTES, Service
+
+
+class AppointmentStatus(models.TextChoices):
+    # Stored as the member's position: append new statuses at the end.
+    SCHEDULED = "scheduled", _("Scheduled")
+    COMPLETED = "completed", _("Completed")
+    CANCELLED = "cancelled", _("Cancelled")
+
+
+# Statuses that no longer hold their time slot.
+RELEASED_STATUSES = (AppointmentStatus.CANCELLED,)
+# No appointment is longer than this, which bounds overlap scans.
+MAX_LENGTH = timedelta(minutes=MAX_DURATION_MINUTES)
+OVERLAP_CONSTRAINT = "appt_no_overlap"
+
+
+class SlotUnavailable(Exception):
+    """Raised when appointments overlap bookings that still hold their slot."""
+
+    def __init__(self, appointments: Sequence[Appointment]):
+        super().__init__("The requested time slot is already booked.")
+        self.appointments = list(appointments)
+
+
+def is_overlap_violation(exc: IntegrityError) -> bool:
+    """Return whether ``exc`` comes from the PostgreSQL overlap constraint."""
+
+    return OVERLAP_CONSTRAINT in str(exc)
+
+
+@contextmanager
+def translate_overlaps(appointments: Sequence[Appointment]) -> Iterator[None]:
+    """Re-raise overlap constraint violations as :class:`SlotUnavailable`."""
+
+    try:
+        yield
+    except IntegrityError as exc:
+        if is_overlap_violation(exc):
+            raise SlotUnavailable(appointments) from exc
+        raise
+
+
+class TsTzRange(models.Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+class AppointmentQuerySet(models.QuerySet):
+    def holding_slots(self):
+        return self.exclude(status__in=RELEASED_STATUSES)
+
+    def upcoming(self, now: datetime | None = None):
+        """Return scheduled appointments from ``now`` on, soonest first.
+
+        Served by the partial ``appt_upcoming_idx``, which holds only
+        scheduled rows, so the queue does not scan past or closed bookings.
+        """
+
+        return self.filter(
+            status=AppointmentStatus.SCHEDULED,
+            scheduled_for__gte=now or timezone.now(),
+        ).order_by("scheduled_for", "pk")
+
+    def overlapping(self, start: datetime, end: datetime):
+        """Return rows whose ``[scheduled_for, ends_at)`` overlaps ``[start, end)``.
+
+        The lower bound on ``scheduled_for`` is implied by :data:`MAX_LENGTH`
+        but keeps the index range scan from starting at the first booking.
+        """
 
+        return self.filter(
+            scheduled_for__gte=start - MAX_LENGTH,
+            scheduled_for__lt=end,
+            ends_at__gt=start,
+        )
+
+
+class Appointment(StatusMachineMixin, TimeStampedModel):
+    Status = AppointmentStatus
+    RELEASED_STATUSES = RELEASED_STATUSES
+    TRANSITIONS = {
+        AppointmentStatus.SCHEDULED: {
+            AppointmentStatus.COMPLETED,
+            AppointmentStatus.CANCELLED,
+        },
+        AppointmentStatus.CANCELLED: {AppointmentStatus.SCHEDULED},
+    }
 
-class Appointment(TimeStampedModel):
     customer = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="appointments"
     )
@@ -21,8 +120,210 @@ class Appointment(TimeStampedModel):
         Service, on_delete=models.CASCADE, related_name="appointments"
     )
     scheduled_for = models.DateTimeField()
-    status = models.CharField(max_length=50, default="scheduled")
+    # Fixed from the service duration at booking time, so later changes to the
+    # service do not move existing appointments.
+    ends_at = models.DateTimeField(editable=False)
+    status = ChoiceCodeField(
+        choices_enum=AppointmentStatus, default=AppointmentStatus.SCHEDULED
+    )
     notes = models.TextField(blank=True)
 
+    objects = AppointmentQuerySet.as_manager()
+
+    class Meta(TimeStampedModel.Meta):
+        constraints = [
+            # Other databases lock the business row instead; see claim_slots().
+            PostgresExclusionConstraint(
+                name=OVERLAP_CONSTRAINT,
+                expressions=[
+                    ("business", RangeOperators.EQUAL),
+                    (
+                        TsTzRange("scheduled_for", "ends_at", RangeBoundary()),
+                        RangeOperators.OVERLAPS,
+                    ),
+                ],
+                condition=~models.Q(status__in=RELEASED_STATUSES),
+                violation_error_message="The requested time slot is already booked.",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["customer", "-created_at"], name="appt_customer_created_idx"
+            ),
+            models.Index(
+                fields=["business", "-created_at"], name="appt_business_created_idx"
+            ),
+            models.Index(
+                fields=["business", "scheduled_for", "ends_at"],
+                name="appt_business_span_idx",
+            ),
+            models.Index(
+                fields=["scheduled_for", "id"],
+                condition=models.Q(status=AppointmentStatus.SCHEDULED),
+                name="appt_upcoming_idx",
+            ),
+        ]
+
     def __str__(self) -> str:  # pragma: no cover
         return f"Appointment for {self.customer} on {self.scheduled_for:%Y-%m-%d %H:%M}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_span = instance.span
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+    @property
+    def span(self) -> tuple:
+        """Return ``(business_id, service_id, scheduled_for, ends_at)`` as loaded.
+
+        Deferred columns read as ``None`` instead of triggering a query.
+        """
+
+        values = self.__dict__
+        return tuple(
+            values.get(name)
+            for name in ("business_id", "service_id", "scheduled_for", "ends_at")
+        )
+
+    def _needs_new_end(self) -> bool:
+        loaded = getattr(self, "_loaded_span", None)
+        if self._state.adding or loaded is None or loaded[3] is None:
+            return True
+        return loaded[1:3] != self.span[1:3]
+
+    @classmethod
+    def set_ends_at(cls, appointments: Iterable[Appointment]) -> list[str]:
+        """Derive ``ends_at`` where the start or service changed.
+
+        Durations of services not already loaded on the instances are read in
+        one query. Returns ``["ends_at"]`` when any instance changed, for use
+        as ``update_fields``.
+        """
+
+        stale = [
+            appointment for appointment in appointments if appointment._needs_new_end()
+        ]
+        if not stale:
+            return []
+        missing = {
+            appointment.service_id
+            for appointment in stale
+            if not cls.service.is_cached(appointment)
+        }
+        durations = dict(
+            Service.objects.filter(pk__in=missing).values_list("pk", "duration_minutes")
+            if missing
+            else ()
+        )
+        for appointment in stale:
+            if cls.service.is_cached(appointment):
+                minutes = appointment.service.duration_minutes
+            else:
+                minutes = durations[appointment.service_id]
+            appointment.ends_at = appointment.scheduled_for + timedelta(minutes=minutes)
+        return ["ends_at"]
+
+    def _claims_new_slot(self) -> bool:
+        if self.status in RELEASED_STATUSES:
+            return False
+        if getattr(self, "_loaded_span", None) != self.span:
+            return True
+        return getattr(self, "_loaded_status", None) in RELEASED_STATUSES
+
+    @classmethod
+    def claim_slots(
+        cls, appointments: Iterable[Appointment], using: str | None = None
+    ) -> None:
+        """Raise :class:`SlotUnavailable` if any appointment overlaps a booking.
+
+        Appointments are checked against stored bookings (other than
+        themselves) and against each other, with one query per call. Call it
+        in the transaction that writes them: except on PostgreSQL, where the
+        exclusion constraint settles races, the businesses' rows are locked
+        first so concurrent bookings for a business check and write in turn.
+        """
+
+        by_business: dict[int, list[Appointment]] = defaultdict(list)
+        for appointment in appointments:
+            if appointment.status not in RELEASED_STATUSES:
+                by_business[appointment.business_id].append(appointment)
+        if not by_business:
+            return
+
+        using = using or router.db_for_write(cls)
+        if connections[using].vendor != "postgresql":
+            list(
+                BusinessProfile.objects.using(using)
+                .select_for_update()
+                .filter(pk__in=by_business)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+
+        window = models.Q()
+        for business_id, group in by_business.items():
+            start = min(appointment.scheduled_for for appointment in group)
+            end = max(appointment.ends_at for appointment in group)
+            window |= models.Q(business_id=business_id) & models.Q(
+                scheduled_for__gte=start - MAX_LENGTH,
+                scheduled_for__lt=end,
+                ends_at__gt=start,
+            )
+        own = [
+            appointment.pk for group in by_business.values() for appointment in group
+        ]
+        booked: dict[int, list[tuple[datetime, datetime, None]]] = defaultdict(list)
+        for business_id, start, end in (
+            cls._default_manager.using(using)
+            .filter(window)
+            .holding_slots()
+            .exclude(pk__in=[pk for pk in own if pk is not None])
+            .values_list("business_id", "scheduled_for", "ends_at")
+        ):
+            booked[business_id].append((start, end, None))
+
+        clashing: set[int] = set()
+        for business_id, group in by_business.items():
+            spans = booked[business_id] + [
+                (appointment.scheduled_for, appointment.ends_at, appointment)
+                for appointment in group
+            ]
+            spans.sort(key=lambda span: span[0])
+            latest_end, latest = None, None
+            for start, end, appointment in spans:
+                if latest_end is not None and start < latest_end:
+                    for candidate in (appointment, latest):
+                        if candidate is not None:
+                            clashing.add(id(candidate))
+                if latest_end is None or end > latest_end:
+                    latest_end, latest = end, appointment
+        if clashing:
+            raise SlotUnavailable(
+                [
+                    appointment
+                    for group in by_business.values()
+                    for appointment in group
+                    if id(appointment) in clashing
+                ]
+            )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.set_ends_at([self])
+        elif {"scheduled_for", "service", "service_id"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, *self.set_ends_at([self])}
+
+        if self._claims_new_slot():
+            using = kwargs.get("using") or router.db_for_write(
+                type(self), instance=self
+            )
+            with translate_overlaps([self]), transaction.atomic(using=using):
+                self.claim_slots([self], using)
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._loaded_span = self.span
+        self._loaded_status = self.status
@@ -16,6 +16,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "business",
             "service",
             "scheduled_for",
+            "ends_at",
             "status",
             "notes",
             "created_at",
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BusinessConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "business"
+
+    def ready(self):
+        from business.rollups import connect_signals
+
+        connect_signals()
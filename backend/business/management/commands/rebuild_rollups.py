@@ -0,0 +1,33 @@
+"""Recompute the per-day booking and revenue rollups from scratch."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from business.rollups import REBUILD_CHUNK_SIZE, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily booking and revenue rollups of every business, or "
+        "of the given ones, from their appointments and payments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--business",
+            type=int,
+            action="append",
+            dest="businesses",
+            help="Only rebuild this business; may be repeated.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=REBUILD_CHUNK_SIZE,
+            help="Businesses rebuilt per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_rollups(options["businesses"], chunk_size=options["chunk_size"])
+        self.stdout.write(f"Rebuilt the rollups of {count} businesses.")
@@ -2,18 +2,149 @@
 
 from __future__ import annotations
 
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
 from common.models import TimeStampedModel
 
 
+def validate_timezone(value: str) -> None:
+    """Reject names that are not IANA time zones."""
+
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(
+            _("%(value)s is not a known time zone."), params={"value": value}
+        )
+
+
 class BusinessProfile(TimeStampedModel):
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="businesses"
     )
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
+    timezone = models.CharField(
+        max_length=64, default="UTC", validators=[validate_timezone]
+    )
+
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["owner", "-created_at"], name="business_owner_created_idx"
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_timezone = instance.__dict__.get("timezone")
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_timezone = self.timezone
+
+    @property
+    def tzinfo(self) -> ZoneInfo:
+        return ZoneInfo(self.timezone)
+
+
+class OpeningHours(TimeStampedModel):
+    """A window during which a business takes appointments on one weekday.
+
+    Times are wall-clock times in the business's time zone. A day may have
+    several windows (a lunch break splits it in two); hours past midnight are
+    entered as a second window on the following weekday.
+    """
+
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, _("Monday")
+        TUESDAY = 1, _("Tuesday")
+        WEDNESDAY = 2, _("Wednesday")
+        THURSDAY = 3, _("Thursday")
+        FRIDAY = 4, _("Friday")
+        SATURDAY = 5, _("Saturday")
+        SUNDAY = 6, _("Sunday")
+
+    business = models.ForeignKey(
+        BusinessProfile, on_delete=models.CASCADE, related_name="opening_hours"
+    )
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices)
+    opens_at = models.TimeField()
+    closes_at = models.TimeField()
+
+    class Meta:
+        ordering = ("weekday", "opens_at")
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(closes_at__gt=models.F("opens_at")),
+                name="opening_hours_closes_after_opens",
+                violation_error_message=_("Closing time must be after opening time."),
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["business", "weekday"], name="hours_business_day_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.business} {self.get_weekday_display()} {self.opens_at}-{self.closes_at}"
+
+
+class DailyBookings(models.Model):
+    """Appointments holding a slot for one business on one local day.
+
+    Derived from appointments by :mod:`business.rollups`; never edit directly.
+    """
+
+    business = models.ForeignKey(
+        BusinessProfile, on_delete=models.CASCADE, related_name="daily_bookings"
+    )
+    day = models.DateField()
+    bookings = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ("business", "day")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["business", "day"], name="rollup_bookings_day_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.business_id} {self.day}: {self.bookings}"
+
+
+class DailyRevenue(models.Model):
+    """Completed payments for one business's appointments on one local day.
+
+    There is one row per currency. Derived by :mod:`business.rollups`.
+    """
+
+    business = models.ForeignKey(
+        BusinessProfile, on_delete=models.CASCADE, related_name="daily_revenue"
+    )
+    day = models.DateField()
+    currency = models.CharField(max_length=10)
+    payments = models.PositiveIntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        ordering = ("business", "day", "currency")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["business", "day", "currency"],
+                name="rollup_revenue_day_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.business_id} {self.day}: {self.revenue} {self.currency}"
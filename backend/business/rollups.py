@@ -0,0 +1,316 @@
+"""Per-business, per-day booking and revenue rollups.
+
+:class:`~business.models.DailyBookings` counts the appointments holding a
+slot on each local day of a business, and :class:`~business.models.
+DailyRevenue` sums the completed payments for those days' appointments per
+currency. Dashboards read them in O(days) instead of aggregating every
+transaction.
+
+Writes keep them current: saving or deleting an appointment or a completed
+payment marks the local days it touched, and after commit those days are
+recomputed from the source rows under a lock on the business rows, so
+concurrent writers serialise and the last recompute sees every commit.
+Changing a business's time zone rebuilds all of its days after commit.
+Writes that send no signals (``bulk_update``, ``QuerySet.update``) call
+:func:`touch_appointments`/:func:`touch_payments` themselves, and
+:func:`rebuild_rollups` recomputes everything in bulk.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import partial
+from itertools import groupby
+from zoneinfo import ZoneInfo
+
+from django.db import router, transaction
+from django.db.models import BigIntegerField, Count, F, Q, Sum
+from django.db.models.functions import Cast, Round, TruncDate
+from django.db.models.signals import post_delete, post_save
+
+from appointments.models import RELEASED_STATUSES, Appointment
+from business.models import BusinessProfile, DailyBookings, DailyRevenue
+from payments.adapters import PaymentStatus
+from payments.models import PaymentTransaction
+
+__all__ = [
+    "connect_signals",
+    "rebuild_rollups",
+    "refresh_days",
+    "touch_appointments",
+    "touch_payments",
+]
+
+REBUILD_CHUNK_SIZE = 200
+WRITE_BATCH_SIZE = 1000
+
+# Revenue is summed in whole cents: SQLite adds decimals as floats but
+# integers exactly. ``amount`` has two decimal places.
+_CENTS = Sum(Cast(Round(F("amount") * 100), BigIntegerField()))
+
+
+def _day_bounds(day: date, tzinfo: ZoneInfo) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min, tzinfo=tzinfo)
+    return start, datetime.combine(day + timedelta(days=1), time.min, tzinfo=tzinfo)
+
+
+def _window(
+    businesses: Mapping[int, Iterable[date] | None], tzinfo: ZoneInfo, prefix: str = ""
+) -> Q:
+    """Match appointments of ``businesses`` on their listed days, or all days."""
+
+    window = Q()
+    for business_id, days in businesses.items():
+        match = Q(**{f"{prefix}business_id": business_id})
+        if days is not None:
+            spans = Q()
+            for day in days:
+                start, end = _day_bounds(day, tzinfo)
+                spans |= Q(
+                    **{
+                        f"{prefix}scheduled_for__gte": start,
+                        f"{prefix}scheduled_for__lt": end,
+                    }
+                )
+            match &= spans
+        window |= match
+    return window
+
+
+def _recompute(
+    businesses: Mapping[int, Iterable[date] | None], tzname: str, using: str
+) -> None:
+    """Replace the rollups of ``businesses`` in one time zone.
+
+    Each business maps to the local days to recompute, or ``None`` for all of
+    them. Costs one grouped query per rollup table.
+    """
+
+    if not businesses:
+        return
+    tzinfo = ZoneInfo(tzname)
+    bookings = (
+        Appointment.objects.using(using)
+        .filter(_window(businesses, tzinfo))
+        .exclude(status__in=RELEASED_STATUSES)
+        .annotate(day=TruncDate("scheduled_for", tzinfo=tzinfo))
+        .values("business_id", "day")
+        .annotate(bookings=Count("pk"))
+        .order_by()
+    )
+    revenue = (
+        PaymentTransaction.objects.using(using)
+        .filter(
+            _window(businesses, tzinfo, "appointment__"), status=PaymentStatus.COMPLETED
+        )
+        .annotate(
+            business_id=F("appointment__business_id"),
+            day=TruncDate("appointment__scheduled_for", tzinfo=tzinfo),
+        )
+        .values("business_id", "day", "currency")
+        .annotate(payments=Count("pk"), cents=_CENTS)
+        .order_by()
+    )
+
+    stale = Q()
+    for business_id, days in businesses.items():
+        match = Q(business_id=business_id)
+        if days is not None:
+            match &= Q(day__in=list(days))
+        stale |= match
+    DailyBookings.objects.using(using).filter(stale).delete()
+    DailyRevenue.objects.using(using).filter(stale).delete()
+    DailyBookings.objects.using(using).bulk_create(
+        (DailyBookings(**row) for row in bookings.iterator()),
+        batch_size=WRITE_BATCH_SIZE,
+    )
+    DailyRevenue.objects.using(using).bulk_create(
+        (
+            DailyRevenue(
+                business_id=row["business_id"],
+                day=row["day"],
+                currency=row["currency"],
+                payments=row["payments"],
+                revenue=Decimal(row["cents"]).scaleb(-2),
+            )
+            for row in revenue.iterator()
+        ),
+        batch_size=WRITE_BATCH_SIZE,
+    )
+
+
+def _locked_timezones(business_ids: Iterable[int], using: str) -> dict[int, str]:
+    return dict(
+        BusinessProfile.objects.using(using)
+        .select_for_update()
+        .filter(pk__in=sorted(business_ids))
+        .order_by("pk")
+        .values_list("pk", "timezone")
+    )
+
+
+def _by_timezone(timezones: Mapping[int, str]) -> Iterable[tuple[str, list[int]]]:
+    ordered = sorted(timezones, key=lambda business_id: timezones[business_id])
+    for tzname, group in groupby(ordered, key=timezones.__getitem__):
+        yield tzname, list(group)
+
+
+def refresh_days(
+    instants: Iterable[tuple[int, datetime]], using: str | None = None
+) -> None:
+    """Recompute the local days holding each ``(business id, instant)`` pair."""
+
+    using = using or router.db_for_write(DailyBookings)
+    instants = list(instants)
+    if not instants:
+        return
+    with transaction.atomic(using=using):
+        timezones = _locked_timezones({pk for pk, _at in instants}, using)
+        days: dict[int, set[date]] = defaultdict(set)
+        for business_id, at in instants:
+            if business_id in timezones:
+                tzinfo = ZoneInfo(timezones[business_id])
+                days[business_id].add(at.astimezone(tzinfo).date())
+        for tzname, business_ids in _by_timezone(timezones):
+            _recompute({pk: days[pk] for pk in business_ids if days[pk]}, tzname, using)
+
+
+def _refresh_payment_days(appointment_ids: Sequence[int], using: str) -> None:
+    refresh_days(
+        Appointment.objects.using(using)
+        .filter(pk__in=appointment_ids)
+        .values_list("business_id", "scheduled_for"),
+        using,
+    )
+
+
+def touch_appointments(
+    appointments: Iterable[Appointment], using: str | None = None
+) -> None:
+    """Recompute, after commit, the days the appointments were and now are on."""
+
+    using = using or router.db_for_write(Appointment)
+    instants = set()
+    for appointment in appointments:
+        for business_id, _service, start, _end in (
+            getattr(appointment, "_loaded_span", None) or (None,) * 4,
+            appointment.span,
+        ):
+            if business_id is not None and start is not None:
+                instants.add((business_id, start))
+    if instants:
+        transaction.on_commit(partial(refresh_days, instants, using), using=using)
+
+
+def touch_payments(
+    payments: Iterable[PaymentTransaction], using: str | None = None
+) -> None:
+    """Recompute, after commit, the days of completed payments' appointments.
+
+    Completed is a final status, so other payments never count as revenue.
+    """
+
+    using = using or router.db_for_write(PaymentTransaction)
+    appointment_ids = sorted(
+        {
+            payment.appointment_id
+            for payment in payments
+            if payment.status == PaymentStatus.COMPLETED
+        }
+    )
+    if appointment_ids:
+        transaction.on_commit(
+            partial(_refresh_payment_days, appointment_ids, using), using=using
+        )
+
+
+def rebuild_rollups(
+    business_ids: Iterable[int] | None = None,
+    chunk_size: int = REBUILD_CHUNK_SIZE,
+    using: str | None = None,
+) -> int:
+    """Recompute every day of the given businesses, or of all of them.
+
+    Businesses are processed ``chunk_size`` at a time, each chunk in its own
+    transaction, so locks stay short. Returns the number of businesses.
+    """
+
+    using = using or router.db_for_write(DailyBookings)
+    queryset = BusinessProfile.objects.using(using).order_by("pk")
+    if business_ids is not None:
+        queryset = queryset.filter(pk__in=list(business_ids))
+    done = 0
+    last = 0
+    while True:
+        chunk = list(
+            queryset.filter(pk__gt=last).values_list("pk", flat=True)[:chunk_size]
+        )
+        if not chunk:
+            return done
+        with transaction.atomic(using=using):
+            timezones = _locked_timezones(chunk, using)
+            for tzname, group in _by_timezone(timezones):
+                _recompute(dict.fromkeys(group), tzname, using)
+        done += len(chunk)
+        last = chunk[-1]
+
+
+def _on_appointment_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, "_loaded_span", None)
+    if (
+        loaded is not None
+        and loaded[0::2] == instance.span[0::2]
+        and getattr(instance, "_loaded_status", None) == instance.status
+    ):
+        return
+    touch_appointments([instance], kwargs.get("using"))
+
+
+def _on_appointment_delete(sender, instance, **kwargs):
+    touch_appointments([instance], kwargs.get("using"))
+
+
+def _on_payment_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_payments([instance], kwargs.get("using"))
+
+
+def _on_business_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and "timezone" not in update_fields):
+        return
+    loaded = getattr(instance, "_loaded_timezone", None)
+    if loaded is None or loaded == instance.timezone:
+        return
+    using = kwargs.get("using") or router.db_for_write(DailyBookings)
+    transaction.on_commit(
+        partial(rebuild_rollups, [instance.pk], using=using), using=using
+    )
+
+
+def connect_signals() -> None:
+    post_save.connect(
+        _on_business_save,
+        sender=BusinessProfile,
+        dispatch_uid="rollups-save-business",
+    )
+    post_save.connect(
+        _on_appointment_save,
+        sender=Appointment,
+        dispatch_uid="rollups-save-appointment",
+    )
+    post_delete.connect(
+        _on_appointment_delete,
+        sender=Appointment,
+        dispatch_uid="rollups-delete-appointment",
+    )
+    for name, signal in (("save", post_save), ("delete", post_delete)):
+        signal.connect(
+            _on_payment_change,
+            sender=PaymentTransaction,
+            dispatch_uid=f"rollups-{name}-payment",
+        )
@@ -10,5 +10,13 @@ from .models import BusinessProfile
 class BusinessProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = BusinessProfile
-        fields = ["id", "owner", "name", "description", "created_at", "updated_at"]
+        fields = [
+            "id",
+            "owner",
+            "name",
+            "description",
+            "timezone",
+            "created_at",
+            "updated_at",
+        ]
         read_only_fields = ["id", "created_at", "updated_at"]
@@ -0,0 +1,14 @@
+"""Background jobs for businesses."""
+
+from __future__ import annotations
+
+from celery import shared_task
+
+from business import rollups
+
+
+@shared_task
+def rebuild_rollups(business_ids: list[int] | None = None) -> int:
+    """Recompute the daily rollups of ``business_ids``, or of every business."""
+
+    return rollups.rebuild_rollups(business_ids)
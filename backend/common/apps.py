@@ -1,6 +1,34 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
+
+
+def _prepare_search_extensions(sender, using="default", **kwargs):
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            # Lets the appointment overlap constraint index plain columns.
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+
+def _prepare_search_storage(sender, using="default", **kwargs):
+    from api.search import get_search_backend
+
+    backend = get_search_backend(using)
+    if backend is not None:
+        backend.setup()
 
 
 class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "common"
+
+    def ready(self):
+        # Importing the viewsets registers their search fields so documents are
+        # maintained for writes made outside HTTP requests (shell, Celery).
+        from api import viewsets  # noqa: F401
+
+        pre_migrate.connect(_prepare_search_extensions, sender=self)
+        post_migrate.connect(_prepare_search_storage, sender=self)
@@ -0,0 +1,77 @@
+"""Model fields shared by the domain apps."""
+
+from __future__ import annotations
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.functional import cached_property
+
+__all__ = ["ChoiceCodeField"]
+
+
+class ChoiceCodeField(models.PositiveSmallIntegerField):
+    """Store a ``TextChoices`` member as a small integer code.
+
+    The column holds the member's position in ``choices_enum``, two bytes
+    instead of a ``varchar``, while Python code, ORM lookups, filters and the
+    API keep working with the string values. New members must therefore be
+    appended; reordering or removing one changes stored meanings.
+    """
+
+    def __init__(self, *args, choices_enum: type[models.TextChoices], **kwargs):
+        self.choices_enum = choices_enum
+        self._members = list(choices_enum)
+        self._codes = {member.value: code for code, member in enumerate(self._members)}
+        kwargs["choices"] = choices_enum.choices
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs.pop("choices", None)
+        kwargs["choices_enum"] = self.choices_enum
+        return name, path, args, kwargs
+
+    @cached_property
+    def validators(self):
+        # Values are strings; the integer range checks only apply to codes.
+        return [*self.default_validators, *self._validators]
+
+    def to_python(self, value):
+        if value is None or isinstance(value, self.choices_enum):
+            return value
+        if isinstance(value, int):
+            return self._member_for_code(value)
+        try:
+            return self.choices_enum(value)
+        except ValueError:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            ) from None
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else self._member_for_code(value)
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, int):
+            return value
+        value = models.Field.get_prep_value(self, value)
+        try:
+            return self._codes[str(value)]
+        except KeyError:
+            raise ValueError(
+                f"{value!r} is not a valid {self.choices_enum.__name__}."
+            ) from None
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return "" if value is None else str(value)
+
+    def _member_for_code(self, code: int):
+        try:
+            return self._members[code]
+        except IndexError:
+            raise ValueError(
+                f"{code} is not a stored {self.choices_enum.__name__} code."
+            ) from None
@@ -0,0 +1,44 @@
+"""Rebuild the full-text search documents for every searchable model."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from api.cache import bump_generation
+from api.search import SEARCH_INDEX_CHUNK_SIZE, get_search_backend, searchable_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill the search documents used by the API search filter, e.g. after "
+        "enabling full-text search on an existing database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--chunk-size", type=int, default=SEARCH_INDEX_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        backend = get_search_backend(using)
+        if backend is None:
+            raise CommandError(f"No full-text search backend for database '{using}'.")
+
+        backend.setup()
+        for spec in searchable_models():
+            rows = spec.queryset(using).iterator(chunk_size=options["chunk_size"])
+            count = 0
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= options["chunk_size"]:
+                    backend.index(batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                backend.index(batch)
+                count += len(batch)
+            # Search results are part of cached list responses.
+            bump_generation(spec.model)
+            self.stdout.write(f"{spec.model._meta.label}: {count} documents indexed")
@@ -0,0 +1,184 @@
+"""Report API list query shapes that no database index supports."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import QuerySet
+from django.db.models.expressions import Col
+from django.db.models.lookups import Lookup
+from django.db.models.sql.where import AND, WhereNode
+from django.http import QueryDict
+
+from api.filters import DayFilter
+from api.indexes import COVERED, MISSING, index_coverage
+
+EQUALITY_LOOKUPS = frozenset({"exact", "in", "isnull"})
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    viewset: str
+    kind: str
+    equality: tuple[str, ...]
+    ordering: tuple[str, ...]
+    coverage: str
+    range: str | None = None
+
+    def describe(self) -> str:
+        where = ", ".join(self.equality) or "-"
+        if self.range:
+            where = f"{where} RANGE {self.range}"
+        order = ", ".join(self.ordering) or "-"
+        return f"WHERE {where} ORDER BY {order}"
+
+
+def _scoped_fields(queryset: QuerySet) -> tuple[str, ...]:
+    """Return the base-model fields that ``queryset`` pins with equality lookups."""
+
+    query = queryset.query
+    base = query.base_table
+    fields: list[str] = []
+
+    def visit(node: WhereNode) -> None:
+        if node.negated or (node.connector != AND and len(node.children) > 1):
+            return
+        for child in node.children:
+            if isinstance(child, WhereNode):
+                visit(child)
+                continue
+            if (
+                not isinstance(child, Lookup)
+                or child.lookup_name not in EQUALITY_LOOKUPS
+            ):
+                continue
+            column = child.lhs
+            if not isinstance(column, Col):
+                continue
+            alias = column.alias
+            if alias == base:
+                fields.append(column.target.name)
+                continue
+            join = query.alias_map.get(alias)
+            while join is not None and getattr(join, "parent_alias", None) != base:
+                join = query.alias_map.get(getattr(join, "parent_alias", None))
+            if join is not None:
+                fields.append(join.join_field.name)
+
+    visit(query.where)
+    return tuple(dict.fromkeys(fields))
+
+
+def collect_query_shapes(registry) -> list[QueryShape]:
+    """Derive the distinct list query shapes served by each registered viewset.
+
+    Filters bounding a field (``__gte``, ``__lt``, a day) make that field the
+    range column of the shape rather than an equality prefix.
+    """
+
+    user_model = get_user_model()
+    shapes: dict[tuple, QueryShape] = {}
+    for _prefix, viewset, _basename in registry:
+        model = getattr(viewset, "model", None)
+        if model is None:
+            continue
+
+        request = SimpleNamespace(
+            user=user_model(pk=0, is_staff=False), query_params=QueryDict()
+        )
+        view = viewset(request=request, action="list", format_kwarg=None, kwargs={})
+        scope = _scoped_fields(view.get_queryset())
+        ordering = tuple(getattr(viewset, "ordering", None) or model._meta.ordering)
+
+        def add(
+            kind: str,
+            equality: tuple[str, ...],
+            order: tuple[str, ...],
+            bounded: str | None = None,
+        ) -> None:
+            key = (viewset.__name__, kind, equality, order, bounded)
+            if key in shapes:
+                return
+            shapes[key] = QueryShape(
+                viewset=viewset.__name__,
+                kind=kind,
+                equality=equality,
+                ordering=order,
+                coverage=index_coverage(model, equality, order, bounded),
+                range=bounded,
+            )
+
+        add("list", scope, ordering)
+
+        filterset_class = getattr(viewset, "filterset_class", None)
+        if filterset_class is not None:
+            for filter_ in filterset_class.base_filters.values():
+                name = filter_.field_name
+                if "__" in name or name in scope:
+                    continue
+                if filter_.lookup_expr in EQUALITY_LOOKUPS and not isinstance(
+                    filter_, DayFilter
+                ):
+                    add("filter", (*scope, name), ordering)
+                else:
+                    add("filter", scope, ordering, name)
+
+        ordering_fields = getattr(viewset, "ordering_fields", None)
+        if isinstance(ordering_fields, (list, tuple)):
+            for name in ordering_fields:
+                add("ordering", scope, (name,))
+    return list(shapes.values())
+
+
+class Command(BaseCommand):
+    help = (
+        "Inspect the API viewsets' scoping, filterset fields and orderings and "
+        "report the query shapes that lack a supporting database index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also list query shapes that are fully covered by an index.",
+        )
+        parser.add_argument(
+            "--fail-on-missing",
+            action="store_true",
+            help="Exit with an error when a list query shape has no usable index.",
+        )
+
+    def handle(self, *args, **options):
+        from api.routers import router
+
+        shapes = collect_query_shapes(router.registry)
+        for shape in shapes:
+            if shape.coverage == COVERED and not options["all"]:
+                continue
+            style = (
+                self.style.ERROR if shape.coverage == MISSING else self.style.WARNING
+            )
+            if shape.coverage == COVERED:
+                style = self.style.SUCCESS
+            self.stdout.write(
+                f"{shape.viewset:<28} {shape.kind:<9} "
+                f"{style(f'{shape.coverage:<8}')} {shape.describe()}"
+            )
+
+        uncovered = [
+            shape
+            for shape in shapes
+            if shape.kind == "list" and shape.coverage != COVERED
+        ]
+        self.stdout.write(
+            f"{len(shapes)} query shapes inspected, "
+            f"{sum(shape.coverage != COVERED for shape in shapes)} without full index support."
+        )
+        if uncovered and options["fail_on_missing"]:
+            raise CommandError(
+                "List queries without index support: "
+                + ", ".join(shape.viewset for shape in uncovered)
+            )
@@ -0,0 +1,27 @@
+"""Print hit/miss counts of the API response cache per viewset."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from api.cache import cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show response cache hits and misses for every cached API viewset."
+
+    def handle(self, *args, **options):
+        from api.routers import router
+
+        names = [
+            viewset.__name__
+            for _prefix, viewset, _basename in router.registry
+            if getattr(viewset, "cache_timeout", None)
+        ]
+        for name, counts in cache_stats(names).items():
+            lookups = counts["hits"] + counts["misses"]
+            ratio = counts["hits"] / lookups if lookups else 0.0
+            self.stdout.write(
+                f"{name:<28} hits={counts['hits']:<8} misses={counts['misses']:<8} "
+                f"hit-rate={ratio:.1%}"
+            )
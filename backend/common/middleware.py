@@ -0,0 +1,139 @@
+"""Per-request SQL accounting: query counts, database time and N+1 detection."""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+__all__ = [
+    "QueryBudgetExceeded",
+    "QueryBudgetMiddleware",
+    "QueryStats",
+    "normalize_sql",
+    "track_queries",
+]
+
+logger = logging.getLogger("apatie.queries")
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request breaks its query budget."""
+
+
+def normalize_sql(sql: str) -> str:
+    """Return the shape of ``sql`` with ``IN (...)`` lists of any size collapsed."""
+
+    return _WHITESPACE.sub(" ", _PLACEHOLDER_LIST.sub("(...)", sql)).strip()
+
+
+class QueryStats:
+    """Accumulates the queries executed through ``execute_wrapper`` hooks."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[normalize_sql(sql)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Return query shapes executed at least ``threshold`` times."""
+
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+@contextmanager
+def track_queries(using: str | None = None) -> Iterator[QueryStats]:
+    """Record every query issued inside the block on ``using`` or all databases."""
+
+    stats = QueryStats()
+    aliases = [using] if using is not None else list(connections)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        yield stats
+
+
+def _resolve_budget(view_func, method: str) -> int | None:
+    view_class = getattr(view_func, "cls", None)
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, Mapping):
+        action = (getattr(view_func, "actions", None) or {}).get(method.lower())
+        budget = budget.get(action)
+    if budget is None:
+        budget = getattr(settings, "QUERY_BUDGET_DEFAULT", None)
+    return budget
+
+
+class QueryBudgetMiddleware:
+    """Count queries and database time per request and enforce view budgets.
+
+    Views declare ``query_budget`` as an integer or a mapping of viewset
+    action to integer; ``QUERY_BUDGET_DEFAULT`` covers the rest. A ``SELECT``
+    shape repeated ``QUERY_BUDGET_REPEAT_THRESHOLD`` times is reported as an
+    N+1 pattern; repeated writes are left to the budget. Violations raise
+    :class:`QueryBudgetExceeded` when ``QUERY_BUDGET_STRICT`` is set (tests)
+    and are logged otherwise. Totals are exposed in a ``Server-Timing`` header
+    for load tests.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        started = time.perf_counter()
+        with track_queries() as stats:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        if getattr(settings, "QUERY_BUDGET_HEADERS", True):
+            response["Server-Timing"] = (
+                f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+                f"total;dur={elapsed * 1000:.2f}"
+            )
+        self._check(request, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = _resolve_budget(view_func, request.method)
+
+    def _check(self, request, stats: QueryStats) -> None:
+        problems: list[str] = []
+        budget = getattr(request, "query_budget", None)
+        if budget is not None and stats.count > budget:
+            problems.append(f"{stats.count} queries exceed the budget of {budget}")
+
+        threshold = getattr(settings, "QUERY_BUDGET_REPEAT_THRESHOLD", 5)
+        for shape, count in stats.repeated(threshold):
+            if not shape.startswith("SELECT"):
+                continue
+            problems.append(f"possible N+1, {count} executions of: {shape}")
+
+        if not problems:
+            return
+        message = f"{request.method} {request.path}: " + "; ".join(problems)
+        if getattr(settings, "QUERY_BUDGET_STRICT", False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
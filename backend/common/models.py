@@ -2,15 +2,108 @@
 
 from __future__ import annotations
 
-from django.db import models
+from collections.abc import Collection, Mapping
+from typing import Any, ClassVar
+
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, router, transaction
+from django.db.models.functions import Upper
 
 
 class TimeStampedModel(models.Model):
     """Abstract base class with created/updated timestamps."""
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
         ordering = ("-created_at",)
+
+
+class TransitionError(Exception):
+    """Raised when a status change is not allowed from the current status."""
+
+    def __init__(self, current: str, target: str):
+        super().__init__(f"Cannot change status from {current} to {target}.")
+        self.current = current
+        self.target = target
+
+
+class StatusMachineMixin:
+    """Guard ``status`` changes of a model with a transition table.
+
+    Models set ``TRANSITIONS`` to map each status to the statuses it may move
+    to; statuses without an entry are final.
+    """
+
+    TRANSITIONS: ClassVar[Mapping[str, Collection[str]]] = {}
+
+    def can_transition(self, target: str) -> bool:
+        return target in self.TRANSITIONS.get(self.status, ())
+
+    def transition_to(self, target: str, **changes: Any):
+        """Move to ``target``, saving ``changes`` alongside, or raise.
+
+        The stored status is re-read under a row lock, so of two concurrent
+        transitions out of the same status only the first succeeds and the
+        other raises :class:`TransitionError`.
+        """
+
+        model = type(self)
+        using = router.db_for_write(model, instance=self)
+        with transaction.atomic(using=using):
+            current = (
+                model._default_manager.using(using)
+                .select_for_update()
+                .values_list("status", flat=True)
+                .get(pk=self.pk)
+            )
+            if target not in self.TRANSITIONS.get(current, ()):
+                raise TransitionError(current, target)
+            self.status = target
+            for name, value in changes.items():
+                setattr(self, name, value)
+            auto_now = [
+                field.name
+                for field in model._meta.concrete_fields
+                if getattr(field, "auto_now", False)
+            ]
+            self.save(using=using, update_fields={"status", *changes, *auto_now})
+        return self
+
+
+class SearchDocument(models.Model):
+    """Denormalised full-text document for one searchable row (PostgreSQL only).
+
+    ``vector`` holds the tokenised text of the row's search fields and is
+    served by a GIN index. E-mail addresses do not tokenise usefully, so they
+    are kept verbatim in ``emails`` behind a trigram index that accelerates
+    substring matches. Other databases use :mod:`api.search`'s stand-in.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    document = models.TextField(blank=True)
+    emails = models.TextField(blank=True)
+    vector = SearchVectorField(null=True)
+
+    class Meta:
+        required_db_vendor = "postgresql"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id"], name="searchdoc_unique_object"
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=["vector"], name="searchdoc_vector_gin"),
+            GinIndex(
+                OpClass(Upper("emails"), name="gin_trgm_ops"),
+                name="searchdoc_emails_trgm",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.content_type} #{self.object_id}"
@@ -5,8 +5,17 @@ from __future__ import annotations
 import pytest
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
+from common.middleware import track_queries
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """Start every test with an empty cache so responses never leak across tests."""
+    cache.clear()
+
 
 @pytest.fixture
 def api_client() -> APIClient:
@@ -14,6 +23,16 @@ def api_client() -> APIClient:
     return APIClient()
 
 
+@pytest.fixture
+def query_counter():
+    """Return a context manager recording the queries issued inside its block.
+
+    The yielded :class:`~common.middleware.QueryStats` exposes ``count``,
+    ``duration`` and ``repeated(threshold)`` for N+1 assertions.
+    """
+    return track_queries
+
+
 @pytest.fixture
 def health_check_url() -> str:
     """Return the configured health check endpoint path."""
@@ -6,6 +6,7 @@ from datetime import timedelta
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DEFAULT_SQLITE_PATH = BASE_DIR / "db.sqlite3"
@@ -42,6 +43,7 @@ DJANGO_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 ]
 
 THIRD_PARTY_APPS = [
@@ -72,6 +74,7 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django_guid.middleware.guid_middleware",
+    "common.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -105,6 +108,10 @@ ASGI_APPLICATION = "core.asgi.application"
 DATABASES = {
     "default": ENV.db("DATABASE_URL", default=DEFAULT_SQLITE_URL),
 }
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # SQLite has no SELECT ... FOR UPDATE; taking the write lock when a
+    # transaction begins serializes competing bookings instead.
+    DATABASES["default"].setdefault("OPTIONS", {})["transaction_mode"] = "IMMEDIATE"
 
 # Authentication
 AUTH_USER_MODEL = "users.User"
@@ -189,6 +196,11 @@ SPECTACULAR_SETTINGS = {
     ),
     "CONTACT": {"name": "Apatie", "email": "support@apatie.example"},
     "LICENSE": {"name": "Proprietary"},
+    "GET_LIB_DOC_EXCLUDES": "api.serializers.schema_doc_excludes",
+    "ENUM_NAME_OVERRIDES": {
+        "AppointmentStatusEnum": "appointments.models.AppointmentStatus",
+        "PaymentStatusEnum": "payments.adapters.PaymentStatus",
+    },
 }
 
 # CORS / CSRF
@@ -213,6 +225,21 @@ else:
         }
     }
 
+# Cache configuration
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # Celery configuration
 CELERY_BROKER_URL = REDIS_URL or "memory://"
 CELERY_RESULT_BACKEND = REDIS_URL or "cache+memory://"
@@ -222,9 +249,71 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 
+# Payment gateway used by background captures (payments.tasks)
+PAYMENT_GATEWAY = {
+    "BACKEND": "payments.adapters.MockPaymentGateway",
+    "OPTIONS": {},
+}
+PAYMENT_CAPTURE_MAX_RETRIES = 5
+PAYMENT_CAPTURE_RETRY_BACKOFF = 2
+PAYMENT_CAPTURE_RETRY_BACKOFF_MAX = 300
+# Payments per gateway batch in bulk capture
+PAYMENT_BULK_CAPTURE_CHUNK = 500
+
+# Notification delivery channels (notifications.tasks); "QUEUE" routes a
+# channel's deliveries to its own Celery queue and workers
+NOTIFICATION_CHANNELS = {
+    "email": {
+        "BACKEND": "notifications.adapters.MockNotificationService",
+        "OPTIONS": {},
+    },
+}
+# Notifications created and delivered per batch when fanning out
+NOTIFICATION_FANOUT_CHUNK = 1000
+# Unacknowledged notifications a websocket client may hold before the rest
+# are read from the database as it catches up
+NOTIFICATION_PUSH_WINDOW = 100
+# Seconds before a resume token's notification that a reconnecting client's
+# catch-up re-reads, for rows that committed after it with lower ids
+NOTIFICATION_RESUME_RESCAN = 60
+# Seconds a recipient's messages sent through notifications.digest.notify()
+# are collected before going out as one digest, and where they wait
+NOTIFICATION_DIGEST_WINDOW = 60
+NOTIFICATION_DIGEST_BUFFER = (
+    {
+        "BACKEND": "notifications.digest.RedisDigestBuffer",
+        "OPTIONS": {"url": REDIS_URL},
+    }
+    if REDIS_URL
+    else {"BACKEND": "notifications.digest.InMemoryDigestBuffer", "OPTIONS": {}}
+)
+# Retention (notifications.retention): read notifications are deleted after
+# READ_DAYS; all older than DAYS are archived as NDJSON.gz, then deleted
+NOTIFICATION_RETENTION_READ_DAYS = ENV.int(
+    "NOTIFICATION_RETENTION_READ_DAYS", default=30
+)
+NOTIFICATION_RETENTION_DAYS = ENV.int("NOTIFICATION_RETENTION_DAYS", default=180)
+NOTIFICATION_ARCHIVE_DIR = ENV.str(
+    "NOTIFICATION_ARCHIVE_DIR", default=str(BASE_DIR / "archive" / "notifications")
+)
+NOTIFICATION_PURGE_CHUNK = 1000
+
+CELERY_BEAT_SCHEDULE = {
+    "purge-notifications": {
+        "task": "notifications.tasks.purge_notifications",
+        "schedule": crontab(hour=3, minute=30),
+    },
+}
+
 # Email backend (console for now)
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# Per-request query accounting (common.middleware.QueryBudgetMiddleware)
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGET_REPEAT_THRESHOLD = 5
+QUERY_BUDGET_STRICT = False
+QUERY_BUDGET_HEADERS = True
+
 # Logging configuration is split out for readability
 from .logging import LOGGING  # noqa: E402  pylint: disable=wrong-import-position
 
@@ -42,6 +42,16 @@ LOGGING: Dict[str, Any] = {
             "level": "INFO",
             "propagate": False,
         },
+        "apatie.queries": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+        "apatie.retention": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
 
@@ -19,5 +19,16 @@ class Listing(TimeStampedModel):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     is_active = models.BooleanField(default=True)
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["business", "-created_at"], name="listing_business_created_idx"
+            ),
+            models.Index(
+                fields=["business", "is_active", "-created_at"],
+                name="listing_business_active_idx",
+            ),
+        ]
+
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.service} - {self.price}"
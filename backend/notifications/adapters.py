@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+from collections import deque
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
-from typing import Dict
+from typing import ClassVar, Protocol
+
+from django.conf import settings
+from django.utils.module_loading import import_string
 
 
 @dataclass
@@ -12,12 +17,76 @@ class NotificationResult:
     message: str
 
 
+@dataclass
+class NotificationMessage:
+    recipient: str
+    subject: str
+    body: str
+
+
+class NotificationService(Protocol):
+    """Interface the notification views and tasks expect from a channel."""
+
+    def send(
+        self, *, recipient: str, subject: str, body: str
+    ) -> NotificationResult: ...
+
+    def send_many(
+        self, messages: Sequence[NotificationMessage]
+    ) -> list[NotificationResult]:
+        """Deliver several messages in one call; results follow ``messages``."""
+
+
+class InMemorySink:
+    """Keeps the last ``maxlen`` delivered messages, oldest dropped first.
+
+    ``total`` counts every message ever recorded, so long-lived workers can
+    report throughput without the sink growing.
+    """
+
+    def __init__(self, maxlen: int = 1000):
+        self.messages: deque[NotificationMessage] = deque(maxlen=maxlen)
+        self.total = 0
+
+    def record(self, messages: Sequence[NotificationMessage]) -> None:
+        self.messages.extend(messages)
+        self.total += len(messages)
+
+    def clear(self) -> None:
+        self.messages.clear()
+        self.total = 0
+
+    def __iter__(self) -> Iterator[NotificationMessage]:
+        return iter(self.messages)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+
 class MockNotificationService:
-    """Simple in-memory notification delivery."""
+    """In-memory notification delivery.
+
+    Messages go to ``sink``, by default the bounded class-wide ``outbox``
+    that tests can inspect or swap.
+    """
 
-    sent_messages: list[Dict[str, str]] = []
+    outbox: ClassVar[InMemorySink] = InMemorySink()
+
+    def __init__(self, *, sink: InMemorySink | None = None):
+        self.sink = sink if sink is not None else self.outbox
 
     def send(self, *, recipient: str, subject: str, body: str) -> NotificationResult:
-        payload = {"recipient": recipient, "subject": subject, "body": body}
-        self.sent_messages.append(payload)
-        return NotificationResult(success=True, message="queued")
+        return self.send_many([NotificationMessage(recipient, subject, body)])[0]
+
+    def send_many(
+        self, messages: Sequence[NotificationMessage]
+    ) -> list[NotificationResult]:
+        self.sink.record(messages)
+        return [NotificationResult(success=True, message="queued") for _ in messages]
+
+
+def get_notification_service(channel: str = "email") -> NotificationService:
+    """Return the service configured for ``channel`` in ``NOTIFICATION_CHANNELS``."""
+
+    config = settings.NOTIFICATION_CHANNELS[channel]
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
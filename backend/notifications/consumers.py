@@ -0,0 +1,175 @@
+"""Websocket push of new notifications to their recipients.
+
+Every connection of a user joins the group named by :func:`user_group`, to
+which :func:`~notifications.tasks.push_notifications` sends each new
+notification once its row is committed. The consumer forwards them as::
+
+    {"type": "notification", "resume_token": "...", "notification": {...}}
+
+and the client acknowledges what it has handled with ``{"type": "ack",
+"resume_token": "..."}``. At most ``NOTIFICATION_PUSH_WINDOW``
+notifications are unacknowledged at a time: past that the consumer stops
+forwarding and, as acknowledgements free the window, reads the rest from
+the database instead, so a slow client costs neither server memory nor lost
+notifications. Reconnecting with ``?resume=<token>`` replays what was
+missed after that token the same way.
+
+Ids are allocated before commit, so a notification can commit after one
+with a higher id, as a large fan-out chunk does. Such late events are
+still pushed unless this connection sent them recently, and catch-ups read
+every id above the acknowledged one that is not in flight, so each
+connection gets every notification at least once. A resume token is an id,
+so a resumed connection also re-reads the recipient's notifications below
+it created up to ``NOTIFICATION_RESUME_RESCAN`` seconds before the token's
+own: a row that committed late while the client was away is among them.
+Some of those may have been delivered already; clients drop repeated ids.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import timedelta
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.db.models import Q
+
+from notifications.models import Notification
+from notifications.serializers import NotificationSerializer
+
+__all__ = ["NotificationConsumer", "user_group"]
+
+# Application close codes, mirroring the HTTP statuses.
+UNAUTHORIZED = 4401
+BAD_REQUEST = 4400
+
+
+def user_group(user_id: int) -> str:
+    """Channel layer group of every websocket connection of ``user_id``."""
+
+    return f"notifications.user.{user_id}"
+
+
+def _parse_token(token) -> int:
+    """Return the notification id a resume token stands for."""
+
+    value = int(token)
+    if value < 0:
+        raise ValueError(token)
+    return value
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=UNAUTHORIZED)
+            return
+        query = parse_qs(self.scope.get("query_string", b"").decode("latin-1"))
+        try:
+            resume = _parse_token(query["resume"][0]) if "resume" in query else None
+        except ValueError:
+            await self.close(code=BAD_REQUEST)
+            return
+
+        self.user_id = user.pk
+        self.window = settings.NOTIFICATION_PUSH_WINDOW
+        # Pushed and not yet acknowledged.
+        self.in_flight: set[int] = set()
+        # Recently pushed ids, to drop the live event of a row a catch-up sent.
+        self.recent: deque[int] = deque(maxlen=2 * self.window)
+        # Highest acknowledged id; catch-ups read the ids above it.
+        self.acked = resume
+        # Ids at or below ``acked`` whose late events arrived while behind.
+        self.late: set[int] = set()
+        # Set while notifications are only in the database: live events are
+        # dropped until the backlog is read.
+        self.behind = resume is not None
+        if resume is not None:
+            self.late = await self._recent_below(resume)
+        self.group = user_group(user.pk)
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+        await self._catch_up()
+
+    async def disconnect(self, code):
+        if hasattr(self, "group"):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if not isinstance(content, dict) or content.get("type") != "ack":
+            await self.send_json({"type": "error", "detail": "Expected an ack."})
+            return
+        try:
+            acked = _parse_token(content.get("resume_token"))
+        except (TypeError, ValueError):
+            await self.send_json({"type": "error", "detail": "Invalid resume token."})
+            return
+        self.acked = max(acked, self.acked or 0)
+        self.in_flight = {pk for pk in self.in_flight if pk > acked}
+        await self._catch_up()
+
+    async def notification_created(self, event):
+        notification = event["notification"]
+        pk = notification["id"]
+        if pk in self.recent:
+            return
+        if self.acked is None:
+            self.acked = pk - 1
+        if self.behind or len(self.in_flight) >= self.window:
+            self.behind = True
+            if pk <= self.acked:
+                self.late.add(pk)
+            return
+        await self._push(notification)
+
+    async def _push(self, notification: dict) -> None:
+        pk = notification["id"]
+        await self.send_json(
+            {
+                "type": "notification",
+                "resume_token": str(pk),
+                "notification": notification,
+            }
+        )
+        self.in_flight.add(pk)
+        self.recent.append(pk)
+        self.late.discard(pk)
+
+    async def _catch_up(self) -> None:
+        room = self.window - len(self.in_flight)
+        if not self.behind or room <= 0:
+            return
+        missed = await self._missed(room)
+        for notification in missed:
+            await self._push(notification)
+        self.behind = len(missed) == room
+
+    @database_sync_to_async
+    def _recent_below(self, token: int) -> set[int]:
+        """Ids below ``token`` that may have committed after it."""
+
+        notifications = Notification.objects.filter(recipient_id=self.user_id)
+        created_at = (
+            notifications.filter(pk=token).values_list("created_at", flat=True).first()
+        )
+        if created_at is None:
+            return set()
+        since = created_at - timedelta(seconds=settings.NOTIFICATION_RESUME_RESCAN)
+        return set(
+            notifications.filter(pk__lt=token, created_at__gte=since).values_list(
+                "pk", flat=True
+            )
+        )
+
+    @database_sync_to_async
+    def _missed(self, limit: int) -> list[dict]:
+        notifications = (
+            Notification.objects.filter(recipient_id=self.user_id)
+            .filter(Q(pk__gt=self.acked or 0) | Q(pk__in=sorted(self.late)))
+            .exclude(pk__in=sorted(self.in_flight))
+            .order_by("pk")[:limit]
+        )
+        return NotificationSerializer(notifications, many=True).data
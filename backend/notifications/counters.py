@@ -0,0 +1,76 @@
+"""Consistency check for the denormalized unread notification counters."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+
+from notifications.models import Notification, UnreadCount
+
+__all__ = ["CHECK_CHUNK_SIZE", "Drift", "check_unread_counts"]
+
+CHECK_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Drift:
+    recipient: int
+    counted: int
+    actual: int
+
+
+def _drift(user_ids: list[int], lock: bool) -> list[Drift]:
+    counters = UnreadCount.objects.filter(recipient_id__in=user_ids)
+    if lock:
+        counters = counters.select_for_update().order_by("pk")
+    counted = dict(counters.values_list("recipient_id", "unread"))
+    actual = dict(
+        Notification.objects.filter(recipient_id__in=user_ids, read_at__isnull=True)
+        .values("recipient_id")
+        .annotate(unread=Count("pk"))
+        .order_by()
+        .values_list("recipient_id", "unread")
+    )
+    return [
+        Drift(user_id, counted.get(user_id, 0), actual.get(user_id, 0))
+        for user_id in user_ids
+        if counted.get(user_id, 0) != actual.get(user_id, 0)
+    ]
+
+
+def check_unread_counts(
+    *, fix: bool = False, chunk_size: int = CHECK_CHUNK_SIZE
+) -> Iterator[Drift]:
+    """Yield each user whose unread counter disagrees with their notifications.
+
+    Users are compared ``chunk_size`` at a time: two grouped queries per
+    chunk, the second served by ``notif_recipient_unread_idx``. With ``fix``
+    each chunk's counters are locked, compared and overwritten in one
+    transaction, so concurrent increments queue behind the repair instead of
+    being lost.
+    """
+
+    users = get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+    last = 0
+    while True:
+        user_ids = list(users.filter(pk__gt=last)[:chunk_size])
+        if not user_ids:
+            return
+        with transaction.atomic():
+            drifts = _drift(user_ids, lock=fix)
+            if fix and drifts:
+                UnreadCount.objects.bulk_create(
+                    [
+                        UnreadCount(recipient_id=d.recipient, unread=d.actual)
+                        for d in drifts
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["recipient"],
+                    update_fields=["unread"],
+                )
+        yield from drifts
+        last = user_ids[-1]
@@ -0,0 +1,200 @@
+"""Collapse bursts of notifications into one digest per recipient.
+
+:func:`notify` buffers a message for its recipient once the current
+transaction commits. The first message of a window schedules
+:func:`~notifications.tasks.flush_digest` ``NOTIFICATION_DIGEST_WINDOW``
+seconds later; that task drains everything the recipient received in the
+meantime and sends it through :func:`~notifications.dispatch.send_many` as a
+single notification, so a burst of N messages costs one row and one call
+per channel instead of N.
+
+Buffers are configured by ``NOTIFICATION_DIGEST_BUFFER`` like
+``PAYMENT_GATEWAY``: :class:`RedisDigestBuffer` keeps one sorted set per
+recipient, scored by arrival time, and :class:`InMemoryDigestBuffer` stands
+in for it in tests and single-process development.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import partial
+from typing import ClassVar, Protocol
+
+import redis
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils.module_loading import import_string
+
+from notifications.dispatch import send_many
+from notifications.tasks import flush_digest
+
+__all__ = [
+    "DigestBuffer",
+    "DigestEntry",
+    "InMemoryDigestBuffer",
+    "RedisDigestBuffer",
+    "combine",
+    "flush",
+    "get_digest_buffer",
+    "notify",
+    "notify_many",
+]
+
+# A window whose flush task was lost is reopened after this long.
+WINDOW_GRACE = 60
+# Entries nobody flushed are dropped after a day.
+ENTRY_TTL = 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class DigestEntry:
+    subject: str
+    body: str
+    at: float
+
+
+class DigestBuffer(Protocol):
+    """Per-recipient holding area for the messages of one digest window."""
+
+    def add(self, recipient_id: int, entry: DigestEntry, window: float) -> bool:
+        """Buffer ``entry``; return whether it opened a new window."""
+
+    def drain(self, recipient_id: int) -> list[DigestEntry]:
+        """Atomically take the buffered entries, oldest first, and close the window."""
+
+
+class InMemoryDigestBuffer:
+    """Process-local buffer for tests and eager development setups."""
+
+    _entries: ClassVar[dict[int, list[DigestEntry]]] = defaultdict(list)
+    _open: ClassVar[set[int]] = set()
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def add(self, recipient_id: int, entry: DigestEntry, window: float) -> bool:
+        with self._lock:
+            self._entries[recipient_id].append(entry)
+            if recipient_id in self._open:
+                return False
+            self._open.add(recipient_id)
+            return True
+
+    def drain(self, recipient_id: int) -> list[DigestEntry]:
+        with self._lock:
+            self._open.discard(recipient_id)
+            return sorted(self._entries.pop(recipient_id, []), key=lambda e: e.at)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries.clear()
+            cls._open.clear()
+
+
+class RedisDigestBuffer:
+    """Buffer in Redis: a sorted set of entries and a window flag per recipient."""
+
+    prefix = "notifications:digest"
+    _clients: ClassVar[dict[str, redis.Redis]] = {}
+
+    def __init__(self, *, url: str):
+        if url not in self._clients:
+            self._clients[url] = redis.Redis.from_url(url)
+        self.client = self._clients[url]
+
+    def _keys(self, recipient_id: int) -> tuple[str, str]:
+        key = f"{self.prefix}:{recipient_id}"
+        return key, f"{key}:open"
+
+    def add(self, recipient_id: int, entry: DigestEntry, window: float) -> bool:
+        entries, flag = self._keys(recipient_id)
+        # The nonce keeps identical messages apart in the set.
+        member = json.dumps(
+            {"subject": entry.subject, "body": entry.body, "nonce": uuid.uuid4().hex}
+        )
+        pipeline = self.client.pipeline()
+        pipeline.zadd(entries, {member: entry.at})
+        pipeline.expire(entries, ENTRY_TTL)
+        pipeline.set(flag, 1, nx=True, ex=int(window) + WINDOW_GRACE)
+        return bool(pipeline.execute()[-1])
+
+    def drain(self, recipient_id: int) -> list[DigestEntry]:
+        entries, flag = self._keys(recipient_id)
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.zrange(entries, 0, -1, withscores=True)
+        pipeline.delete(entries, flag)
+        members = pipeline.execute()[0]
+        drained = []
+        for member, score in members:
+            data = json.loads(member)
+            drained.append(DigestEntry(data["subject"], data["body"], score))
+        return drained
+
+
+def get_digest_buffer() -> DigestBuffer:
+    """Return the buffer configured by ``settings.NOTIFICATION_DIGEST_BUFFER``."""
+
+    config = settings.NOTIFICATION_DIGEST_BUFFER
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+def combine(entries: Sequence[DigestEntry]) -> tuple[str, str]:
+    """Merge buffered entries into one ``(subject, body)``."""
+
+    if len(entries) == 1:
+        return entries[0].subject, entries[0].body
+    body = "\n\n".join(f"{entry.subject}\n{entry.body}" for entry in entries)
+    return f"{len(entries)} new notifications", body
+
+
+def flush(recipient_id: int) -> int:
+    """Send the recipient's buffered entries as one notification.
+
+    Returns the number of entries it combined.
+    """
+
+    entries = get_digest_buffer().drain(recipient_id)
+    if entries:
+        subject, body = combine(entries)
+        send_many(
+            get_user_model().objects.filter(pk=recipient_id, is_active=True),
+            subject=subject,
+            body=body,
+        )
+    return len(entries)
+
+
+def _buffer(recipient_id: int, entry: DigestEntry) -> None:
+    window = settings.NOTIFICATION_DIGEST_WINDOW
+    if get_digest_buffer().add(recipient_id, entry, window):
+        flush_digest.apply_async((recipient_id,), countdown=window)
+
+
+def notify(recipient_id: int, *, subject: str, body: str) -> None:
+    """Queue a message for the recipient's next digest.
+
+    Nothing is buffered if the surrounding transaction rolls back.
+    """
+
+    entry = DigestEntry(subject, body, time.time())
+    transaction.on_commit(partial(_buffer, recipient_id, entry))
+
+
+def notify_many(recipients: QuerySet, *, subject: str, body: str) -> int:
+    """Queue a message for the next digest of every user in ``recipients``.
+
+    Returns the number of recipients.
+    """
+
+    count = 0
+    for recipient_id in recipients.values_list("pk", flat=True).iterator():
+        notify(recipient_id, subject=subject, body=body)
+        count += 1
+    return count
@@ -0,0 +1,128 @@
+"""Fan notifications out to many recipients in batches.
+
+:func:`send_many` walks a recipient query in primary-key order, creates the
+``Notification`` rows of each chunk with one ``bulk_create`` and, once the
+chunk commits, queues one :func:`~notifications.tasks.deliver_notifications`
+task per channel for it. Neither the recipients nor the notifications are
+held in memory beyond one chunk, so a fan-out to 100k users costs about a
+hundred inserts and tasks.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+
+from business.models import BusinessProfile
+from notifications.models import Notification, UnreadCount
+from notifications.tasks import deliver_notifications, push_notifications
+
+__all__ = ["FanOut", "connect_signals", "customers_of", "send_many"]
+
+
+@dataclass
+class FanOut:
+    notifications: int = 0
+    batches: int = 0
+
+
+def customers_of(business: BusinessProfile) -> QuerySet:
+    """Users who have booked an appointment with ``business``."""
+
+    return (
+        get_user_model()
+        .objects.filter(appointments__business=business, is_active=True)
+        .distinct()
+    )
+
+
+def _enqueue(channels: Iterable[str], notification_ids: list[int]) -> None:
+    for channel in channels:
+        queue = settings.NOTIFICATION_CHANNELS[channel].get("QUEUE")
+        deliver_notifications.apply_async((channel, notification_ids), queue=queue)
+    push_notifications.delay(notification_ids)
+
+
+def send_many(
+    recipients: QuerySet,
+    *,
+    subject: str,
+    body: str,
+    channels: Iterable[str] | None = None,
+    chunk_size: int | None = None,
+) -> FanOut:
+    """Notify every user in ``recipients`` on each of ``channels``.
+
+    ``channels`` default to every entry of ``NOTIFICATION_CHANNELS`` and
+    ``chunk_size`` to ``NOTIFICATION_FANOUT_CHUNK``. Each chunk commits on
+    its own, so a failure part-way leaves the earlier chunks delivered.
+    """
+
+    channels = list(settings.NOTIFICATION_CHANNELS if channels is None else channels)
+    unknown = set(channels) - set(settings.NOTIFICATION_CHANNELS)
+    if unknown:
+        raise ValueError(f"Unknown notification channels: {sorted(unknown)}")
+    chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK
+    recipient_ids = recipients.order_by("pk").values_list("pk", flat=True)
+    result = FanOut()
+    last = 0
+    while True:
+        chunk = list(recipient_ids.filter(pk__gt=last)[:chunk_size])
+        if not chunk:
+            return result
+        with transaction.atomic():
+            created = Notification.objects.bulk_create(
+                Notification(recipient_id=pk, subject=subject, body=body)
+                for pk in chunk
+            )
+            UnreadCount.objects.adjust(dict.fromkeys(chunk, 1))
+            transaction.on_commit(
+                partial(
+                    _enqueue, channels, [notification.pk for notification in created]
+                )
+            )
+        result.notifications += len(created)
+        result.batches += 1
+        if len(chunk) < chunk_size:
+            return result
+        last = chunk[-1]
+
+
+def _on_notification_save(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        using = kwargs.get("using")
+        if instance.read_at is None:
+            UnreadCount.objects.using(using).adjust({instance.recipient_id: 1})
+        transaction.on_commit(
+            partial(push_notifications.delay, [instance.pk]), using=using
+        )
+
+
+def _on_notification_delete(sender, instance, **kwargs):
+    if instance.read_at is None:
+        UnreadCount.objects.using(kwargs.get("using")).adjust(
+            {instance.recipient_id: -1}
+        )
+
+
+def connect_signals() -> None:
+    """Count and push notifications saved one at a time.
+
+    Bulk creates in :func:`send_many` do both themselves.
+    """
+
+    post_save.connect(
+        _on_notification_save, sender=Notification, dispatch_uid="push-notification"
+    )
+    post_delete.connect(
+        _on_notification_delete,
+        sender=Notification,
+        dispatch_uid="uncount-notification",
+    )
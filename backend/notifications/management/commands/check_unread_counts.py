@@ -0,0 +1,55 @@
+"""Compare the unread notification counters with the notifications."""
+
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.counters import CHECK_CHUNK_SIZE, check_unread_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare every user's unread notification counter with their unread "
+        "notifications and print each disagreement as one JSON line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Overwrite drifted counters with the actual unread count.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHECK_CHUNK_SIZE,
+            help="Users compared per query.",
+        )
+        parser.add_argument(
+            "--fail-on-mismatch",
+            action="store_true",
+            help="Exit with an error when a counter has drifted.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for drift in check_unread_counts(
+            fix=options["fix"], chunk_size=options["chunk_size"]
+        ):
+            drifted += 1
+            self.stdout.write(
+                json.dumps(
+                    {
+                        "recipient": drift.recipient,
+                        "counted": drift.counted,
+                        "actual": drift.actual,
+                    }
+                )
+            )
+        self.stderr.write(
+            f"{drifted} drifted counters{' fixed' if options['fix'] and drifted else ''}."
+        )
+        if drifted and options["fail_on_mismatch"] and not options["fix"]:
+            raise CommandError("Unread counters disagree with the notifications.")
@@ -0,0 +1,41 @@
+"""Apply the notification retention policy now."""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.retention import purge_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete read notifications past NOTIFICATION_RETENTION_READ_DAYS and "
+        "archive, then delete, all past NOTIFICATION_RETENTION_DAYS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.NOTIFICATION_PURGE_CHUNK,
+            help="Notifications purged per transaction.",
+        )
+        parser.add_argument(
+            "--no-compact",
+            action="store_false",
+            dest="compact",
+            help="Skip the VACUUM after purging (PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
+        stats = purge_notifications(
+            chunk_size=options["chunk_size"], compact=options["compact"]
+        )
+        self.stdout.write(
+            f"Purged {stats.deleted} notifications ({stats.archived} archived) in "
+            f"{stats.batches} batches, {stats.seconds:.1f}s, "
+            f"{stats.rows_per_second:,.0f} rows/s."
+        )
+        if stats.archive:
+            self.stdout.write(f"Archive: {stats.archive}")
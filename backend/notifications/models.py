@@ -2,12 +2,38 @@
 
 from __future__ import annotations
 
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+
 from django.conf import settings
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import F
+from django.utils import timezone
 
 from common.models import TimeStampedModel
 
 
+class NotificationQuerySet(models.QuerySet):
+    def mark_read(self, recipient_id: int, ids: Iterable[int] | None = None) -> int:
+        """Mark the unread notifications of ``recipient_id`` read, or only ``ids``.
+
+        One ``UPDATE`` served by ``notif_recipient_unread_idx``, and one more
+        for the unread counter. Returns the number of notifications marked.
+        """
+
+        using = self._db or router.db_for_write(self.model)
+        unread = self.using(using).filter(
+            recipient_id=recipient_id, read_at__isnull=True
+        )
+        if ids is not None:
+            unread = unread.filter(pk__in=list(ids))
+        now = timezone.now()
+        with transaction.atomic(using=using):
+            marked = unread.update(read_at=now, updated_at=now)
+            UnreadCount.objects.using(using).adjust({recipient_id: -marked})
+        return marked
+
+
 class Notification(TimeStampedModel):
     recipient = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications"
@@ -16,11 +42,84 @@ class Notification(TimeStampedModel):
     body = models.TextField()
     read_at = models.DateTimeField(null=True, blank=True)
 
-    def mark_read(self):
-        from django.utils import timezone
+    objects = NotificationQuerySet.as_manager()
 
-        self.read_at = timezone.now()
-        self.save(update_fields=["read_at", "updated_at"])
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["recipient", "-created_at"], name="notif_recipient_created_idx"
+            ),
+            models.Index(
+                fields=["recipient", "-created_at"],
+                name="notif_recipient_unread_idx",
+                condition=models.Q(read_at__isnull=True),
+            ),
+        ]
+
+    def mark_read(self):
+        if Notification.objects.mark_read(self.recipient_id, [self.pk]):
+            self.refresh_from_db(fields=["read_at", "updated_at"])
 
     def __str__(self) -> str:  # pragma: no cover
         return f"Notification to {self.recipient}"
+
+
+class UnreadCountQuerySet(models.QuerySet):
+    def adjust(self, deltas: Mapping[int, int]) -> None:
+        """Add ``deltas`` (recipient id to change) to the unread counters.
+
+        Recipients sharing a delta are updated by one ``UPDATE``; counters are
+        created on first increment.
+        """
+
+        by_delta: dict[int, list[int]] = defaultdict(list)
+        for recipient_id, delta in deltas.items():
+            if delta:
+                by_delta[delta].append(recipient_id)
+        created = sorted(
+            recipient_id
+            for delta, recipient_ids in by_delta.items()
+            if delta > 0
+            for recipient_id in recipient_ids
+        )
+        if created:
+            self.bulk_create(
+                [UnreadCount(recipient_id=recipient_id) for recipient_id in created],
+                ignore_conflicts=True,
+            )
+        for delta, recipient_ids in by_delta.items():
+            self.filter(recipient_id__in=sorted(recipient_ids)).update(
+                unread=F("unread") + delta
+            )
+
+
+class UnreadCount(models.Model):
+    """Denormalized number of unread notifications of a user.
+
+    Kept in step with ``Notification`` by the notification signals,
+    :meth:`NotificationQuerySet.mark_read` and the fan-out, so reading it is
+    one primary-key lookup. ``check_unread_counts`` repairs drift.
+    """
+
+    recipient = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="unread_count",
+    )
+    # Signed, so a drifted counter still accepts decrements until repaired.
+    unread = models.IntegerField(default=0)
+
+    objects = UnreadCountQuerySet.as_manager()
+
+    @classmethod
+    def for_user(cls, user_id: int) -> int:
+        return (
+            cls.objects.filter(recipient_id=user_id)
+            .values_list("unread", flat=True)
+            .first()
+            or 0
+        )
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.unread} unread for {self.recipient_id}"
@@ -0,0 +1,171 @@
+"""Retention policy for notifications.
+
+Read notifications are deleted ``NOTIFICATION_RETENTION_READ_DAYS`` after
+they were created. Anything older than ``NOTIFICATION_RETENTION_DAYS``,
+read or not, is appended to a gzip-compressed NDJSON file in
+``NOTIFICATION_ARCHIVE_DIR`` and then deleted. Either setting may be
+``None`` to keep those rows.
+
+Rows are purged in keyset batches over ``(created_at, id)``, each batch
+locked, archived and deleted in its own short transaction, so the job never
+holds locks for long and resumes where it stopped. Rows go through
+``QuerySet.delete()``, so the delete receivers keep search documents and
+unread counters in step. An archive batch is
+written before its transaction commits: if the delete is rolled back, the
+rows are archived again on the next run.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, router, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from notifications.models import Notification
+
+__all__ = ["PurgeStats", "purge_notifications"]
+
+logger = logging.getLogger("apatie.retention")
+
+ARCHIVE_FIELDS = (
+    "id",
+    "recipient_id",
+    "subject",
+    "body",
+    "read_at",
+    "created_at",
+    "updated_at",
+)
+
+
+@dataclass
+class PurgeStats:
+    deleted: int = 0
+    archived: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    archive: str | None = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.deleted / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "rows_per_second": round(self.rows_per_second, 1)}
+
+
+def _purge(
+    queryset: QuerySet,
+    chunk_size: int,
+    stats: PurgeStats,
+    archive: Path | None = None,
+) -> None:
+    using = router.db_for_write(Notification)
+    queryset = queryset.using(using).order_by("created_at", "pk")
+    after: tuple[datetime, int] | None = None
+    while True:
+        page = queryset
+        if after is not None:
+            page = page.filter(
+                Q(created_at__gt=after[0]) | Q(created_at=after[0], pk__gt=after[1])
+            )
+        with transaction.atomic(using=using):
+            rows = list(
+                page.select_for_update(skip_locked=True).values(*ARCHIVE_FIELDS)[
+                    :chunk_size
+                ]
+            )
+            if not rows:
+                return
+            if archive is not None:
+                # One gzip member per batch: readable even if a later batch fails.
+                with gzip.open(archive, "at", encoding="utf-8") as output:
+                    output.writelines(
+                        json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in rows
+                    )
+                stats.archived += len(rows)
+            # A model delete, so post_delete receivers drop the search
+            # documents and unread counts of the batch in this transaction.
+            _total, per_model = (
+                Notification.objects.using(using)
+                .filter(pk__in=[row["id"] for row in rows])
+                .delete()
+            )
+            deleted = per_model.get(Notification._meta.label, 0)
+        stats.deleted += deleted
+        stats.batches += 1
+        if len(rows) < chunk_size:
+            return
+        after = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+def _compact() -> None:
+    """Let PostgreSQL reuse the space of the purged rows and refresh statistics.
+
+    Plain ``VACUUM`` takes no exclusive lock; it cannot run in a transaction.
+    """
+
+    if connection.vendor != "postgresql" or connection.in_atomic_block:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"VACUUM (ANALYZE) {Notification._meta.db_table}")
+
+
+def purge_notifications(
+    *,
+    now: datetime | None = None,
+    chunk_size: int | None = None,
+    compact: bool = True,
+) -> PurgeStats:
+    """Apply the retention policy once and return what it purged."""
+
+    now = now or timezone.now()
+    chunk_size = chunk_size or settings.NOTIFICATION_PURGE_CHUNK
+    stats = PurgeStats()
+    started = time.perf_counter()
+
+    read_days = settings.NOTIFICATION_RETENTION_READ_DAYS
+    if read_days is not None:
+        _purge(
+            Notification.objects.filter(
+                read_at__isnull=False, created_at__lt=now - timedelta(days=read_days)
+            ),
+            chunk_size,
+            stats,
+        )
+    days = settings.NOTIFICATION_RETENTION_DAYS
+    if days is not None:
+        directory = Path(settings.NOTIFICATION_ARCHIVE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        archive = directory / f"notifications-{now:%Y%m%dT%H%M%S}.ndjson.gz"
+        _purge(
+            Notification.objects.filter(created_at__lt=now - timedelta(days=days)),
+            chunk_size,
+            stats,
+            archive,
+        )
+        if archive.exists():
+            stats.archive = str(archive)
+
+    stats.seconds = time.perf_counter() - started
+    if stats.deleted and compact:
+        _compact()
+    logger.info(
+        "Purged %d notifications (%d archived) in %d batches, %.1fs, %.0f rows/s",
+        stats.deleted,
+        stats.archived,
+        stats.batches,
+        stats.seconds,
+        stats.rows_per_second,
+    )
+    return stats
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from django.conf import settings
 from rest_framework import serializers
 
 from .models import Notification
@@ -20,3 +21,42 @@ class NotificationSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "read_at", "created_at", "updated_at"]
+
+
+class BroadcastSerializer(serializers.Serializer):
+    subject = serializers.CharField(max_length=255)
+    body = serializers.CharField()
+    channels = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+        allow_empty=False,
+        help_text="Delivery channels; every configured channel by default.",
+    )
+    digest = serializers.BooleanField(
+        default=False,
+        help_text=(
+            "Add the message to each recipient's next digest instead of sending "
+            "it on its own."
+        ),
+    )
+
+    def validate_channels(self, value: list[str]) -> list[str]:
+        unknown = sorted(set(value) - set(settings.NOTIFICATION_CHANNELS))
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown channels: {', '.join(unknown)}."
+            )
+        return list(dict.fromkeys(value))
+
+    def validate(self, attrs: dict) -> dict:
+        if attrs.get("digest") and "channels" in attrs:
+            raise serializers.ValidationError(
+                {"channels": ["Digests are sent on every channel."]}
+            )
+        return attrs
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
@@ -0,0 +1,110 @@
+"""Background jobs for notifications."""
+
+from __future__ import annotations
+
+from asgiref.sync import async_to_sync
+from celery import shared_task
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+
+from business.models import BusinessProfile
+from notifications import retention
+from notifications.adapters import NotificationMessage, get_notification_service
+from notifications.consumers import user_group
+from notifications.models import Notification
+from notifications.serializers import NotificationSerializer
+
+
+@shared_task(acks_late=True)
+def deliver_notifications(channel: str, notification_ids: list[int]) -> int:
+    """Deliver a batch of notifications on ``channel`` in one service call.
+
+    Returns the number the channel accepted.
+    """
+
+    messages = [
+        NotificationMessage(recipient=email, subject=subject, body=body)
+        for email, subject, body in Notification.objects.filter(pk__in=notification_ids)
+        .order_by("pk")
+        .values_list("recipient__email", "subject", "body")
+    ]
+    if not messages:
+        return 0
+    results = get_notification_service(channel).send_many(messages)
+    return sum(result.success for result in results)
+
+
+@shared_task
+def fan_out_notifications(
+    subject: str,
+    body: str,
+    channels: list[str] | None = None,
+    business_id: int | None = None,
+    digest: bool = False,
+) -> dict[str, int]:
+    """Notify the customers of ``business_id``, or every active user.
+
+    Returns the number of notifications created and chunks queued, or with
+    ``digest`` the number of recipients whose next digest gets the message.
+    """
+
+    # notifications.dispatch and notifications.digest queue this module's
+    # tasks, so they import it.
+    from notifications.digest import notify_many
+    from notifications.dispatch import customers_of, send_many
+
+    if business_id is None:
+        recipients = get_user_model().objects.filter(is_active=True)
+    else:
+        business = BusinessProfile.objects.filter(pk=business_id).first()
+        if business is None:
+            return {"notifications": 0, "batches": 0}
+        recipients = customers_of(business)
+    if digest:
+        return {"digested": notify_many(recipients, subject=subject, body=body)}
+    result = send_many(recipients, subject=subject, body=body, channels=channels)
+    return {"notifications": result.notifications, "batches": result.batches}
+
+
+@shared_task
+def push_notifications(notification_ids: list[int]) -> int:
+    """Send committed notifications to their recipients' open websockets.
+
+    Returns the number of notifications sent to the channel layer.
+    """
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return 0
+    notifications = Notification.objects.filter(pk__in=notification_ids).order_by("pk")
+    pushed = 0
+    for notification in NotificationSerializer(notifications, many=True).data:
+        async_to_sync(channel_layer.group_send)(
+            user_group(notification["recipient"]),
+            {"type": "notification.created", "notification": notification},
+        )
+        pushed += 1
+    return pushed
+
+
+@shared_task
+def purge_notifications() -> dict:
+    """Apply the notification retention policy; scheduled by Celery beat.
+
+    Returns the purge metrics, including ``rows_per_second``.
+    """
+
+    return retention.purge_notifications().as_dict()
+
+
+@shared_task
+def flush_digest(recipient_id: int) -> int:
+    """Send the recipient's digest once its window has passed.
+
+    Returns the number of messages it combined.
+    """
+
+    # notifications.digest schedules this task, so it imports this module.
+    from notifications.digest import flush
+
+    return flush(recipient_id)
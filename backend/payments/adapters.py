@@ -2,15 +2,23 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from enum import Enum
-from typing import Any, Dict
+import random
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any, Dict, Protocol
 
+from django.conf import settings
+from django.db import models
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
 
-class PaymentStatus(Enum):
-    PENDING = "pending"
-    COMPLETED = "completed"
-    FAILED = "failed"
+
+class PaymentStatus(models.TextChoices):
+    # Stored as the member's position: append new statuses at the end.
+    PENDING = "pending", _("Pending")
+    COMPLETED = "completed", _("Completed")
+    FAILED = "failed", _("Failed")
 
 
 @dataclass
@@ -20,16 +28,77 @@ class PaymentResult:
     details: Dict[str, Any]
 
 
+@dataclass
+class ChargeRequest:
+    amount: Any
+    currency: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class GatewayError(Exception):
+    """The gateway did not answer; the charge may be retried with the same key."""
+
+
+class PaymentGateway(Protocol):
+    """Interface the payment views and tasks expect from a provider adapter."""
+
+    def charge(
+        self, *, amount: float, currency: str, metadata: Dict[str, Any] | None = None
+    ) -> PaymentResult: ...
+
+    def charge_many(self, charges: Sequence[ChargeRequest]) -> list[PaymentResult]:
+        """Charge several payments in one call; results follow ``charges``.
+
+        Raises :class:`GatewayError` when the batch as a whole went unanswered.
+        """
+
+
 class MockPaymentGateway:
-    """In-memory gateway used for local development and tests."""
+    """In-memory gateway used for local development and tests.
+
+    ``latency`` (seconds) and ``failure_rate`` (0-1) imitate a slow or flaky
+    provider; ``seed`` makes the failures repeatable.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
 
     def charge(
         self, *, amount: float, currency: str, metadata: Dict[str, Any] | None = None
     ) -> PaymentResult:
-        metadata = metadata or {}
-        reference = metadata.get("reference", "mock-reference")
+        self._round_trip()
+        return self._settle(ChargeRequest(amount, currency, metadata or {}))
+
+    def charge_many(self, charges: Sequence[ChargeRequest]) -> list[PaymentResult]:
+        # One round trip for the whole batch, as with a provider's batch API.
+        self._round_trip()
+        return [self._settle(charge) for charge in charges]
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise GatewayError("The payment gateway did not respond.")
+
+    @staticmethod
+    def _settle(charge: ChargeRequest) -> PaymentResult:
         return PaymentResult(
-            reference=reference,
+            reference=charge.metadata.get("reference", "mock-reference"),
             status=PaymentStatus.COMPLETED,
-            details={"amount": amount, "currency": currency},
+            details={"amount": charge.amount, "currency": charge.currency},
         )
+
+
+def get_payment_gateway() -> PaymentGateway:
+    """Return the gateway configured by ``settings.PAYMENT_GATEWAY``."""
+
+    config = settings.PAYMENT_GATEWAY
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
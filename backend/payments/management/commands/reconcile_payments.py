@@ -0,0 +1,54 @@
+"""Reconcile payment transactions against a provider settlement report."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.reconciliation import REPORT_FORMATS, reconcile_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a reference-sorted settlement report (CSV or NDJSON) against the "
+        "payment ledger and print each mismatch as one JSON line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("report", help="Path of the settlement report.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(set(REPORT_FORMATS.values())),
+            help="Report format; guessed from the file extension by default.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write mismatches to this file instead of standard output.",
+        )
+        parser.add_argument(
+            "--fail-on-mismatch",
+            action="store_true",
+            help="Exit with an error when the report and the ledger disagree.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options["output"]:
+                with open(options["output"], "w", encoding="utf-8") as output:
+                    counts = reconcile_file(
+                        options["report"], output, options["format"]
+                    )
+            else:
+                counts = reconcile_file(
+                    options["report"], self.stdout, options["format"]
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        summary = f"{sum(counts.values())} mismatches."
+        if counts:
+            summary += " " + ", ".join(
+                f"{kind}: {count}" for kind, count in sorted(counts.items())
+            )
+        self.stderr.write(summary)
+        if counts and options["fail_on_mismatch"]:
+            raise CommandError("The settlement report does not match the ledger.")
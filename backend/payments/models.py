@@ -4,25 +4,115 @@ from __future__ import annotations
 
 from decimal import Decimal
 
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
 
 from appointments.models import Appointment
-from common.models import TimeStampedModel
+from common.fields import ChoiceCodeField
+from common.models import StatusMachineMixin, TimeStampedModel
+from payments.adapters import PaymentStatus
 
 
-class PaymentTransaction(TimeStampedModel):
+class BinaryCollate(models.Func):
+    """Compare text byte by byte, the order Python sorts ``str`` in.
+
+    Locale collations (PostgreSQL's default) order punctuation and case
+    differently, which would break merges against Python-sorted data.
+    """
+
+    template = '%(expressions)s COLLATE "C"'
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="%(expressions)s COLLATE BINARY",
+            **extra_context,
+        )
+
+
+class PaymentTransactionQuerySet(models.QuerySet):
+    def pending(self):
+        """Return pending payments, oldest first, from ``payment_pending_idx``."""
+
+        return self.filter(status=PaymentStatus.PENDING).order_by("created_at", "pk")
+
+    def by_reference(self):
+        """Return settled payments in byte order of ``external_reference``.
+
+        Served by ``payment_reference_idx``; the order matches Python's string
+        order, so the rows can be merged with a sorted provider report.
+        """
+
+        return self.exclude(external_reference="").order_by(
+            BinaryCollate("external_reference"), "pk"
+        )
+
+    def claim_pending(self, capture_key: str, limit: int) -> int:
+        """Claim up to ``limit`` unclaimed pending payments for ``capture_key``.
+
+        Rows are picked oldest first with ``SELECT ... FOR UPDATE SKIP
+        LOCKED``, so concurrent claims divide the queue instead of waiting on
+        each other. Returns the number of payments claimed.
+        """
+
+        using = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            ids = list(
+                self.using(using)
+                .pending()
+                .filter(capture_key="")
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:limit]
+            )
+            if not ids:
+                return 0
+            return (
+                self.model._default_manager.using(using)
+                .filter(pk__in=ids)
+                .update(capture_key=capture_key, updated_at=timezone.now())
+            )
+
+
+class PaymentTransaction(StatusMachineMixin, TimeStampedModel):
+    Status = PaymentStatus
+    TRANSITIONS = {
+        PaymentStatus.PENDING: {PaymentStatus.COMPLETED, PaymentStatus.FAILED},
+        PaymentStatus.FAILED: {PaymentStatus.PENDING},
+    }
+
     appointment = models.ForeignKey(
         Appointment, on_delete=models.CASCADE, related_name="payments"
     )
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     currency = models.CharField(max_length=10, default="USD")
-    status = models.CharField(max_length=20, default="pending")
+    status = ChoiceCodeField(choices_enum=PaymentStatus, default=PaymentStatus.PENDING)
     external_reference = models.CharField(max_length=255, blank=True)
+    # Idempotency key of the background capture claiming this payment.
+    capture_key = models.CharField(max_length=255, blank=True)
+
+    objects = PaymentTransactionQuerySet.as_manager()
 
-    def mark_completed(self, reference: str):
-        self.status = "completed"
-        self.external_reference = reference
-        self.save(update_fields=["status", "external_reference", "updated_at"])
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["appointment", "-created_at"], name="payment_appt_created_idx"
+            ),
+            models.Index(
+                fields=["status", "-created_at"], name="payment_status_created_idx"
+            ),
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(status=PaymentStatus.PENDING),
+                name="payment_pending_idx",
+            ),
+            models.Index(
+                BinaryCollate("external_reference"),
+                models.F("id"),
+                condition=~models.Q(external_reference=""),
+                name="payment_reference_idx",
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"Payment {self.pk} - {self.status}"
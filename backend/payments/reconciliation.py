@@ -0,0 +1,202 @@
+"""Reconcile payment transactions against provider settlement reports.
+
+Both sides are read as streams sorted by reference: the report file line by
+line and the ledger through ``payment_reference_idx`` in chunks. A merge-join
+over the two then reports every disagreement while holding one entry from
+each side, so memory stays flat however long the report is. Reports must be
+sorted by reference in byte order (``sort`` with ``LC_ALL=C``).
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import IO
+
+from payments.models import PaymentTransaction
+
+__all__ = [
+    "AMOUNT_DRIFT",
+    "MISSING_IN_LEDGER",
+    "MISSING_IN_REPORT",
+    "STATUS_DRIFT",
+    "Entry",
+    "Mismatch",
+    "ReportError",
+    "ledger_entries",
+    "read_report",
+    "reconcile",
+    "reconcile_file",
+    "report_format",
+]
+
+REPORT_FIELDS = ("reference", "amount", "currency", "status")
+REPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+MISSING_IN_LEDGER = "missing_in_ledger"
+MISSING_IN_REPORT = "missing_in_report"
+AMOUNT_DRIFT = "amount_drift"
+STATUS_DRIFT = "status_drift"
+
+
+class ReportError(ValueError):
+    """A report line is malformed or out of order."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+@dataclass(frozen=True)
+class Entry:
+    reference: str
+    amount: Decimal
+    currency: str
+    status: str
+
+
+@dataclass(frozen=True)
+class Mismatch:
+    kind: str
+    reference: str
+    payment: int | None
+    ledger: Entry | None
+    report: Entry | None
+
+    def as_dict(self) -> dict:
+        def side(entry: Entry | None):
+            if entry is None:
+                return None
+            data = asdict(entry)
+            del data["reference"]
+            data["amount"] = str(entry.amount)
+            return data
+
+        return {
+            "kind": self.kind,
+            "reference": self.reference,
+            "payment": self.payment,
+            "ledger": side(self.ledger),
+            "report": side(self.report),
+        }
+
+
+def report_format(path: str | Path) -> str:
+    """Guess a report's format, ``csv`` or ``ndjson``, from its file name."""
+
+    try:
+        return REPORT_FORMATS[Path(path).suffix.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Cannot tell the format of {path}; expected one of "
+            f"{', '.join(REPORT_FORMATS)}."
+        ) from None
+
+
+def read_report(lines: Iterable[str], fmt: str) -> Iterator[Entry]:
+    """Parse a CSV (with header) or NDJSON report into entries, checking order."""
+
+    if fmt == "csv":
+        rows = enumerate(csv.DictReader(lines), start=2)
+    elif fmt == "ndjson":
+        rows = (
+            (number, _decode(number, line))
+            for number, line in enumerate(lines, start=1)
+            if line.strip()
+        )
+    else:
+        raise ValueError(f"Unknown report format {fmt!r}.")
+
+    previous = None
+    for number, row in rows:
+        values = (
+            [row.get(name) for name in REPORT_FIELDS] if isinstance(row, dict) else []
+        )
+        if len(values) != len(REPORT_FIELDS) or None in values:
+            raise ReportError(
+                number, f"expected the fields {', '.join(REPORT_FIELDS)}."
+            )
+        reference, amount, currency, status = (str(value).strip() for value in values)
+        if not reference:
+            raise ReportError(number, "the reference is empty.")
+        try:
+            amount = Decimal(amount)
+        except InvalidOperation:
+            raise ReportError(number, f"{amount!r} is not an amount.") from None
+        if previous is not None and reference < previous:
+            raise ReportError(
+                number, f"{reference!r} comes after {previous!r}; sort the report."
+            )
+        previous = reference
+        yield Entry(reference, amount, currency, status)
+
+
+def _decode(number: int, line: str) -> dict:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ReportError(number, f"invalid JSON ({exc.msg}).") from None
+
+
+def ledger_entries(
+    queryset=None, chunk_size: int = 2000
+) -> Iterator[tuple[int, Entry]]:
+    """Yield ``(payment id, entry)`` for settled payments in reference order."""
+
+    if queryset is None:
+        queryset = PaymentTransaction.objects.all()
+    rows = queryset.by_reference().values_list(
+        "pk", "external_reference", "amount", "currency", "status"
+    )
+    for pk, reference, amount, currency, status in rows.iterator(chunk_size):
+        yield pk, Entry(reference, amount, currency, str(status))
+
+
+def reconcile(
+    report: Iterable[Entry], ledger: Iterable[tuple[int, Entry]]
+) -> Iterator[Mismatch]:
+    """Merge-join two reference-sorted streams and yield their disagreements.
+
+    Repeated references pair up in order; unpaired repeats are missing.
+    """
+
+    report, ledger = iter(report), iter(ledger)
+    theirs = next(report, None)
+    pk, ours = next(ledger, (None, None))
+    while theirs is not None or ours is not None:
+        if ours is None or (theirs is not None and theirs.reference < ours.reference):
+            yield Mismatch(MISSING_IN_LEDGER, theirs.reference, None, None, theirs)
+            theirs = next(report, None)
+            continue
+        if theirs is None or ours.reference < theirs.reference:
+            yield Mismatch(MISSING_IN_REPORT, ours.reference, pk, ours, None)
+            pk, ours = next(ledger, (None, None))
+            continue
+        if ours.amount != theirs.amount or ours.currency != theirs.currency:
+            yield Mismatch(AMOUNT_DRIFT, ours.reference, pk, ours, theirs)
+        if ours.status != theirs.status:
+            yield Mismatch(STATUS_DRIFT, ours.reference, pk, ours, theirs)
+        theirs = next(report, None)
+        pk, ours = next(ledger, (None, None))
+
+
+def reconcile_file(
+    path: str | Path, output: IO[str], fmt: str | None = None
+) -> Counter:
+    """Reconcile the report at ``path``, writing mismatches to ``output`` as NDJSON.
+
+    Returns the number of mismatches of each kind.
+    """
+
+    fmt = fmt or report_format(path)
+    counts: Counter = Counter()
+    with open(path, newline="", encoding="utf-8") as lines:
+        for mismatch in reconcile(read_report(lines, fmt), ledger_entries()):
+            counts[mismatch.kind] += 1
+            output.write(json.dumps(mismatch.as_dict()) + "\n")
+    return counts
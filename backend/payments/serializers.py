@@ -17,6 +17,7 @@ class PaymentTransactionSerializer(serializers.ModelSerializer):
             "currency",
             "status",
             "external_reference",
+            "capture_key",
             "created_at",
             "updated_at",
         ]
@@ -24,6 +25,7 @@ class PaymentTransactionSerializer(serializers.ModelSerializer):
             "id",
             "status",
             "external_reference",
+            "capture_key",
             "created_at",
             "updated_at",
         ]
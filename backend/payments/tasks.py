@@ -0,0 +1,162 @@
+"""Background jobs for payment transactions."""
+
+from __future__ import annotations
+
+from celery import shared_task
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.cache import bump_generation_on_commit
+from api.search import reindex
+from business.rollups import touch_payments
+from common.models import TransitionError
+from payments.adapters import (
+    ChargeRequest,
+    GatewayError,
+    PaymentStatus,
+    get_payment_gateway,
+)
+from payments.models import PaymentTransaction
+from payments.reconciliation import reconcile_file
+
+
+def _retry(task, exc: Exception):
+    """Return ``task.retry()`` after an exponential, jittered backoff."""
+
+    countdown = get_exponential_backoff_interval(
+        factor=settings.PAYMENT_CAPTURE_RETRY_BACKOFF,
+        retries=task.request.retries,
+        maximum=settings.PAYMENT_CAPTURE_RETRY_BACKOFF_MAX,
+        full_jitter=True,
+    )
+    return task.retry(
+        exc=exc, countdown=countdown, max_retries=settings.PAYMENT_CAPTURE_MAX_RETRIES
+    )
+
+
+@shared_task(bind=True, acks_late=True)
+def capture_payment(self, payment_id: int, capture_key: str) -> str | None:
+    """Charge a payment claimed by ``capture_key`` and record the outcome.
+
+    The gateway receives the key as well, so a redelivered or retried task
+    cannot charge twice. Unanswered charges are retried with exponential
+    backoff; once ``PAYMENT_CAPTURE_MAX_RETRIES`` is spent the payment fails
+    and releases the claim. Returns the resulting status, or ``None`` when the
+    claim is gone.
+    """
+
+    payment = PaymentTransaction.objects.filter(
+        pk=payment_id, capture_key=capture_key
+    ).first()
+    if payment is None:
+        return None
+    if payment.status != PaymentStatus.PENDING:
+        return payment.status
+
+    gateway = get_payment_gateway()
+    try:
+        result = gateway.charge(
+            amount=payment.amount,
+            currency=payment.currency,
+            metadata={"reference": str(payment.pk), "idempotency_key": capture_key},
+        )
+    except GatewayError as exc:
+        if self.request.retries < settings.PAYMENT_CAPTURE_MAX_RETRIES:
+            raise _retry(self, exc)
+        # Release the claim so a retried payment can be captured anew.
+        target, changes = PaymentStatus.FAILED, {"capture_key": ""}
+    else:
+        target, changes = result.status, {"external_reference": result.reference}
+
+    try:
+        payment.transition_to(target, **changes)
+    except TransitionError:
+        # A duplicate delivery of this task recorded the outcome first.
+        payment.refresh_from_db(fields=["status"])
+    return payment.status
+
+
+@shared_task(bind=True, acks_late=True)
+def capture_payment_batch(self, capture_key: str) -> int:
+    """Charge every payment claimed by ``capture_key`` in one gateway call.
+
+    Results are written back with one ``bulk_update`` for rows that are still
+    pending under the claim. Retries and failure follow
+    :func:`capture_payment`. Returns the number of payments updated.
+    """
+
+    payments = list(
+        PaymentTransaction.objects.filter(
+            capture_key=capture_key, status=PaymentStatus.PENDING
+        ).order_by("pk")
+    )
+    if not payments:
+        return 0
+
+    try:
+        results = get_payment_gateway().charge_many(
+            [
+                ChargeRequest(
+                    amount=payment.amount,
+                    currency=payment.currency,
+                    metadata={
+                        "reference": str(payment.pk),
+                        "idempotency_key": f"{capture_key}:{payment.pk}",
+                    },
+                )
+                for payment in payments
+            ]
+        )
+    except GatewayError as exc:
+        if self.request.retries < settings.PAYMENT_CAPTURE_MAX_RETRIES:
+            raise _retry(self, exc)
+        results = None
+
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = set(
+            PaymentTransaction.objects.select_for_update()
+            .filter(
+                pk__in=[payment.pk for payment in payments],
+                capture_key=capture_key,
+                status=PaymentStatus.PENDING,
+            )
+            .values_list("pk", flat=True)
+        )
+        changed = []
+        for index, payment in enumerate(payments):
+            if payment.pk not in claimed:
+                continue
+            if results is None:
+                payment.status = PaymentStatus.FAILED
+                payment.capture_key = ""
+            else:
+                payment.status = results[index].status
+                payment.external_reference = results[index].reference
+            payment.updated_at = now
+            changed.append(payment)
+        PaymentTransaction.objects.bulk_update(
+            changed,
+            ["status", "external_reference", "capture_key", "updated_at"],
+            batch_size=500,
+        )
+        # bulk_update sends no post_save: refresh what its receivers would.
+        reindex(PaymentTransaction, [payment.pk for payment in changed])
+        bump_generation_on_commit(PaymentTransaction)
+        touch_payments(changed)
+    return len(changed)
+
+
+@shared_task
+def reconcile_payments(
+    report_path: str, output_path: str, report_format: str | None = None
+) -> dict[str, int]:
+    """Reconcile a provider report, writing mismatches to ``output_path``.
+
+    Returns the number of mismatches of each kind.
+    """
+
+    with open(output_path, "w", encoding="utf-8") as output:
+        return dict(reconcile_file(report_path, output, report_format))
@@ -0,0 +1,198 @@
+"""Fire concurrent bookings at ``POST /appointments/`` and check for overlaps.
+
+Each worker thread books hour-long appointments on a half-hour grid of start
+times, so most requests collide with a neighbour. Every request must end in a
+``201`` or a ``409`` and the stored bookings must not overlap::
+
+    python backend/scripts/benchmark_bookings.py --bookings 500 --workers 50
+
+The test settings use an in-memory SQLite database, which threads cannot
+share, so the script swaps it for a temporary file. Point
+``DJANGO_SETTINGS_MODULE``/``DATABASE_URL`` at PostgreSQL to exercise the
+exclusion constraint instead of the row locks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.test")
+
+from django.conf import settings  # noqa: E402
+
+_database = settings.DATABASES["default"]
+_scratch = None
+if _database["ENGINE"].endswith("sqlite3") and _database["NAME"] == ":memory:":
+    _scratch = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False)
+    _database["NAME"] = _scratch.name
+    # Writers queue on SQLite's database lock; give the queue time to drain.
+    _database.setdefault("OPTIONS", {})["timeout"] = 60
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+
+from api.viewsets import AppointmentViewSet  # noqa: E402
+from appointments.models import Appointment  # noqa: E402
+from business.models import BusinessProfile  # noqa: E402
+from services.models import Service  # noqa: E402
+from users.models import User  # noqa: E402
+
+GRID = timedelta(minutes=30)
+
+
+def seed(businesses: int) -> tuple[User, list[Service]]:
+    staff = User.objects.create_user(
+        email="booking-benchmark@example.com", password="unused", is_staff=True
+    )
+    services = []
+    for index in range(businesses):
+        business = BusinessProfile.objects.create(
+            owner=staff, name=f"Benchmark {index}"
+        )
+        services.append(
+            Service.objects.create(
+                business=business, name="Benchmark", duration_minutes=60
+            )
+        )
+    return staff, services
+
+
+def book(
+    staff: User,
+    services: list[Service],
+    slots: int,
+    count: int,
+    barrier: threading.Barrier,
+    seed_value: int,
+    results: list[tuple[int, float]],
+) -> None:
+    factory = APIRequestFactory()
+    # Throttling would turn most of the burst into 429s before it reaches the
+    # booking path under test.
+    view = AppointmentViewSet.as_view({"post": "create"}, throttle_classes=[])
+    chooser = random.Random(seed_value)
+    day = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    try:
+        barrier.wait()
+        for _ in range(count):
+            service = chooser.choice(services)
+            start = day + chooser.randrange(slots) * GRID
+            request = factory.post(
+                "/api/v1/appointments/",
+                {
+                    "customer": staff.pk,
+                    "business": service.business_id,
+                    "service": service.pk,
+                    "scheduled_for": start.isoformat(),
+                },
+                format="json",
+            )
+            force_authenticate(request, user=staff)
+            started = time.perf_counter()
+            response = view(request)
+            results.append((response.status_code, time.perf_counter() - started))
+    finally:
+        connection.close()
+
+
+def overlaps(services: list[Service]) -> int:
+    found = 0
+    for service in services:
+        latest_end = None
+        for start, end in (
+            Appointment.objects.filter(business_id=service.business_id)
+            .holding_slots()
+            .order_by("scheduled_for")
+            .values_list("scheduled_for", "ends_at")
+        ):
+            if latest_end is not None and start < latest_end:
+                found += 1
+            latest_end = end if latest_end is None else max(latest_end, end)
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--businesses", type=int, default=5)
+    parser.add_argument(
+        "--slots", type=int, default=16, help="half-hour start times per business"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    staff, services = seed(args.businesses)
+    connection.close()
+
+    per_worker, extra = divmod(args.bookings, args.workers)
+    barrier = threading.Barrier(args.workers)
+    results: list[tuple[int, float]] = []
+    threads = [
+        threading.Thread(
+            target=book,
+            args=(
+                staff,
+                services,
+                args.slots,
+                per_worker + (index < extra),
+                barrier,
+                args.seed + index,
+                results,
+            ),
+        )
+        for index in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    statuses = Counter(code for code, _latency in results)
+    latencies = sorted(latency for _code, latency in results)
+    clashes = overlaps(services)
+    print(
+        f"{len(results)} bookings from {args.workers} workers in {elapsed:.2f}s "
+        f"({len(results) / elapsed:.0f} req/s)"
+    )
+    print(f"statuses: {dict(sorted(statuses.items()))}")
+    if latencies:
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(
+            f"latency ms: p50 {statistics.median(latencies) * 1000:.1f}, "
+            f"p95 {p95 * 1000:.1f}, max {latencies[-1] * 1000:.1f}"
+        )
+    print(f"overlapping bookings: {clashes}")
+
+    staff.delete()
+    connection.close()
+    if _scratch is not None:
+        os.unlink(_scratch.name)
+
+    unexpected = set(statuses) - {201, 409}
+    if clashes or unexpected or not statuses[201]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
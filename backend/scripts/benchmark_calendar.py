@@ -0,0 +1,181 @@
+"""Time calendar queries for one business against a large appointments table.
+
+Seeds ``--rows`` appointments spread over ``--businesses`` businesses, then
+times a week and a month of ``build_calendar()`` and of the range-filtered
+appointment list for random businesses. Both should stay flat as the table
+grows, because they are index range scans::
+
+    python backend/scripts/benchmark_calendar.py --rows 10000000
+
+The test settings use an in-memory SQLite database; the script swaps it for a
+temporary file so ten million rows need not fit in memory. Point
+``DJANGO_SETTINGS_MODULE``/``DATABASE_URL`` at PostgreSQL to measure there;
+the seeding transaction is rolled back afterwards either way.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.test")
+
+from django.conf import settings  # noqa: E402
+
+_database = settings.DATABASES["default"]
+_scratch = None
+if _database["ENGINE"].endswith("sqlite3") and _database["NAME"] == ":memory:":
+    _scratch = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False)
+    _database["NAME"] = _scratch.name
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+
+from api.calendar import build_calendar  # noqa: E402
+from api.viewsets import AppointmentViewSet  # noqa: E402
+from appointments.models import Appointment  # noqa: E402
+from business.models import BusinessProfile  # noqa: E402
+from services.models import Service  # noqa: E402
+from users.models import User  # noqa: E402
+
+SEED_BATCH = 20_000
+FIRST_DAY = date(2020, 1, 1)
+# Bookings per business per day, an hour apart from 08:00 UTC.
+PER_DAY = 8
+
+
+def seed(rows: int, businesses: int) -> list[BusinessProfile]:
+    owner = User.objects.create_user(
+        email="calendar-benchmark@example.com", password="unused"
+    )
+    profiles = BusinessProfile.objects.bulk_create(
+        BusinessProfile(owner=owner, name=f"Benchmark {index}")
+        for index in range(businesses)
+    )
+    services = Service.objects.bulk_create(
+        Service(business=profile, name="Benchmark", duration_minutes=60)
+        for profile in profiles
+    )
+    start = datetime.combine(FIRST_DAY, datetime.min.time(), tzinfo=UTC)
+    created = 0
+    started = time.perf_counter()
+    while created < rows:
+        batch = []
+        for number in range(created, min(created + SEED_BATCH, rows)):
+            # Consecutive numbers go to different businesses so every business
+            # fills its diary at the same pace.
+            slot, index = divmod(number, businesses)
+            day, hour = divmod(slot, PER_DAY)
+            scheduled_for = start + timedelta(days=day, hours=8 + hour)
+            batch.append(
+                Appointment(
+                    customer_id=owner.pk,
+                    business_id=profiles[index].pk,
+                    service_id=services[index].pk,
+                    scheduled_for=scheduled_for,
+                    ends_at=scheduled_for + timedelta(hours=1),
+                    status="cancelled" if number % 10 == 0 else "scheduled",
+                )
+            )
+        Appointment.objects.bulk_create(batch)
+        created += len(batch)
+        if created % (SEED_BATCH * 25) == 0 or created == rows:
+            print(f"seeded {created} rows in {time.perf_counter() - started:.0f}s")
+    return profiles
+
+
+def timed(callback, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        callback()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    print(
+        f"{label:<14} p50 {statistics.median(ordered):7.2f} ms  "
+        f"p95 {p95:7.2f} ms  max {ordered[-1]:7.2f} ms"
+    )
+
+
+def explain(queryset) -> str:
+    sql, params = queryset.query.sql_with_params()
+    prefix = "EXPLAIN QUERY PLAN" if connection.vendor == "sqlite" else "EXPLAIN"
+    with connection.cursor() as cursor:
+        cursor.execute(f"{prefix} {sql}", params)
+        return "\n".join(" ".join(map(str, row)) for row in cursor.fetchall())
+
+
+def measure(profiles: list[BusinessProfile], args: argparse.Namespace) -> None:
+    days_seeded = args.rows // (args.businesses * PER_DAY)
+    chooser = random.Random(args.seed)
+    filterset_class = AppointmentViewSet.filterset_class
+
+    def window(length: int) -> tuple[BusinessProfile, list[date]]:
+        first = FIRST_DAY + timedelta(days=chooser.randrange(max(days_seeded, 1)))
+        return chooser.choice(profiles), [
+            first + timedelta(days=offset) for offset in range(length)
+        ]
+
+    def listing(length: int):
+        business, days = window(length)
+        return filterset_class(
+            {
+                "business": business.pk,
+                "scheduled_for__gte": days[0].isoformat(),
+                "scheduled_for__lt": (days[-1] + timedelta(days=1)).isoformat(),
+            },
+            queryset=Appointment.objects.order_by("scheduled_for"),
+        ).qs
+
+    for label, length in (("week", 7), ("month", 31)):
+        report(
+            f"calendar {label}",
+            timed(lambda length=length: build_calendar(*window(length)), args.repeat),
+        )
+        report(
+            f"list {label}",
+            timed(lambda length=length: list(listing(length)), args.repeat),
+        )
+    print(explain(listing(31)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--businesses", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    with transaction.atomic():
+        profiles = seed(args.rows, args.businesses)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        measure(profiles, args)
+        transaction.set_rollback(True)
+
+    connection.close()
+    if _scratch is not None:
+        os.unlink(_scratch.name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
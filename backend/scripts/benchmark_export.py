@@ -0,0 +1,144 @@
+"""Measure resident memory while streaming a large payments export.
+
+Seeds ``--rows`` payment transactions inside a transaction that is rolled back
+afterwards, streams them through ``GET /payments/export/`` and samples the
+process RSS as rows go by. A constant-memory export shows a flat RSS column::
+
+    python backend/scripts/benchmark_export.py --rows 1000000 --format csv
+
+The default settings use an in-memory SQLite database; point
+``DJANGO_SETTINGS_MODULE``/``DATABASE_URL`` at PostgreSQL to exercise
+server-side cursors.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.test")
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+
+from api.viewsets import PaymentTransactionViewSet  # noqa: E402
+from appointments.models import Appointment  # noqa: E402
+from business.models import BusinessProfile  # noqa: E402
+from payments.models import PaymentTransaction  # noqa: E402
+from services.models import Service  # noqa: E402
+from users.models import User  # noqa: E402
+
+SEED_BATCH = 10_000
+
+
+def rss_mb() -> float:
+    """Return the current resident set size in MiB."""
+
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak RSS is the closest portable figure (KiB on Linux, bytes on macOS).
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def seed(rows: int) -> User:
+    staff = User.objects.create_user(
+        email="export-benchmark@example.com", password="unused", is_staff=True
+    )
+    business = BusinessProfile.objects.create(owner=staff, name="Benchmark")
+    service = Service.objects.create(business=business, name="Benchmark")
+    appointment = Appointment.objects.create(
+        customer=staff,
+        business=business,
+        service=service,
+        scheduled_for=timezone.now(),
+    )
+    remaining = rows
+    while remaining:
+        size = min(SEED_BATCH, remaining)
+        PaymentTransaction.objects.bulk_create(
+            PaymentTransaction(
+                appointment=appointment,
+                amount=Decimal("49.90"),
+                external_reference=f"bench-{remaining - index}",
+            )
+            for index in range(size)
+        )
+        remaining -= size
+    return staff
+
+
+def stream(user: User, export_format: str, rows: int, samples: int) -> float:
+    request = APIRequestFactory().get(
+        "/api/v1/payments/export/", {"export_format": export_format}
+    )
+    force_authenticate(request, user=user)
+    response = PaymentTransactionViewSet.as_view({"get": "export"})(request)
+
+    every = max(rows // samples, 1)
+    baseline = rss_mb()
+    peak = baseline
+    streamed = 0
+    size = 0
+    started = time.perf_counter()
+    print(f"{'rows':>10} {'rss MiB':>9} {'bytes':>14}")
+    lines = iter(response.streaming_content)
+    if export_format == "csv":
+        size += len(next(lines))
+    for streamed, line in enumerate(lines, start=1):
+        size += len(line)
+        if streamed % every == 0:
+            current = rss_mb()
+            peak = max(peak, current)
+            print(f"{streamed:>10} {current:>9.1f} {size:>14}")
+    elapsed = time.perf_counter() - started
+    print(
+        f"streamed {streamed} rows ({size / 2**20:.1f} MiB) in {elapsed:.1f}s; "
+        f"RSS {baseline:.1f} -> peak {peak:.1f} MiB"
+    )
+    return peak - baseline
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=32.0,
+        help="fail if RSS grows by more than this many MiB while streaming",
+    )
+    args = parser.parse_args()
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    with transaction.atomic():
+        started = time.perf_counter()
+        user = seed(args.rows)
+        print(f"seeded {args.rows} payments in {time.perf_counter() - started:.1f}s")
+        growth = stream(user, args.format, args.rows, args.samples)
+        transaction.set_rollback(True)
+
+    if growth > args.max_growth:
+        print(f"RSS grew by {growth:.1f} MiB (limit {args.max_growth:.1f} MiB)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
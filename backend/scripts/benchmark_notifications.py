@@ -0,0 +1,96 @@
+"""Time a notification fan-out to many users.
+
+Seeds ``--users`` users, then notifies all of them with
+``notifications.dispatch.send_many`` and prints how long creating and
+delivering the notifications took::
+
+    python backend/scripts/benchmark_notifications.py --users 100000
+
+Celery runs eagerly under the test settings, so the timing covers the
+delivery tasks too (to ``MockNotificationService``'s bounded outbox). The
+test settings use an in-memory SQLite database; the script swaps it for a
+temporary file. Point ``DJANGO_SETTINGS_MODULE``/``DATABASE_URL`` at
+PostgreSQL to measure there; everything is rolled back afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.test")
+
+from django.conf import settings  # noqa: E402
+
+_database = settings.DATABASES["default"]
+_scratch = None
+if _database["ENGINE"].endswith("sqlite3") and _database["NAME"] == ":memory:":
+    _scratch = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False)
+    _database["NAME"] = _scratch.name
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+
+from notifications.adapters import MockNotificationService  # noqa: E402
+from notifications.dispatch import send_many  # noqa: E402
+from users.models import User  # noqa: E402
+
+SEED_BATCH = 10_000
+
+
+def seed(users: int) -> None:
+    for start in range(0, users, SEED_BATCH):
+        User.objects.bulk_create(
+            User(email=f"fan-out-{number}@example.com", password="!")
+            for number in range(start, min(start + SEED_BATCH, users))
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    outbox = MockNotificationService.outbox
+    with transaction.atomic():
+        seed(args.users)
+        started = time.perf_counter()
+        # Run the deliveries queued on commit without leaving the transaction.
+        with transaction.atomic():
+            callbacks_from = len(connection.run_on_commit)
+            result = send_many(
+                User.objects.filter(email__startswith="fan-out-"),
+                subject="Benchmark",
+                body="Fan-out benchmark.",
+                chunk_size=args.chunk_size,
+            )
+        created = time.perf_counter() - started
+        for _savepoints, callback, _robust in connection.run_on_commit[callbacks_from:]:
+            callback()
+        elapsed = time.perf_counter() - started
+        transaction.set_rollback(True)
+
+    print(
+        f"created {result.notifications} notifications in {result.batches} "
+        f"batches in {created:.1f}s; delivered {outbox.total} in {elapsed:.1f}s "
+        f"({result.notifications / elapsed:,.0f}/s), outbox holds {len(outbox)}"
+    )
+
+    connection.close()
+    if _scratch is not None:
+        os.unlink(_scratch.name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
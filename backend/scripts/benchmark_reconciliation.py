@@ -0,0 +1,205 @@
+"""Time payment reconciliation against a synthetic settlement report.
+
+Seeds ``--rows`` settled payments, writes a settlement report for them with
+``--drift`` of the lines missing, added or changed, then reconciles the report against the ledger and prints the
+throughput, the peak Python memory and the mismatches found::
+
+    python backend/scripts/benchmark_reconciliation.py --rows 1000000
+
+Peak memory should not grow with ``--rows``: the report and the ledger are
+both streamed. The test settings use an in-memory SQLite database; the script
+swaps it for a temporary file. Point ``DJANGO_SETTINGS_MODULE``/
+``DATABASE_URL`` at PostgreSQL to measure there; the seeding transaction is
+rolled back afterwards either way.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.test")
+
+from django.conf import settings  # noqa: E402
+
+_database = settings.DATABASES["default"]
+_scratch = None
+if _database["ENGINE"].endswith("sqlite3") and _database["NAME"] == ":memory:":
+    _scratch = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False)
+    _database["NAME"] = _scratch.name
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from appointments.models import Appointment  # noqa: E402
+from business.models import BusinessProfile  # noqa: E402
+from payments.adapters import PaymentStatus  # noqa: E402
+from payments.models import PaymentTransaction  # noqa: E402
+from payments.reconciliation import reconcile_file  # noqa: E402
+from services.models import Service  # noqa: E402
+from users.models import User  # noqa: E402
+
+SEED_BATCH = 20_000
+
+
+class _Discard(io.TextIOBase):
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def seed(rows: int) -> None:
+    owner = User.objects.create_user(
+        email="reconciliation-benchmark@example.com", password="unused"
+    )
+    business = BusinessProfile.objects.create(owner=owner, name="Benchmark")
+    service = Service.objects.create(
+        business=business, name="Benchmark", duration_minutes=60
+    )
+    scheduled_for = timezone.now() + timedelta(days=1)
+    appointment = Appointment.objects.create(
+        customer=owner, business=business, service=service, scheduled_for=scheduled_for
+    )
+    created = 0
+    started = time.perf_counter()
+    while created < rows:
+        PaymentTransaction.objects.bulk_create(
+            PaymentTransaction(
+                appointment_id=appointment.pk,
+                amount=Decimal(number % 50_000) / 100 + 1,
+                status="completed" if number % 20 else "failed",
+                external_reference=f"mock-{number:010d}",
+            )
+            for number in range(created, min(created + SEED_BATCH, rows))
+        )
+        created = min(created + SEED_BATCH, rows)
+        if created % (SEED_BATCH * 25) == 0 or created == rows:
+            print(f"seeded {created} rows in {time.perf_counter() - started:.0f}s")
+
+
+def settlement_report(
+    charges: Iterable[tuple[str, Any, str, str]],
+    *,
+    fmt: str,
+    drift: float,
+    seed: int,
+) -> Iterator[str]:
+    """Yield the lines of a settlement report for reference-sorted ``charges``.
+
+    ``charges`` are ``(reference, amount, currency, status)`` tuples. With
+    probability ``drift`` each charge is left out, followed by an unknown one,
+    or reported with another amount or status, the way real reports disagree.
+    Unknown references extend a known one with ``-x``, which keeps byte order
+    for references without ``-``.
+    """
+
+    def line(reference, amount, currency, status) -> str:
+        if fmt == "ndjson":
+            row = {
+                "reference": reference,
+                "amount": str(amount),
+                "currency": currency,
+                "status": status,
+            }
+            return json.dumps(row) + "\n"
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow([reference, amount, currency, status])
+        return buffer.getvalue()
+
+    draw = random.Random(seed).random
+    if fmt == "csv":
+        yield "reference,amount,currency,status\r\n"
+    for reference, amount, currency, status in charges:
+        if not draw() < drift:
+            if draw() < drift:
+                amount = amount + 1
+            if draw() < drift:
+                status = (
+                    PaymentStatus.FAILED
+                    if status == PaymentStatus.COMPLETED
+                    else PaymentStatus.COMPLETED
+                )
+            yield line(reference, amount, currency, str(status))
+        if draw() < drift:
+            yield line(f"{reference}-x", amount, currency, PaymentStatus.COMPLETED)
+
+
+def write_report(path: Path, args: argparse.Namespace) -> None:
+    charges = PaymentTransaction.objects.by_reference().values_list(
+        "external_reference", "amount", "currency", "status"
+    )
+    started = time.perf_counter()
+    with open(path, "w", newline="", encoding="utf-8") as report:
+        report.writelines(
+            settlement_report(
+                charges.iterator(chunk_size=2000),
+                fmt=args.format,
+                drift=args.drift,
+                seed=args.seed,
+            )
+        )
+    print(
+        f"wrote {path.stat().st_size / 2**20:.0f} MiB {args.format} report "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--drift", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    with tempfile.TemporaryDirectory() as directory:
+        report = Path(directory) / f"settlement.{args.format}"
+        with transaction.atomic():
+            seed(args.rows)
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+            write_report(report, args)
+
+            started = time.perf_counter()
+            counts = reconcile_file(report, _Discard())
+            elapsed = time.perf_counter() - started
+            # Tracing slows Python down, so memory is measured on a second run.
+            tracemalloc.start()
+            reconcile_file(report, _Discard())
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            transaction.set_rollback(True)
+
+    print(
+        f"reconciled {args.rows} rows in {elapsed:.1f}s "
+        f"({args.rows / elapsed:,.0f} rows/s), peak {peak / 2**20:.1f} MiB"
+    )
+    for kind, count in sorted(counts.items()):
+        print(f"{kind:<18} {count}")
+
+    connection.close()
+    if _scratch is not None:
+        os.unlink(_scratch.name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
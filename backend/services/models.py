@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 from business.models import BusinessProfile
 from common.models import TimeStampedModel
 
+# Appointment lookups scan back this far for bookings still running at the
+# start of a range, so the cap keeps range queries bounded.
+MAX_DURATION_MINUTES = 24 * 60
+
 
 class Service(TimeStampedModel):
     business = models.ForeignKey(
@@ -14,7 +19,17 @@ class Service(TimeStampedModel):
     )
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
-    duration_minutes = models.PositiveIntegerField(default=60)
+    duration_minutes = models.PositiveIntegerField(
+        default=60,
+        validators=[MinValueValidator(1), MaxValueValidator(MAX_DURATION_MINUTES)],
+    )
+
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["business", "-created_at"], name="service_business_created_idx"
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return self.name
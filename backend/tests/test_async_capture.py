@@ -0,0 +1,160 @@
+"""Tests for background payment capture with idempotency keys."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from django.urls import reverse
+
+from payments.adapters import GatewayError, MockPaymentGateway, PaymentStatus
+from payments.tasks import capture_payment
+
+
+class RecordingGateway(MockPaymentGateway):
+    calls: list[dict] = []
+    # Each retry builds a new gateway, so scripted failures live on the class.
+    unanswered = 0
+
+    def charge(self, **kwargs):
+        self.calls.append(kwargs["metadata"])
+        if len(self.calls) <= self.unanswered:
+            raise GatewayError("No answer.")
+        return super().charge(**kwargs)
+
+
+@pytest.fixture
+def gateway(settings):
+    RecordingGateway.calls = []
+    RecordingGateway.unanswered = 0
+
+    def configure(**options):
+        settings.PAYMENT_GATEWAY = {
+            "BACKEND": f"{__name__}.RecordingGateway",
+            "OPTIONS": options,
+        }
+        return RecordingGateway
+
+    settings.PAYMENT_CAPTURE_MAX_RETRIES = 3
+    configure()
+    return configure
+
+
+def test_mock_gateway_imitates_a_slow_flaky_provider():
+    started = time.perf_counter()
+    MockPaymentGateway(latency=0.05).charge(amount=1, currency="USD")
+    assert time.perf_counter() - started >= 0.05
+
+    flaky = MockPaymentGateway(failure_rate=0.25, seed=7)
+    failures = 0
+    for _ in range(400):
+        try:
+            flaky.charge(amount=1, currency="USD")
+        except GatewayError:
+            failures += 1
+
+    assert 70 <= failures <= 130
+    with pytest.raises(GatewayError):
+        MockPaymentGateway(failure_rate=1).charge(amount=1, currency="USD")
+
+
+@pytest.mark.django_db
+def test_async_capture_answers_202_and_the_worker_completes_it(
+    api_client,
+    payment_transaction_factory,
+    user,
+    gateway,
+    django_capture_on_commit_callbacks,
+):
+    payment = payment_transaction_factory()
+    api_client.force_authenticate(user)
+    url = reverse("api:payments-capture", args=[payment.pk])
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = api_client.post(url, HTTP_IDEMPOTENCY_KEY="order-1")
+
+    assert response.status_code == 202, response.content
+    assert response.json()["status"] == "pending"
+    assert response.json()["capture_key"] == "order-1"
+    assert response["Location"].endswith(
+        reverse("api:payments-detail", args=[payment.pk])
+    )
+    assert len(callbacks) == 1
+
+    callbacks[0]()
+    payment.refresh_from_db()
+    assert payment.status is PaymentStatus.COMPLETED
+    assert payment.external_reference == str(payment.pk)
+    assert RecordingGateway.calls == [
+        {"reference": str(payment.pk), "idempotency_key": "order-1"}
+    ]
+
+    replay = api_client.post(url, HTTP_IDEMPOTENCY_KEY="order-1")
+    assert replay.status_code == 200
+    assert replay.json()["status"] == "completed"
+    assert len(RecordingGateway.calls) == 1
+
+
+@pytest.mark.django_db
+def test_duplicate_capture_requests_coalesce(
+    api_client,
+    payment_transaction_factory,
+    user,
+    gateway,
+    django_capture_on_commit_callbacks,
+):
+    payment = payment_transaction_factory()
+    api_client.force_authenticate(user)
+    url = reverse("api:payments-capture", args=[payment.pk])
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        first = api_client.post(url, HTTP_IDEMPOTENCY_KEY="order-2")
+        again = api_client.post(url, HTTP_IDEMPOTENCY_KEY="order-2")
+        other = api_client.post(url, HTTP_IDEMPOTENCY_KEY="order-3")
+
+    assert first.status_code == again.status_code == 202
+    assert other.status_code == 409
+    assert other.json()["detail"] == (
+        "A capture with a different idempotency key is in progress."
+    )
+    assert len(callbacks) == 1
+    assert api_client.post(url, HTTP_IDEMPOTENCY_KEY="").status_code == 400
+
+
+@pytest.mark.django_db
+def test_worker_retries_unanswered_charges(payment_transaction_factory, gateway):
+    RecordingGateway.unanswered = 2
+    payment = payment_transaction_factory(capture_key="order-4")
+
+    capture_payment.delay(payment.pk, "order-4")
+
+    payment.refresh_from_db()
+    assert payment.status is PaymentStatus.COMPLETED
+    assert len(RecordingGateway.calls) == 3
+
+
+@pytest.mark.django_db
+def test_worker_fails_the_payment_once_retries_run_out(
+    payment_transaction_factory, gateway
+):
+    gateway(failure_rate=1)
+    payment = payment_transaction_factory(capture_key="order-5")
+
+    capture_payment.delay(payment.pk, "order-5")
+
+    payment.refresh_from_db()
+    assert payment.status is PaymentStatus.FAILED
+    assert payment.capture_key == ""
+    assert len(RecordingGateway.calls) == 4
+
+
+@pytest.mark.django_db
+def test_worker_ignores_stale_and_repeated_deliveries(
+    payment_transaction_factory, gateway
+):
+    payment = payment_transaction_factory(capture_key="order-6")
+
+    assert capture_payment.delay(payment.pk, "other-key").get() is None
+    assert capture_payment.delay(payment.pk, "order-6").get() == "completed"
+    assert capture_payment.delay(payment.pk, "order-6").get() == "completed"
+    assert len(RecordingGateway.calls) == 1
@@ -0,0 +1,352 @@
+"""Tests for the availability engine and ``/businesses/{id}/availability/``."""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from appointments.models import Appointment
+from business.models import OpeningHours
+
+TEHRAN = ZoneInfo("Asia/Tehran")
+
+
+def _next_monday() -> date:
+    today = timezone.now().astimezone(TEHRAN).date()
+    return today + timedelta(days=7 - today.weekday())
+
+
+def _at(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, time(hour, minute), tzinfo=TEHRAN)
+
+
+def _starts(response, day: date) -> list[str]:
+    assert response.status_code == 200, response.content
+    for entry in response.json()["days"]:
+        if entry["date"] == day.isoformat():
+            return [
+                datetime.fromisoformat(slot["start"])
+                .astimezone(TEHRAN)
+                .strftime("%H:%M")
+                for slot in entry["slots"]
+            ]
+    raise AssertionError(f"{day} missing from response")
+
+
+@pytest.fixture
+def salon(business_profile_factory, service_factory):
+    business = business_profile_factory(timezone="Asia/Tehran")
+    OpeningHours.objects.create(
+        business=business, weekday=0, opens_at=time(9), closes_at=time(12)
+    )
+    OpeningHours.objects.create(
+        business=business, weekday=0, opens_at=time(13), closes_at=time(15)
+    )
+    service = service_factory(business=business, duration_minutes=60)
+    return business, service
+
+
+def _availability(api_client, business, service, day, **params):
+    return api_client.get(
+        reverse("api:businesses-availability", args=[business.pk]),
+        {"service": service.pk, "date_from": day, "date_to": day, **params},
+    )
+
+
+@pytest.mark.django_db
+def test_slots_fill_opening_hours_around_bookings(
+    api_client, user, salon, appointment_factory
+):
+    business, service = salon
+    monday = _next_monday()
+    short = service.__class__.objects.create(
+        business=business, name="Trim", duration_minutes=30
+    )
+    appointment_factory(business=business, service=short, scheduled_for=_at(monday, 10))
+    appointment_factory(
+        business=business,
+        service=service,
+        scheduled_for=_at(monday, 13),
+        status="cancelled",
+    )
+    api_client.force_authenticate(user)
+
+    response = _availability(api_client, business, service, monday, step=30)
+
+    assert response.json()["timezone"] == "Asia/Tehran"
+    assert _starts(response, monday) == [
+        "09:00",
+        "10:30",
+        "11:00",
+        "13:00",
+        "13:30",
+        "14:00",
+    ]
+
+
+@pytest.mark.django_db
+def test_closed_days_have_no_slots_and_ranges_cover_every_day(api_client, user, salon):
+    business, service = salon
+    monday = _next_monday()
+    api_client.force_authenticate(user)
+
+    response = api_client.get(
+        reverse("api:businesses-availability", args=[business.pk]),
+        {"service": service.pk, "date_from": monday},
+    )
+
+    days = response.json()["days"]
+    assert [entry["date"] for entry in days] == [
+        (monday + timedelta(days=offset)).isoformat() for offset in range(7)
+    ]
+    assert all(not entry["slots"] for entry in days[1:])
+
+
+@pytest.mark.django_db
+def test_days_are_cached_and_bookings_invalidate_them(
+    api_client, user, salon, query_counter, django_capture_on_commit_callbacks
+):
+    business, service = salon
+    monday = _next_monday()
+    api_client.force_authenticate(user)
+    assert "09:00" in _starts(
+        _availability(api_client, business, service, monday), monday
+    )
+
+    with query_counter() as cold:
+        _availability(api_client, business, service, monday + timedelta(days=7))
+    with query_counter() as warm:
+        response = _availability(
+            api_client, business, service, monday + timedelta(days=7)
+        )
+    assert warm.count == cold.count - 2
+    assert response.json()["days"][0]["slots"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        booking = Appointment.objects.create(
+            customer=user,
+            business=business,
+            service=service,
+            scheduled_for=_at(monday, 9),
+        )
+    assert (
+        _starts(_availability(api_client, business, service, monday), monday)[0]
+        == "10:00"
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        booking.scheduled_for = _at(monday, 14)
+        booking.save()
+    starts = _starts(_availability(api_client, business, service, monday), monday)
+    assert starts[0] == "09:00"
+    assert "14:00" not in starts
+
+    with django_capture_on_commit_callbacks(execute=True):
+        booking.delete()
+    assert "14:00" in _starts(
+        _availability(api_client, business, service, monday), monday
+    )
+
+
+@pytest.mark.django_db
+def test_days_read_before_commit_are_retired_by_it(
+    api_client, user, salon, django_capture_on_commit_callbacks
+):
+    business, service = salon
+    monday = _next_monday()
+    api_client.force_authenticate(user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Appointment.objects.create(
+            customer=user,
+            business=business,
+            service=service,
+            scheduled_for=_at(monday, 9),
+        )
+        # Stand in for a reader on another connection, which cannot see the
+        # booking yet: what it caches must not outlive the commit.
+        Appointment.objects.filter(business=business).update(
+            scheduled_for=_at(monday + timedelta(days=1), 9)
+        )
+        assert "09:00" in _starts(
+            _availability(api_client, business, service, monday), monday
+        )
+        Appointment.objects.filter(business=business).update(
+            scheduled_for=_at(monday, 9)
+        )
+
+    assert (
+        _starts(_availability(api_client, business, service, monday), monday)[0]
+        == "10:00"
+    )
+
+
+@pytest.mark.django_db
+def test_opening_hours_changes_invalidate_cached_days(
+    api_client, user, salon, django_capture_on_commit_callbacks
+):
+    business, service = salon
+    monday = _next_monday()
+    api_client.force_authenticate(user)
+    assert "14:00" in _starts(
+        _availability(api_client, business, service, monday), monday
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        OpeningHours.objects.filter(business=business, opens_at=time(13)).delete()
+
+    assert (
+        _starts(_availability(api_client, business, service, monday), monday)[-1]
+        == "11:00"
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_bookings_set_end_times_and_invalidate_days(
+    api_client, salon, django_capture_on_commit_callbacks
+):
+    business, service = salon
+    monday = _next_monday()
+    api_client.force_authenticate(business.owner)
+    assert "09:00" in _starts(
+        _availability(api_client, business, service, monday), monday
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(
+            "/api/v1/appointments/bulk/",
+            [
+                {
+                    "customer": business.owner_id,
+                    "business": business.pk,
+                    "service": service.pk,
+                    "scheduled_for": _at(monday, hour).isoformat(),
+                }
+                for hour in (9, 11)
+            ],
+            format="json",
+        )
+
+    assert response.status_code == 201, response.content
+    assert [item["ends_at"] for item in response.json()] == [
+        _at(monday, hour + 1).astimezone(UTC).isoformat().replace("+00:00", "Z")
+        for hour in (9, 11)
+    ]
+    assert _starts(_availability(api_client, business, service, monday), monday) == [
+        "10:00",
+        "13:00",
+        "13:15",
+        "13:30",
+        "13:45",
+        "14:00",
+    ]
+
+
+@pytest.mark.django_db
+def test_end_time_is_fixed_at_booking(appointment_factory, service_factory):
+    service = service_factory(duration_minutes=45)
+    appointment = appointment_factory(service=service)
+    assert appointment.ends_at - appointment.scheduled_for == timedelta(minutes=45)
+
+    service.duration_minutes = 90
+    service.save()
+    appointment = Appointment.objects.get(pk=appointment.pk)
+    appointment.notes = "Rebooked"
+    appointment.save()
+    assert appointment.ends_at - appointment.scheduled_for == timedelta(minutes=45)
+
+    appointment.scheduled_for += timedelta(hours=1)
+    appointment.save(update_fields=["scheduled_for"])
+    appointment.refresh_from_db()
+    assert appointment.ends_at - appointment.scheduled_for == timedelta(minutes=90)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("params", "field"),
+    [
+        ({"date_to": "2020-01-01"}, "date_to"),
+        ({"date_to": "2099-12-31"}, "date_to"),
+        ({"step": 1}, "step"),
+    ],
+)
+def test_availability_validates_query(api_client, user, salon, params, field):
+    business, service = salon
+    api_client.force_authenticate(user)
+
+    response = api_client.get(
+        reverse("api:businesses-availability", args=[business.pk]),
+        {"service": service.pk, "date_from": "2030-01-01", **params},
+    )
+
+    assert response.status_code == 400
+    assert field in response.json()
+
+
+@pytest.mark.django_db
+def test_availability_rejects_services_of_other_businesses(
+    api_client, user, salon, service_factory
+):
+    business, _service = salon
+    api_client.force_authenticate(user)
+
+    response = _availability(api_client, business, service_factory(), _next_monday())
+
+    assert response.status_code == 400
+    assert "service" in response.json()
+
+
+@pytest.mark.django_db
+def test_opening_hours_must_close_after_opening(api_client, business_profile_factory):
+    business = business_profile_factory()
+    api_client.force_authenticate(business.owner)
+
+    response = api_client.post(
+        reverse("api:opening-hours-list"),
+        {
+            "business": business.pk,
+            "weekday": 0,
+            "opens_at": "17:00",
+            "closes_at": "09:00",
+        },
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "non_field_errors": ["Closing time must be after opening time."]
+    }
+
+
+@pytest.mark.django_db
+def test_opening_hours_belong_to_the_business_owner(
+    api_client, business_profile_factory, salon
+):
+    business, _service = salon
+    other = business_profile_factory()
+    hours = OpeningHours.objects.filter(business=business).first()
+    payload = {
+        "business": business.pk,
+        "weekday": 1,
+        "opens_at": "09:00",
+        "closes_at": "17:00",
+    }
+
+    api_client.force_authenticate(other.owner)
+    response = api_client.post(
+        reverse("api:opening-hours-list"), payload, format="json"
+    )
+    assert response.status_code == 403
+
+    api_client.force_authenticate(business.owner)
+    response = api_client.patch(
+        reverse("api:opening-hours-detail", args=[hours.pk]),
+        {"business": other.pk},
+        format="json",
+    )
+    assert response.status_code == 403
+    assert not OpeningHours.objects.filter(business=other).exists()
@@ -0,0 +1,253 @@
+"""Tests for the bulk create, update and delete actions."""
+
+from __future__ import annotations
+
+import pytest
+from django.urls import reverse
+
+from business.models import BusinessProfile
+from marketplace.models import Listing
+from services.models import Service
+
+from backend.tests.utils import extract_results
+
+SERVICES_BULK = "/api/v1/services/bulk/"
+LISTINGS_BULK = "/api/v1/listings/bulk/"
+
+
+@pytest.mark.django_db
+def test_bulk_create_forces_owner_and_returns_created_rows(api_client, user_factory):
+    owner = user_factory(email="bulk-owner@example.com")
+    other = user_factory(email="bulk-other@example.com")
+    api_client.force_authenticate(owner)
+
+    response = api_client.post(
+        "/api/v1/businesses/bulk/",
+        [{"name": "North", "owner": other.pk}, {"name": "South"}],
+        format="json",
+    )
+
+    assert response.status_code == 201
+    assert [item["name"] for item in response.json()] == ["North", "South"]
+    assert all(item["id"] for item in response.json())
+    assert set(BusinessProfile.objects.values_list("owner", flat=True)) == {owner.pk}
+
+
+@pytest.mark.django_db
+def test_bulk_create_reports_errors_per_item_and_writes_nothing(
+    api_client, business_profile_factory
+):
+    business = business_profile_factory()
+    api_client.force_authenticate(business.owner)
+
+    response = api_client.post(
+        SERVICES_BULK,
+        [
+            {"business": business.pk, "name": "Massage"},
+            {"business": 999999, "name": "Facial"},
+            {"business": business.pk},
+        ],
+        format="json",
+    )
+
+    assert response.status_code == 400
+    errors = response.json()
+    assert set(errors) == {"1", "2"}
+    assert set(errors["1"]) == {"business"}
+    assert set(errors["2"]) == {"name"}
+    assert not Service.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("payload", [{}, [], "nope"])
+def test_bulk_create_rejects_non_list_payloads(api_client, user, payload):
+    api_client.force_authenticate(user)
+
+    response = api_client.post(SERVICES_BULK, payload, format="json")
+
+    assert response.status_code == 400
+    assert "non_field_errors" in response.json()
+
+
+@pytest.mark.django_db
+def test_bulk_create_outside_scope_rolls_back(
+    api_client, business_profile_factory, service_factory
+):
+    mine = business_profile_factory()
+    theirs = service_factory()
+    api_client.force_authenticate(mine.owner)
+
+    response = api_client.post(
+        LISTINGS_BULK,
+        [
+            {"business": mine.pk, "service": theirs.pk, "price": "10.00"},
+            {"business": theirs.business_id, "service": theirs.pk, "price": "12.00"},
+        ],
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert list(response.json()) == ["1"]
+    assert "non_field_errors" in response.json()["1"]
+    assert not Listing.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_update_writes_changed_fields_and_touches_updated_at(
+    api_client, listing_factory, service_factory
+):
+    service = service_factory()
+    first = listing_factory(service=service, business=service.business)
+    second = listing_factory(service=service, business=service.business)
+    api_client.force_authenticate(service.business.owner)
+
+    response = api_client.patch(
+        LISTINGS_BULK,
+        [
+            {"id": first.pk, "price": "99.00"},
+            {"id": second.pk, "is_active": False},
+        ],
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [first.pk, second.pk]
+    first_row = Listing.objects.get(pk=first.pk)
+    second_row = Listing.objects.get(pk=second.pk)
+    assert str(first_row.price) == "99.00"
+    assert first_row.is_active
+    assert not second_row.is_active
+    assert first_row.updated_at > first.updated_at
+
+
+@pytest.mark.django_db
+def test_bulk_update_reports_missing_duplicate_and_foreign_rows(
+    api_client, listing_factory, service_factory
+):
+    service = service_factory()
+    mine = listing_factory(service=service, business=service.business, price="5.00")
+    theirs = listing_factory()
+    api_client.force_authenticate(service.business.owner)
+
+    response = api_client.patch(
+        LISTINGS_BULK,
+        [
+            {"id": mine.pk, "price": "7.00"},
+            {"id": mine.pk, "price": "8.00"},
+            {"id": theirs.pk, "price": "1.00"},
+            {"price": "2.00"},
+        ],
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "1": {"id": ["Duplicate item."]},
+        "2": {"id": ["Not found."]},
+        "3": {"id": ["Not found."]},
+    }
+    assert str(Listing.objects.get(pk=mine.pk).price) == "5.00"
+
+
+@pytest.mark.django_db
+def test_bulk_update_cannot_move_rows_out_of_scope(
+    api_client, listing_factory, service_factory
+):
+    service = service_factory()
+    listing = listing_factory(service=service, business=service.business)
+    elsewhere = service_factory()
+    api_client.force_authenticate(service.business.owner)
+
+    response = api_client.patch(
+        LISTINGS_BULK,
+        [{"id": listing.pk, "business": elsewhere.business_id}],
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert Listing.objects.get(pk=listing.pk).business_id == service.business_id
+
+
+@pytest.mark.django_db
+def test_bulk_destroy_deletes_by_id(api_client, service_factory, user_factory):
+    staff = user_factory(email="bulk-staff@example.com", is_staff=True)
+    doomed = [service_factory(), service_factory()]
+    kept = service_factory()
+    api_client.force_authenticate(staff)
+
+    response = api_client.delete(
+        SERVICES_BULK, {"ids": [service.pk for service in doomed]}, format="json"
+    )
+
+    assert response.status_code == 204
+    assert list(Service.objects.values_list("pk", flat=True)) == [kept.pk]
+
+
+@pytest.mark.django_db
+def test_bulk_destroy_reports_unknown_ids_and_deletes_nothing(
+    api_client, service_factory
+):
+    mine = service_factory()
+    theirs = service_factory()
+    api_client.force_authenticate(mine.business.owner)
+
+    response = api_client.delete(
+        SERVICES_BULK, {"ids": [mine.pk, theirs.pk, "x"]}, format="json"
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"ids": {"1": ["Not found."], "2": ["Not found."]}}
+    assert Service.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_writes_use_a_constant_number_of_queries(
+    api_client, business_profile_factory, query_counter
+):
+    business = business_profile_factory()
+    api_client.force_authenticate(business.owner)
+
+    counts = []
+    for size in (2, 20):
+        payload = [
+            {"business": business.pk, "name": f"Service {index}"}
+            for index in range(size)
+        ]
+        with query_counter() as created:
+            response = api_client.post(SERVICES_BULK, payload, format="json")
+        assert response.status_code == 201
+        updates = [{"id": item["id"], "name": "Renamed"} for item in response.json()]
+        with query_counter() as updated:
+            response = api_client.patch(SERVICES_BULK, updates, format="json")
+        assert response.status_code == 200
+        counts.append((created.count, updated.count))
+
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_bulk_writes_refresh_search_and_cached_lists(
+    api_client, business_profile_factory, django_capture_on_commit_callbacks
+):
+    business = business_profile_factory()
+    api_client.force_authenticate(business.owner)
+    url = reverse("api:services-list")
+    assert extract_results(api_client.get(url).json()) == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        created = api_client.post(
+            SERVICES_BULK,
+            [{"business": business.pk, "name": "Shiatsu"}],
+            format="json",
+        ).json()
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.patch(
+            SERVICES_BULK, [{"id": created[0]["id"], "name": "Reiki"}], format="json"
+        )
+
+    assert [item["name"] for item in extract_results(api_client.get(url).json())] == [
+        "Reiki"
+    ]
+    found = extract_results(api_client.get(url, {"search": "reiki"}).json())
+    assert [item["id"] for item in found] == [created[0]["id"]]
+    assert extract_results(api_client.get(url, {"search": "shiatsu"}).json()) == []
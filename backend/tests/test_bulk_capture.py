@@ -0,0 +1,172 @@
+"""Tests for batched gateway charges and staff bulk capture."""
+
+from __future__ import annotations
+
+import pytest
+from django.urls import reverse
+
+from payments.adapters import (
+    ChargeRequest,
+    GatewayError,
+    MockPaymentGateway,
+    PaymentStatus,
+)
+from payments.models import PaymentTransaction
+from payments.tasks import capture_payment_batch
+
+from backend.tests.utils import extract_results
+
+
+class BatchRecordingGateway(MockPaymentGateway):
+    batches: list[list[str]] = []
+    single_calls = 0
+
+    def charge(self, **kwargs):
+        type(self).single_calls += 1
+        return super().charge(**kwargs)
+
+    def charge_many(self, charges):
+        self.batches.append([charge.metadata["reference"] for charge in charges])
+        return super().charge_many(charges)
+
+
+@pytest.fixture
+def batch_gateway(settings):
+    BatchRecordingGateway.batches = []
+    BatchRecordingGateway.single_calls = 0
+
+    def configure(**options):
+        settings.PAYMENT_GATEWAY = {
+            "BACKEND": f"{__name__}.BatchRecordingGateway",
+            "OPTIONS": options,
+        }
+
+    settings.PAYMENT_CAPTURE_MAX_RETRIES = 2
+    settings.PAYMENT_BULK_CAPTURE_CHUNK = 2
+    configure()
+    return configure
+
+
+def test_charge_many_answers_in_order_with_one_round_trip():
+    charges = [
+        ChargeRequest(amount=10, currency="USD", metadata={"reference": "a"}),
+        ChargeRequest(amount=20, currency="EUR", metadata={"reference": "b"}),
+    ]
+
+    results = MockPaymentGateway().charge_many(charges)
+
+    assert [result.reference for result in results] == ["a", "b"]
+    assert results[1].details == {"amount": 20, "currency": "EUR"}
+    with pytest.raises(GatewayError):
+        MockPaymentGateway(failure_rate=1).charge_many(charges)
+
+
+@pytest.mark.django_db
+def test_bulk_capture_is_for_staff(api_client, user):
+    api_client.force_authenticate(user)
+
+    response = api_client.post(reverse("api:payments-bulk-capture"))
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_bulk_capture_charges_pending_payments_in_chunks(
+    api_client,
+    user_factory,
+    payment_transaction_factory,
+    batch_gateway,
+    django_capture_on_commit_callbacks,
+):
+    pending = [payment_transaction_factory() for _ in range(5)]
+    captured = payment_transaction_factory(status="completed")
+    claimed = payment_transaction_factory(capture_key="order-1")
+    api_client.force_authenticate(user_factory(is_staff=True))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(reverse("api:payments-bulk-capture"))
+
+    assert response.status_code == 202, response.content
+    body = response.json()
+    assert (body["chunks"], body["payments"]) == (3, 5)
+    assert [len(batch) for batch in BatchRecordingGateway.batches] == [2, 2, 1]
+    assert BatchRecordingGateway.single_calls == 0
+    assert sorted(
+        int(reference) for batch in BatchRecordingGateway.batches for reference in batch
+    ) == [payment.pk for payment in pending]
+    for payment in pending:
+        payment.refresh_from_db()
+        assert payment.status is PaymentStatus.COMPLETED
+        assert payment.external_reference == str(payment.pk)
+        assert payment.capture_key.startswith(f"{body['batch']}:")
+    claimed.refresh_from_db()
+    assert claimed.status is PaymentStatus.PENDING
+    assert PaymentTransaction.objects.get(pk=captured.pk).external_reference == ""
+
+
+@pytest.mark.django_db
+def test_bulk_capture_reindexes_payment_status(
+    api_client,
+    user_factory,
+    payment_transaction_factory,
+    batch_gateway,
+    django_capture_on_commit_callbacks,
+):
+    payment = payment_transaction_factory()
+    api_client.force_authenticate(user_factory(is_staff=True))
+    url = reverse("api:payments-list")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post(reverse("api:payments-bulk-capture"))
+
+    def search(terms):
+        response = api_client.get(url, {"search": terms})
+        return [item["id"] for item in extract_results(response.json())]
+
+    assert search("pending") == []
+    assert search("completed") == [payment.pk]
+
+
+@pytest.mark.django_db
+def test_claims_skip_rows_claimed_elsewhere(payment_transaction_factory):
+    first, second, third = (payment_transaction_factory() for _ in range(3))
+
+    assert PaymentTransaction.objects.claim_pending("run-a", 2) == 2
+    assert PaymentTransaction.objects.claim_pending("run-b", 2) == 1
+    assert PaymentTransaction.objects.claim_pending("run-c", 2) == 0
+
+    keys = dict(PaymentTransaction.objects.values_list("pk", "capture_key"))
+    assert keys == {first.pk: "run-a", second.pk: "run-a", third.pk: "run-b"}
+
+
+@pytest.mark.django_db
+def test_batch_writes_back_in_constant_queries(
+    payment_transaction_factory, batch_gateway, query_counter
+):
+    for _ in range(40):
+        payment_transaction_factory()
+    PaymentTransaction.objects.claim_pending("run-d", 50)
+
+    with query_counter() as stats:
+        assert capture_payment_batch.delay("run-d").get() == 40
+
+    # Read the claim, lock it, one bulk UPDATE, plus the savepoint bookkeeping;
+    # reindexing reads the rows back and rewrites their documents in bulk.
+    assert stats.count <= 8
+    assert not PaymentTransaction.objects.pending().exists()
+
+
+@pytest.mark.django_db
+def test_unanswered_batches_fail_and_release_their_claim(
+    payment_transaction_factory, batch_gateway
+):
+    batch_gateway(failure_rate=1)
+    payments = [payment_transaction_factory() for _ in range(2)]
+    PaymentTransaction.objects.claim_pending("run-e", 2)
+
+    capture_payment_batch.delay("run-e")
+
+    for payment in payments:
+        payment.refresh_from_db()
+        assert payment.status is PaymentStatus.FAILED
+        assert payment.capture_key == ""
@@ -0,0 +1,126 @@
+"""Tests for appointment range filters and ``/businesses/{id}/calendar/``."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.urls import reverse
+
+from api.calendar import build_calendar
+from api.viewsets import AppointmentViewSet
+
+from backend.tests.utils import extract_results
+
+TEHRAN = ZoneInfo("Asia/Tehran")
+MONDAY = date(2031, 3, 3)
+
+
+def _at(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, time(hour, minute), tzinfo=TEHRAN)
+
+
+@pytest.fixture
+def diary(business_profile_factory, service_factory, appointment_factory):
+    business = business_profile_factory(timezone="Asia/Tehran")
+    service = service_factory(business=business, name="Cut", duration_minutes=45)
+    booked = [
+        appointment_factory(service=service, scheduled_for=_at(MONDAY, 0, 30)),
+        appointment_factory(service=service, scheduled_for=_at(MONDAY, 10)),
+        appointment_factory(
+            service=service, scheduled_for=_at(MONDAY, 11), status="cancelled"
+        ),
+        appointment_factory(service=service, scheduled_for=_at(MONDAY, 23, 30)),
+        appointment_factory(
+            service=service, scheduled_for=_at(MONDAY + timedelta(days=2), 9)
+        ),
+    ]
+    appointment_factory(scheduled_for=_at(MONDAY, 10))
+    return business, booked
+
+
+@pytest.mark.django_db
+def test_list_filters_accept_ranges_and_day_buckets(api_client, user_factory, diary):
+    business, booked = diary
+    api_client.force_authenticate(user_factory(is_staff=True))
+    url = reverse("api:appointments-list")
+
+    ranged = api_client.get(
+        url,
+        {
+            "business": business.pk,
+            "scheduled_for__gte": _at(MONDAY, 10).isoformat(),
+            "scheduled_for__lt": _at(MONDAY + timedelta(days=2), 9).isoformat(),
+        },
+    )
+    # The bucket follows the active time zone, UTC here: 00:30 in Tehran is
+    # still the previous day.
+    bucket = api_client.get(
+        url, {"business": business.pk, "scheduled_for__date": MONDAY}
+    )
+
+    assert {item["id"] for item in extract_results(ranged.json())} == {
+        appointment.pk for appointment in booked[1:4]
+    }
+    assert {item["id"] for item in extract_results(bucket.json())} == {
+        appointment.pk for appointment in booked[1:4]
+    }
+
+
+@pytest.mark.django_db
+def test_day_bucket_compares_the_column_directly(diary):
+    filterset_class = AppointmentViewSet.filterset_class
+    queryset = filterset_class(
+        {"scheduled_for__date": "2031-03-03"},
+        queryset=AppointmentViewSet.model.objects.all(),
+    ).qs
+
+    sql = str(queryset.query)
+    assert '"appointments_appointment"."scheduled_for" >=' in sql
+    assert '"appointments_appointment"."scheduled_for" <' in sql
+
+
+@pytest.mark.django_db
+def test_calendar_groups_local_days_in_one_query(diary, query_counter):
+    business, booked = diary
+
+    with query_counter() as stats:
+        days = build_calendar(business, [MONDAY + timedelta(days=n) for n in range(3)])
+
+    assert stats.count == 1
+    monday, tuesday, wednesday = days
+    assert monday["total"] == 4
+    assert monday["booked_minutes"] == 3 * 45
+    assert monday["statuses"] == {"scheduled": 3, "cancelled": 1}
+    assert [entry["id"] for entry in monday["entries"]] == [
+        appointment.pk for appointment in booked[:4]
+    ]
+    assert monday["entries"][0]["service_name"] == "Cut"
+    assert tuesday["total"] == 0 and tuesday["entries"] == []
+    assert [entry["id"] for entry in wednesday["entries"]] == [booked[4].pk]
+
+
+@pytest.mark.django_db
+def test_calendar_endpoint_is_for_owners_and_staff(api_client, user, diary):
+    business, _booked = diary
+    url = reverse("api:businesses-calendar", args=[business.pk])
+    params = {"date_from": MONDAY, "date_to": MONDAY + timedelta(days=6)}
+
+    api_client.force_authenticate(user)
+    assert api_client.get(url, params).status_code == 403
+
+    api_client.force_authenticate(business.owner)
+    response = api_client.get(url, params)
+    assert response.status_code == 200, response.content
+    body = response.json()
+    assert body["timezone"] == "Asia/Tehran"
+    assert len(body["days"]) == 7
+    assert body["days"][0]["date"] == MONDAY.isoformat()
+    assert body["days"][0]["statuses"] == {"scheduled": 3, "cancelled": 1}
+
+    too_long = api_client.get(
+        url, {"date_from": MONDAY, "date_to": MONDAY + timedelta(days=42)}
+    )
+    assert too_long.status_code == 400
+    assert "date_to" in too_long.json()
@@ -0,0 +1,121 @@
+"""Tests for ETag / Last-Modified conditional GETs on auto viewsets."""
+
+from __future__ import annotations
+
+import pytest
+from django.urls import reverse
+from django.utils.http import http_date
+
+from notifications.models import Notification
+
+from backend.tests.utils import extract_results
+
+
+@pytest.fixture
+def recipient_client(api_client, user_factory, notification_factory):
+    recipient = user_factory(email="etag@example.com")
+    for index in range(3):
+        notification_factory(recipient=recipient, subject=f"n{index}")
+    api_client.force_authenticate(recipient)
+    return api_client
+
+
+@pytest.mark.django_db
+def test_list_returns_304_without_serializing(recipient_client, query_counter):
+    url = reverse("api:notifications-list")
+    first = recipient_client.get(url)
+    etag = first["ETag"]
+    assert etag.startswith('W/"')
+
+    with query_counter() as stats:
+        second = recipient_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second["ETag"] == etag
+    assert stats.count == 1
+
+
+@pytest.mark.django_db
+def test_list_etag_changes_on_update_and_delete(recipient_client):
+    url = reverse("api:notifications-list")
+    etag = recipient_client.get(url)["ETag"]
+
+    notification = Notification.objects.order_by("pk").first()
+    notification.subject = "changed"
+    notification.save()
+    updated = recipient_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert updated.status_code == 200
+    assert updated["ETag"] != etag
+
+    Notification.objects.filter(pk=notification.pk).delete()
+    deleted = recipient_client.get(url, HTTP_IF_NONE_MATCH=updated["ETag"])
+    assert deleted.status_code == 200
+    assert deleted["ETag"] != updated["ETag"]
+
+
+@pytest.mark.django_db
+def test_list_revalidates_by_etag_only(recipient_client):
+    url = reverse("api:notifications-list")
+    first = recipient_client.get(url)
+    assert not first.has_header("Last-Modified")
+    last_modified = http_date(
+        Notification.objects.latest("updated_at").updated_at.timestamp()
+    )
+
+    # Deleting an older row leaves MAX(updated_at) where it was.
+    Notification.objects.order_by("updated_at").first().delete()
+
+    by_date = recipient_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert by_date.status_code == 200
+    by_etag = recipient_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert by_etag.status_code == 200
+    assert len(extract_results(by_etag.json())) == 2
+
+
+@pytest.mark.django_db
+def test_list_etag_depends_on_filters(recipient_client):
+    url = reverse("api:notifications-list")
+    etag = recipient_client.get(url)["ETag"]
+
+    filtered = recipient_client.get(url, {"search": "n1"}, HTTP_IF_NONE_MATCH=etag)
+
+    assert filtered.status_code == 200
+
+
+@pytest.mark.django_db
+def test_detail_returns_304_until_the_row_changes(recipient_client):
+    notification = Notification.objects.order_by("pk").first()
+    url = reverse("api:notifications-detail", args=[notification.pk])
+    etag = recipient_client.get(url)["ETag"]
+
+    assert recipient_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    notification.body = "updated"
+    notification.save()
+    assert recipient_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_missing_detail_row_is_still_404(recipient_client):
+    url = reverse("api:notifications-detail", args=[999999])
+
+    assert recipient_client.get(url, HTTP_IF_NONE_MATCH='W/"x"').status_code == 404
+
+
+@pytest.mark.django_db
+def test_cached_response_answers_conditional_requests_without_queries(
+    api_client, service_factory, user_factory, query_counter
+):
+    api_client.force_authenticate(
+        user_factory(email="etag-staff@example.com", is_staff=True)
+    )
+    service_factory()
+    url = reverse("api:services-list")
+    etag = api_client.get(url)["ETag"]
+
+    with query_counter() as stats:
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert stats.count == 0
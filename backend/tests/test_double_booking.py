@@ -0,0 +1,198 @@
+"""Tests for overlapping appointment prevention."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from appointments.models import Appointment, SlotUnavailable
+
+BACKEND = Path(__file__).resolve().parents[1]
+BULK = "/api/v1/appointments/bulk/"
+
+
+@pytest.fixture
+def start():
+    return timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=2)
+
+
+@pytest.fixture
+def service(service_factory):
+    return service_factory(duration_minutes=60)
+
+
+def _payload(service, when, **extra):
+    return {
+        "customer": service.business.owner_id,
+        "business": service.business_id,
+        "service": service.pk,
+        "scheduled_for": when.isoformat(),
+        **extra,
+    }
+
+
+@pytest.mark.django_db
+def test_overlapping_booking_is_rejected_with_conflict(api_client, service, start):
+    api_client.force_authenticate(service.business.owner)
+    url = reverse("api:appointments-list")
+
+    first = api_client.post(url, _payload(service, start), format="json")
+    clash = api_client.post(
+        url, _payload(service, start + timedelta(minutes=30)), format="json"
+    )
+
+    assert first.status_code == 201, first.content
+    assert clash.status_code == 409
+    assert clash.json() == {"detail": "The requested time slot is no longer available."}
+    assert Appointment.objects.filter(business=service.business).count() == 1
+
+
+@pytest.mark.django_db
+def test_adjacent_cancelled_and_other_business_bookings_are_allowed(
+    appointment_factory, service_factory, service, start
+):
+    appointment_factory(service=service, scheduled_for=start)
+    appointment_factory(service=service, scheduled_for=start + timedelta(hours=1))
+    appointment_factory(service=service_factory(), scheduled_for=start)
+    cancelled = appointment_factory(
+        service=service, scheduled_for=start - timedelta(hours=1), status="cancelled"
+    )
+    appointment_factory(service=service, scheduled_for=start - timedelta(hours=1))
+
+    cancelled.status = "scheduled"
+    with pytest.raises(SlotUnavailable):
+        cancelled.save()
+
+
+@pytest.mark.django_db
+def test_moving_into_a_taken_slot_conflicts(
+    api_client, appointment_factory, service, start
+):
+    appointment_factory(service=service, scheduled_for=start)
+    moving = appointment_factory(
+        customer=service.business.owner,
+        service=service,
+        scheduled_for=start + timedelta(hours=3),
+    )
+    api_client.force_authenticate(service.business.owner)
+    url = reverse("api:appointments-detail", args=[moving.pk])
+
+    clash = api_client.patch(
+        url, {"scheduled_for": (start + timedelta(minutes=15)).isoformat()}
+    )
+    notes = api_client.patch(url, {"notes": "Window seat"})
+
+    assert clash.status_code == 409
+    assert notes.status_code == 200
+    moving.refresh_from_db()
+    assert moving.scheduled_for == start + timedelta(hours=3)
+
+
+@pytest.mark.django_db
+def test_bulk_bookings_conflict_with_each_other_and_stored_rows(
+    api_client, appointment_factory, service, start
+):
+    api_client.force_authenticate(service.business.owner)
+
+    within = api_client.post(
+        BULK,
+        [
+            _payload(service, start),
+            _payload(service, start + timedelta(minutes=45)),
+        ],
+        format="json",
+    )
+    assert within.status_code == 409
+    assert not Appointment.objects.exists()
+
+    appointment_factory(service=service, scheduled_for=start)
+    against = api_client.post(
+        BULK,
+        [
+            _payload(service, start + timedelta(hours=1)),
+            _payload(service, start - timedelta(minutes=30)),
+        ],
+        format="json",
+    )
+    assert against.status_code == 409
+    assert Appointment.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_moves_may_swap_slots(api_client, appointment_factory, service, start):
+    owner = service.business.owner
+    early = appointment_factory(customer=owner, service=service, scheduled_for=start)
+    late = appointment_factory(
+        customer=owner, service=service, scheduled_for=start + timedelta(hours=1)
+    )
+    api_client.force_authenticate(owner)
+
+    response = api_client.patch(
+        BULK,
+        [
+            {"id": early.pk, "scheduled_for": late.scheduled_for.isoformat()},
+            {"id": late.pk, "scheduled_for": early.scheduled_for.isoformat()},
+        ],
+        format="json",
+    )
+
+    assert response.status_code == 200, response.content
+    early.refresh_from_db()
+    assert early.scheduled_for == start + timedelta(hours=1)
+
+
+@pytest.mark.django_db
+def test_claim_slots_checks_a_batch_in_constant_queries(
+    appointment_factory, service, start, query_counter
+):
+    appointment_factory(service=service, scheduled_for=start)
+    candidates = [
+        Appointment(
+            customer=service.business.owner,
+            business=service.business,
+            service=service,
+            scheduled_for=start + timedelta(hours=hour),
+        )
+        for hour in (1, 2, 3)
+    ]
+    Appointment.set_ends_at(candidates)
+
+    with query_counter() as stats:
+        Appointment.claim_slots(candidates)
+
+    # One query locks the businesses, one reads the overlapping bookings.
+    assert stats.count == 2
+
+
+def test_concurrent_bookings_never_overlap():
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "core.settings.test",
+        "PYTHONPATH": os.pathsep.join([str(BACKEND.parent), str(BACKEND)]),
+    }
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(BACKEND / "scripts" / "benchmark_bookings.py"),
+            "--bookings",
+            "120",
+            "--workers",
+            "24",
+            "--businesses",
+            "2",
+        ],
+        capture_output=True,
+        env=env,
+        text=True,
+        timeout=300,
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "overlapping bookings: 0" in result.stdout
@@ -0,0 +1,149 @@
+"""Tests for the streaming NDJSON and CSV export action."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import tracemalloc
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from api.viewsets import PaymentTransactionViewSet
+from payments.models import PaymentTransaction
+
+from backend.tests.utils import extract_results
+
+
+def _body(response) -> str:
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.fixture
+def staff(api_client, user_factory):
+    user = user_factory(email="export-staff@example.com", is_staff=True)
+    api_client.force_authenticate(user)
+    return user
+
+
+@pytest.mark.django_db
+def test_ndjson_export_matches_list_output(
+    api_client, staff, payment_transaction_factory
+):
+    for amount in ("10.00", "20.00", "30.00"):
+        payment_transaction_factory(amount=Decimal(amount))
+
+    response = api_client.get(reverse("api:payments-export"), {"ordering": "id"})
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert response["Content-Disposition"].startswith('attachment; filename="payments-')
+    rows = [json.loads(line) for line in _body(response).splitlines()]
+    listed = api_client.get(
+        reverse("api:payments-list"), {"ordering": "id", "page_size": 100}
+    )
+    assert rows == extract_results(listed.json())
+
+
+@pytest.mark.django_db
+def test_csv_export_respects_filters_and_search(
+    api_client, staff, appointment_factory, service_factory
+):
+    massage = service_factory(name="Massage")
+    wanted = appointment_factory(service=massage, notes='Bring, "towels"')
+    appointment_factory(service=massage, status="cancelled")
+    appointment_factory()
+
+    response = api_client.get(
+        reverse("api:appointments-export"),
+        {"export_format": "csv", "status": "scheduled", "search": "massage"},
+    )
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/csv"
+    reader = csv.DictReader(io.StringIO(_body(response)))
+    rows = list(reader)
+    assert "customer" in reader.fieldnames
+    assert [int(row["id"]) for row in rows] == [wanted.id]
+    assert rows[0]["notes"] == 'Bring, "towels"'
+
+
+@pytest.mark.django_db
+def test_csv_export_escapes_formulas(api_client, staff, appointment_factory):
+    notes = ['=HYPERLINK("http://x")', "+1+1", "-2+3", "@SUM(A1)", "-5.00", "a=b"]
+    for note in notes:
+        appointment_factory(notes=note)
+
+    response = api_client.get(
+        reverse("api:appointments-export"), {"export_format": "csv", "ordering": "id"}
+    )
+
+    rows = list(csv.DictReader(io.StringIO(_body(response))))
+    assert [row["notes"] for row in rows] == [
+        '\'=HYPERLINK("http://x")',
+        "'+1+1",
+        "'-2+3",
+        "'@SUM(A1)",
+        "-5.00",
+        "a=b",
+    ]
+
+
+@pytest.mark.django_db
+def test_export_falls_back_to_instances_without_field_plan(
+    api_client, staff, payment_transaction_factory, monkeypatch
+):
+    payment = payment_transaction_factory()
+    serializer_class = PaymentTransactionViewSet.serializer_class
+    monkeypatch.setattr(
+        serializer_class, "get_value_columns", classmethod(lambda cls: None)
+    )
+
+    response = api_client.get(reverse("api:payments-export"))
+
+    assert [json.loads(line)["id"] for line in _body(response).splitlines()] == [
+        payment.id
+    ]
+
+
+@pytest.mark.django_db
+def test_export_is_staff_only_and_validates_format(api_client, user, staff):
+    url = reverse("api:payments-export")
+    assert api_client.get(url, {"export_format": "xml"}).status_code == 400
+
+    api_client.force_authenticate(user)
+    assert api_client.get(url).status_code == 403
+
+
+@pytest.mark.django_db
+def test_export_memory_stays_flat_as_rows_grow(
+    api_client, staff, payment_transaction_factory, monkeypatch
+):
+    template = payment_transaction_factory()
+    monkeypatch.setattr(PaymentTransactionViewSet, "export_chunk_size", 100)
+    url = reverse("api:payments-export")
+
+    def peak_for(total: int) -> int:
+        existing = PaymentTransaction.objects.count()
+        PaymentTransaction.objects.bulk_create(
+            PaymentTransaction(appointment_id=template.appointment_id, amount=1)
+            for _ in range(total - existing)
+        )
+        response = api_client.get(url)
+        tracemalloc.start()
+        try:
+            lines = sum(1 for _chunk in response.streaming_content)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert lines == total
+        return peak
+
+    small = peak_for(500)
+    large = peak_for(5_000)
+
+    # Ten times the rows may not cost anywhere near ten times the memory.
+    assert large < small * 2
@@ -0,0 +1,80 @@
+"""Tests for the ``values()``-based lean list mode."""
+
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.viewsets import AppointmentViewSet, NotificationViewSet
+
+
+def _get_both(api_client, monkeypatch, viewset, url, params=None):
+    """Return the lean and the regular response bodies for ``url``."""
+
+    lean = api_client.get(url, params)
+    monkeypatch.setattr(viewset, "lean_list", False)
+    regular = api_client.get(url, params)
+    monkeypatch.setattr(viewset, "lean_list", True)
+    assert lean.status_code == regular.status_code == 200
+    return lean.content, regular.content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params", [None, {"page_size": 2}, {"search": "hair"}, {"ordering": "id"}]
+)
+def test_lean_appointment_list_matches_serializer_output(
+    api_client, appointment_factory, service_factory, user_factory, monkeypatch, params
+):
+    staff = user_factory(email="lean-staff@example.com", is_staff=True)
+    haircut = service_factory(name="Haircut")
+    appointment_factory(service=haircut, notes="Bring photos")
+    appointment_factory()
+    appointment_factory(status="completed")
+    api_client.force_authenticate(staff)
+
+    lean, regular = _get_both(
+        api_client,
+        monkeypatch,
+        AppointmentViewSet,
+        reverse("api:appointments-list"),
+        params,
+    )
+
+    assert lean == regular
+
+
+@pytest.mark.django_db
+def test_lean_notification_pages_match_serializer_output(
+    api_client, notification_factory, user_factory, monkeypatch
+):
+    recipient = user_factory(email="lean@example.com")
+    for index in range(5):
+        notification_factory(recipient=recipient, subject=f"n{index}")
+    api_client.force_authenticate(recipient)
+
+    url = reverse("api:notifications-list") + "?page_size=2"
+    pages = 0
+    while url:
+        lean, regular = _get_both(api_client, monkeypatch, NotificationViewSet, url)
+        assert lean == regular
+        url = api_client.get(url).json()["next"]
+        pages += 1
+    assert pages == 3
+
+
+@pytest.mark.django_db
+def test_lean_list_skips_related_joins(api_client, appointment_factory, user_factory):
+    staff = user_factory(email="lean-staff@example.com", is_staff=True)
+    appointment_factory()
+    api_client.force_authenticate(staff)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse("api:appointments-list"))
+
+    assert response.status_code == 200
+    selects = [q["sql"] for q in queries if "appointments_appointment" in q["sql"]]
+    assert selects
+    assert not any("JOIN" in sql for sql in selects)
@@ -0,0 +1,112 @@
+"""Tests for bulk mark-as-read and the unread notification counter."""
+
+from __future__ import annotations
+
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from notifications.dispatch import send_many
+from notifications.models import Notification, UnreadCount
+from users.models import User
+
+
+@pytest.mark.django_db
+def test_counter_follows_creates_reads_and_deletes(user, notification_factory):
+    first = notification_factory(recipient=user)
+    second = notification_factory(recipient=user)
+    notification_factory(recipient=user).mark_read()
+    assert UnreadCount.for_user(user.pk) == 2
+
+    first.mark_read()
+    first.mark_read()
+    assert UnreadCount.for_user(user.pk) == 1
+
+    first.delete()
+    second.delete()
+    assert UnreadCount.for_user(user.pk) == 0
+
+    send_many(User.objects.filter(pk=user.pk), subject="All", body="...")
+    assert UnreadCount.for_user(user.pk) == 1
+
+
+@pytest.mark.django_db
+def test_mark_all_read_is_one_update_for_the_requesting_user(
+    api_client, user, user_factory, notification_factory, query_counter
+):
+    other = user_factory(email="other@example.com")
+    for _ in range(3):
+        notification_factory(recipient=user)
+    notification_factory(recipient=other)
+    api_client.force_authenticate(user)
+
+    with query_counter() as stats:
+        response = api_client.post(reverse("api:notifications-mark-all-read"))
+
+    assert response.status_code == 200
+    assert response.json() == {"marked": 3}
+    updates = [shape for shape in stats.shapes if shape.startswith("UPDATE")]
+    assert len(updates) == 2 and stats.count <= 4
+    assert not Notification.objects.filter(recipient=user, read_at=None).exists()
+    assert UnreadCount.for_user(user.pk) == 0
+    assert UnreadCount.for_user(other.pk) == 1
+
+    response = api_client.get(reverse("api:notifications-unread-count"))
+    assert response.json() == {"unread": 0}
+
+
+@pytest.mark.django_db
+def test_mark_read_only_touches_own_listed_notifications(
+    api_client, user, user_factory, notification_factory
+):
+    other = notification_factory(recipient=user_factory(email="other@example.com"))
+    listed, unlisted = notification_factory(recipient=user), notification_factory(
+        recipient=user
+    )
+    url = reverse("api:notifications-mark-read")
+    api_client.force_authenticate(user)
+
+    assert api_client.post(url, {"ids": []}, format="json").status_code == 400
+    response = api_client.post(url, {"ids": [listed.pk, other.pk]}, format="json")
+
+    assert response.json() == {"marked": 1}
+    assert Notification.objects.get(pk=listed.pk).read_at is not None
+    assert Notification.objects.get(pk=other.pk).read_at is None
+    assert Notification.objects.get(pk=unlisted.pk).read_at is None
+    response = api_client.get(reverse("api:notifications-unread-count"))
+    assert response.json() == {"unread": 1}
+
+
+@pytest.mark.django_db
+def test_check_unread_counts_reports_and_repairs_drift(
+    user, user_factory, notification_factory
+):
+    other = user_factory(email="other@example.com")
+    notification_factory(recipient=user)
+    notification_factory(recipient=other)
+    UnreadCount.objects.filter(recipient=user).update(unread=7)
+    UnreadCount.objects.filter(recipient=other).delete()
+
+    out = StringIO()
+    with pytest.raises(CommandError):
+        call_command(
+            "check_unread_counts",
+            chunk_size=1,
+            fail_on_mismatch=True,
+            stdout=out,
+            stderr=StringIO(),
+        )
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [
+        {"recipient": user.pk, "counted": 7, "actual": 1},
+        {"recipient": other.pk, "counted": 0, "actual": 1},
+    ]
+
+    call_command("check_unread_counts", fix=True, stdout=StringIO(), stderr=StringIO())
+    assert UnreadCount.for_user(user.pk) == 1
+    assert UnreadCount.for_user(other.pk) == 1
+    out = StringIO()
+    call_command("check_unread_counts", stdout=out, stderr=StringIO())
+    assert out.getvalue() == ""
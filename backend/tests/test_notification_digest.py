@@ -0,0 +1,119 @@
+"""Tests for digest batching of notification bursts."""
+
+from __future__ import annotations
+
+import pytest
+from django.db import transaction
+from django.urls import reverse
+
+from notifications import digest
+from notifications.adapters import InMemorySink, MockNotificationService
+from notifications.digest import InMemoryDigestBuffer, notify
+from notifications.models import Notification
+from notifications.tasks import flush_digest
+
+
+@pytest.fixture
+def scheduled(monkeypatch, settings):
+    """Record flush scheduling instead of running it.
+
+    Eager Celery ignores ``countdown`` and would flush after the first message.
+    """
+
+    settings.NOTIFICATION_DIGEST_BUFFER = {
+        "BACKEND": "notifications.digest.InMemoryDigestBuffer"
+    }
+    InMemoryDigestBuffer.clear()
+    calls = []
+
+    class Scheduler:
+        @staticmethod
+        def apply_async(args, countdown):
+            calls.append((args, countdown))
+
+    monkeypatch.setattr(digest, "flush_digest", Scheduler)
+    yield calls
+    InMemoryDigestBuffer.clear()
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    sink = InMemorySink()
+    monkeypatch.setattr(MockNotificationService, "outbox", sink)
+    return sink
+
+
+@pytest.mark.django_db
+def test_burst_is_delivered_as_one_notification(
+    user, user_factory, scheduled, outbox, django_capture_on_commit_callbacks
+):
+    other = user_factory(email="other@example.com")
+    with django_capture_on_commit_callbacks(execute=True):
+        for number in range(5):
+            notify(user.pk, subject=f"Moved #{number}", body=f"Now at {number}:00.")
+        notify(other.pk, subject="Cancelled", body="Sorry.")
+
+    assert scheduled == [((user.pk,), 60), ((other.pk,), 60)]
+    assert not Notification.objects.exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert flush_digest.delay(user.pk).get() == 5
+        assert flush_digest.delay(other.pk).get() == 1
+        assert flush_digest.delay(user.pk).get() == 0
+
+    mine = Notification.objects.get(recipient=user)
+    assert mine.subject == "5 new notifications"
+    assert mine.body.startswith("Moved #0\nNow at 0:00.\n\nMoved #1")
+    assert Notification.objects.get(recipient=other).subject == "Cancelled"
+    assert [message.recipient for message in outbox] == [user.email, other.email]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        notify(user.pk, subject="Again", body="...")
+    assert scheduled[-1] == ((user.pk,), 60)
+
+
+@pytest.mark.django_db
+def test_rolled_back_messages_are_not_buffered(
+    user, scheduled, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            notify(user.pk, subject="Never", body="...")
+            raise RuntimeError
+
+    assert scheduled == []
+    assert flush_digest.delay(user.pk).get() == 0
+
+
+@pytest.mark.django_db
+def test_broadcasts_can_go_to_the_digest(
+    api_client, user, user_factory, scheduled, django_capture_on_commit_callbacks
+):
+    staff = user_factory(email="staff@example.com", is_staff=True)
+    api_client.force_authenticate(staff)
+    url = reverse("api:notifications-broadcast")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for number in range(2):
+            response = api_client.post(
+                url,
+                {"subject": f"Update {number}", "body": "...", "digest": True},
+                format="json",
+            )
+            assert response.status_code == 202
+    assert not Notification.objects.exists()
+    assert sorted(args for args, _countdown in scheduled) == sorted(
+        [(user.pk,), (staff.pk,)]
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert flush_digest.delay(user.pk).get() == 2
+    assert Notification.objects.get(recipient=user).subject == "2 new notifications"
+
+    response = api_client.post(
+        url,
+        {"subject": "S", "body": "B", "digest": True, "channels": ["email"]},
+        format="json",
+    )
+    assert response.status_code == 400
+    assert "channels" in response.json()
@@ -0,0 +1,152 @@
+"""Tests for batched notification fan-out and delivery."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from notifications.adapters import (
+    InMemorySink,
+    MockNotificationService,
+    NotificationMessage,
+)
+from notifications.dispatch import customers_of, send_many
+from notifications.models import Notification
+from notifications.tasks import fan_out_notifications
+from users.models import User
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    sink = InMemorySink(maxlen=50)
+    monkeypatch.setattr(MockNotificationService, "outbox", sink)
+    return sink
+
+
+@pytest.fixture
+def crowd(db):
+    return User.objects.bulk_create(
+        User(email=f"crowd-{number}@example.com") for number in range(7)
+    )
+
+
+def test_in_memory_sink_keeps_only_the_latest_messages():
+    sink = InMemorySink(maxlen=2)
+    service = MockNotificationService(sink=sink)
+
+    for number in range(5):
+        service.send(recipient=f"{number}@example.com", subject="s", body="b")
+
+    assert [message.recipient for message in sink] == ["3@example.com", "4@example.com"]
+    assert sink.total == 5
+
+
+@pytest.mark.django_db
+def test_send_many_creates_and_delivers_in_chunks(
+    crowd, outbox, settings, django_capture_on_commit_callbacks, query_counter
+):
+    settings.NOTIFICATION_CHANNELS = {
+        "email": settings.NOTIFICATION_CHANNELS["email"],
+        "sms": {"BACKEND": "notifications.adapters.MockNotificationService"},
+    }
+    recipients = User.objects.filter(email__startswith="crowd-")
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with query_counter() as stats:
+            result = send_many(recipients, subject="Hi", body="News", chunk_size=3)
+
+    assert (result.notifications, result.batches) == (7, 3)
+    assert len(callbacks) == 3
+    # Per chunk: the recipient page, the insert, the two unread counter
+    # writes and the savepoint pair.
+    assert stats.count <= 3 * 6 + 1
+    assert Notification.objects.filter(subject="Hi").count() == 7
+    assert sorted(message.recipient for message in outbox) == sorted(
+        [user.email for user in crowd] * 2
+    )
+    assert outbox.messages[0] == NotificationMessage(crowd[0].email, "Hi", "News")
+
+
+@pytest.mark.django_db
+def test_send_many_rejects_unknown_channels(crowd):
+    with pytest.raises(ValueError):
+        send_many(User.objects.all(), subject="Hi", body="News", channels=["fax"])
+    assert not Notification.objects.exists()
+
+
+@pytest.mark.django_db
+def test_owner_notifies_each_customer_once(
+    api_client,
+    user,
+    service_factory,
+    appointment_factory,
+    outbox,
+    django_capture_on_commit_callbacks,
+):
+    service = service_factory()
+    regular = appointment_factory(service=service).customer
+    appointment_factory(
+        service=service,
+        customer=regular,
+        scheduled_for=timezone.now() + timedelta(days=3),
+    )
+    other = appointment_factory(
+        service=service, scheduled_for=timezone.now() + timedelta(days=5)
+    ).customer
+    appointment_factory()
+    url = reverse("api:businesses-notify-customers", args=[service.business.pk])
+    payload = {"subject": "Closed Friday", "body": "See you next week."}
+
+    api_client.force_authenticate(user)
+    assert api_client.post(url, payload, format="json").status_code == 403
+
+    api_client.force_authenticate(service.business.owner)
+    response = api_client.post(url, {**payload, "channels": ["fax"]}, format="json")
+    assert response.status_code == 400
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(url, payload, format="json")
+
+    assert response.status_code == 202, response.content
+    assert set(response.json()) == {"task"}
+    assert Notification.objects.filter(subject="Closed Friday").count() == 2
+    assert set(customers_of(service.business)) == {regular, other}
+    assert sorted(message.recipient for message in outbox) == sorted(
+        [regular.email, other.email]
+    )
+
+
+@pytest.mark.django_db
+def test_broadcast_is_staff_only(api_client, user, user_factory, crowd, outbox):
+    url = reverse("api:notifications-broadcast")
+    payload = {"subject": "Maintenance", "body": "Tonight."}
+
+    api_client.force_authenticate(user)
+    assert api_client.post(url, payload, format="json").status_code == 403
+
+    api_client.force_authenticate(
+        user_factory(email="staff@example.com", is_staff=True)
+    )
+    response = api_client.post(url, payload, format="json")
+
+    assert response.status_code == 202
+    assert response.json()["task"]
+    assert (
+        Notification.objects.filter(subject="Maintenance").count()
+        == User.objects.count()
+    )
+
+
+@pytest.mark.django_db
+def test_fan_out_task_reports_counts(crowd, outbox, settings):
+    settings.NOTIFICATION_FANOUT_CHUNK = 5
+
+    result = fan_out_notifications.delay("Hi", "News").get()
+
+    assert result == {"notifications": len(crowd), "batches": 2}
+    assert fan_out_notifications.delay("Hi", "News", business_id=0).get() == {
+        "notifications": 0,
+        "batches": 0,
+    }
@@ -0,0 +1,244 @@
+"""Tests for the websocket push of new notifications."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.asgi import application
+from notifications.dispatch import send_many
+from notifications.models import Notification
+from users.models import User
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def channel_layer(settings):
+    # A fresh layer per test: its queues belong to the test's event loop.
+    settings.CHANNEL_LAYERS = {
+        "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+    }
+
+
+class Socket(ApplicationCommunicator):
+    """Websocket client for the ASGI app; ``channels.testing`` needs daphne."""
+
+    def __init__(self, query: str):
+        super().__init__(
+            application,
+            {
+                "type": "websocket",
+                "path": "/ws/notifications/",
+                "query_string": query.encode(),
+                "headers": [(b"origin", b"http://testserver")],
+                "subprotocols": [],
+            },
+        )
+
+    async def connect(self) -> tuple[bool, int | None]:
+        await self.send_input({"type": "websocket.connect"})
+        response = await self.receive_output(1)
+        if response["type"] == "websocket.close":
+            return False, response.get("code")
+        return True, None
+
+    async def send_json_to(self, data) -> None:
+        await self.send_input({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def receive_json_from(self):
+        response = await self.receive_output(1)
+        assert response["type"] == "websocket.send", response
+        return json.loads(response["text"])
+
+    async def disconnect(self) -> None:
+        await self.send_input({"type": "websocket.disconnect", "code": 1000})
+        await self.wait(1)
+
+
+def _socket(user=None, query: str = "") -> Socket:
+    params = [f"token={AccessToken.for_user(user)}"] if user else []
+    if query:
+        params.append(query)
+    return Socket("&".join(params))
+
+
+@sync_to_async
+def _notify(user, subject: str = "Hello") -> Notification:
+    return Notification.objects.create(recipient=user, subject=subject, body="...")
+
+
+async def _received_subjects(socket, count: int) -> list[str]:
+    messages = [await socket.receive_json_from() for _ in range(count)]
+    assert {message["type"] for message in messages} == {"notification"}
+    return [message["notification"]["subject"] for message in messages]
+
+
+def test_rejects_missing_and_invalid_tokens(user):
+    async def scenario():
+        for socket in (
+            _socket(),
+            Socket("token=garbage"),
+            _socket(user, "resume=soon"),
+        ):
+            connected, code = await socket.connect()
+            assert not connected
+            assert code in (4400, 4401)
+
+    async_to_sync(scenario)()
+
+
+def test_pushes_new_notifications_to_their_recipient_only(user, user_factory):
+    other = user_factory(email="other@example.com")
+
+    async def scenario():
+        socket = _socket(user)
+        connected, _ = await socket.connect()
+        assert connected
+
+        await _notify(other, "Not yours")
+        mine = await _notify(user, "Yours")
+
+        message = await socket.receive_json_from()
+        assert message["type"] == "notification"
+        assert message["resume_token"] == str(mine.pk)
+        assert message["notification"]["subject"] == "Yours"
+        assert message["notification"]["recipient"] == user.pk
+        assert await socket.receive_nothing()
+        await socket.disconnect()
+
+    async_to_sync(scenario)()
+
+
+def test_unacknowledged_window_defers_the_rest_to_the_database(user, settings):
+    settings.NOTIFICATION_PUSH_WINDOW = 2
+
+    async def scenario():
+        socket = _socket(user)
+        await socket.connect()
+        for number in range(5):
+            await _notify(user, f"n{number}")
+
+        assert await _received_subjects(socket, 2) == ["n0", "n1"]
+        assert await socket.receive_nothing()
+
+        await socket.send_json_to({"type": "ack", "resume_token": "0"})
+        assert await socket.receive_nothing()
+        last = (await sync_to_async(Notification.objects.get)(subject="n1")).pk
+        await socket.send_json_to({"type": "ack", "resume_token": str(last)})
+        assert await _received_subjects(socket, 2) == ["n2", "n3"]
+        await socket.send_json_to({"type": "ack", "resume_token": str(last + 2)})
+        assert await _received_subjects(socket, 1) == ["n4"]
+        assert await socket.receive_nothing()
+
+        await socket.send_json_to({"type": "ack"})
+        assert (await socket.receive_json_from())["type"] == "error"
+        await socket.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@sync_to_async
+def _free_id(user) -> int:
+    """Return an id below the next one, as a late-committing row would hold."""
+
+    placeholder = Notification.objects.create(recipient=user, subject="-", body="-")
+    Notification.objects.filter(pk=placeholder.pk).delete()
+    return placeholder.pk
+
+
+@sync_to_async
+def _notify_late(user, pk: int, subject: str) -> Notification:
+    return Notification.objects.create(pk=pk, recipient=user, subject=subject, body="")
+
+
+def test_late_commits_with_lower_ids_are_still_pushed(user, settings):
+    settings.NOTIFICATION_PUSH_WINDOW = 1
+
+    async def scenario():
+        late_ids = [await _free_id(user), await _free_id(user)]
+        socket = _socket(user)
+        await socket.connect()
+
+        first = await _notify(user, "first")
+        assert await _received_subjects(socket, 1) == ["first"]
+        await socket.send_json_to({"type": "ack", "resume_token": str(first.pk)})
+        await _notify_late(user, late_ids[0], "late, live")
+        assert await _received_subjects(socket, 1) == ["late, live"]
+
+        await socket.send_json_to({"type": "ack", "resume_token": str(late_ids[0])})
+        second = await _notify(user, "second")
+        assert await _received_subjects(socket, 1) == ["second"]
+        # The window is full: the late row waits for the next catch-up.
+        await _notify_late(user, late_ids[1], "late, deferred")
+        assert await socket.receive_nothing()
+
+        await socket.send_json_to({"type": "ack", "resume_token": str(second.pk)})
+        assert await _received_subjects(socket, 1) == ["late, deferred"]
+        assert await socket.receive_nothing()
+        await socket.disconnect()
+
+    async_to_sync(scenario)()
+
+
+def test_resume_token_replays_only_missed_notifications(user, user_factory):
+    other = user_factory(email="other@example.com")
+
+    async def scenario():
+        seen = await _notify(user, "seen")
+        await _notify(other, "not yours")
+        await _notify(user, "missed 1")
+        await _notify(user, "missed 2")
+
+        socket = _socket(user, f"resume={seen.pk}")
+        connected, _ = await socket.connect()
+        assert connected
+        assert await _received_subjects(socket, 2) == ["missed 1", "missed 2"]
+        assert await socket.receive_nothing()
+        await socket.disconnect()
+
+    async_to_sync(scenario)()
+
+
+def test_resume_replays_rows_that_committed_late_below_the_token(user):
+    async def scenario():
+        late_id = await _free_id(user)
+        socket = _socket(user)
+        await socket.connect()
+        seen = await _notify(user, "seen")
+        assert await _received_subjects(socket, 1) == ["seen"]
+        await socket.disconnect()
+
+        # Commits while the client is away, with an id below its token.
+        await _notify_late(user, late_id, "late")
+        await _notify(user, "missed")
+
+        socket = _socket(user, f"resume={seen.pk}")
+        await socket.connect()
+        assert await _received_subjects(socket, 2) == ["late", "missed"]
+        assert await socket.receive_nothing()
+        await socket.disconnect()
+
+    async_to_sync(scenario)()
+
+
+def test_fan_out_pushes_bulk_created_notifications(user, user_factory):
+    user_factory(email="second@example.com")
+
+    async def scenario():
+        socket = _socket(user)
+        await socket.connect()
+
+        await sync_to_async(send_many)(
+            User.objects.all(), subject="Everyone", body="...", chunk_size=1
+        )
+
+        assert await _received_subjects(socket, 1) == ["Everyone"]
+        assert await socket.receive_nothing()
+        await socket.disconnect()
+
+    async_to_sync(scenario)()
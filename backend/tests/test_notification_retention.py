@@ -0,0 +1,112 @@
+"""Tests for the notification retention and archival job."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from api.search import FTS_TABLE
+from notifications.models import Notification, UnreadCount
+from notifications.retention import purge_notifications
+from notifications.tasks import purge_notifications as purge_notifications_task
+
+
+@pytest.fixture
+def policy(settings, tmp_path):
+    settings.NOTIFICATION_RETENTION_READ_DAYS = 30
+    settings.NOTIFICATION_RETENTION_DAYS = 180
+    settings.NOTIFICATION_ARCHIVE_DIR = str(tmp_path)
+    return tmp_path
+
+
+def _aged(notification_factory, user, days: int, read: bool) -> Notification:
+    now = timezone.now()
+    notification = notification_factory(
+        recipient=user, subject=f"{days}d {'read' if read else 'unread'}"
+    )
+    if read:
+        notification.mark_read()
+    Notification.objects.filter(pk=notification.pk).update(
+        created_at=now - timedelta(days=days)
+    )
+    return notification
+
+
+@pytest.mark.django_db
+def test_purge_deletes_old_read_and_archives_expired_notifications(
+    policy, user, notification_factory
+):
+    kept = [
+        _aged(notification_factory, user, 1, read=True),
+        _aged(notification_factory, user, 40, read=False),
+    ]
+    for days in (40, 41, 200):
+        _aged(notification_factory, user, days, read=True)
+    expired = [_aged(notification_factory, user, days, False) for days in (200, 300)]
+    assert UnreadCount.for_user(user.pk) == 3
+
+    stats = purge_notifications(chunk_size=2)
+
+    assert (stats.deleted, stats.archived, stats.batches) == (5, 2, 3)
+    assert stats.rows_per_second > 0
+    assert set(Notification.objects.values_list("pk", flat=True)) == {
+        notification.pk for notification in kept
+    }
+    assert UnreadCount.for_user(user.pk) == 1
+    with gzip.open(stats.archive, "rt", encoding="utf-8") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row["id"] for row in rows] == [expired[1].pk, expired[0].pk]
+    assert rows[0]["subject"] == "300d unread"
+    assert rows[0]["recipient_id"] == user.pk
+    assert rows[0]["read_at"] is None
+
+    assert purge_notifications().deleted == 0
+
+
+@pytest.mark.django_db
+def test_purge_removes_search_documents(policy, user, notification_factory):
+    kept = _aged(notification_factory, user, 1, read=True)
+    _aged(notification_factory, user, 40, read=True)
+    _aged(notification_factory, user, 200, read=False)
+
+    purge_notifications(chunk_size=1)
+
+    content_type = ContentType.objects.get_for_model(Notification)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT object_id FROM {FTS_TABLE} WHERE content_type = %s",
+            [content_type.pk],
+        )
+        assert [row[0] for row in cursor.fetchall()] == [kept.pk]
+
+
+@pytest.mark.django_db
+def test_disabled_policies_keep_rows(policy, settings, user, notification_factory):
+    settings.NOTIFICATION_RETENTION_READ_DAYS = None
+    settings.NOTIFICATION_RETENTION_DAYS = None
+    _aged(notification_factory, user, 400, read=True)
+
+    assert purge_notifications().deleted == 0
+    assert not list(policy.iterdir())
+
+
+@pytest.mark.django_db
+def test_task_and_command_report_purge_metrics(policy, user, notification_factory):
+    _aged(notification_factory, user, 40, read=True)
+    result = purge_notifications_task.delay().get()
+    assert result["deleted"] == 1 and result["archive"] is None
+    assert set(result) >= {"batches", "seconds", "rows_per_second"}
+
+    _aged(notification_factory, user, 365, read=False)
+    out = StringIO()
+    call_command("purge_notifications", "--no-compact", stdout=out)
+    assert "Purged 1 notifications (1 archived) in 1 batches" in out.getvalue()
+    assert "Archive: " in out.getvalue()
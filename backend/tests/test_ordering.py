@@ -0,0 +1,80 @@
+"""Tests for the index-aware ordering allowlist."""
+
+from __future__ import annotations
+
+import pytest
+from django.urls import reverse
+
+from api.filters import indexed_ordering_fields
+from api.viewsets import AppointmentViewSet
+from appointments.models import Appointment
+
+from backend.tests.utils import extract_results
+
+
+def test_indexed_ordering_fields_skip_text_and_relation_columns():
+    assert indexed_ordering_fields(Appointment) == ("id", "created_at")
+
+
+@pytest.mark.django_db
+def test_ordering_by_unindexed_text_column_is_rejected(
+    api_client, appointment_factory, user_factory
+):
+    staff = user_factory(email="ordering-staff@example.com", is_staff=True)
+    appointment_factory()
+    api_client.force_authenticate(staff)
+
+    response = api_client.get(reverse("api:appointments-list"), {"ordering": "notes"})
+
+    assert response.status_code == 400
+    assert "ordering" in response.json()
+
+
+@pytest.mark.django_db
+def test_ordering_by_indexed_column_is_applied(
+    api_client, appointment_factory, user_factory
+):
+    staff = user_factory(email="ordering-staff@example.com", is_staff=True)
+    first = appointment_factory()
+    second = appointment_factory()
+    api_client.force_authenticate(staff)
+
+    response = api_client.get(reverse("api:appointments-list"), {"ordering": "id"})
+
+    assert response.status_code == 200
+    ids = [item["id"] for item in extract_results(response.json())]
+    assert ids == [first.id, second.id]
+
+
+@pytest.mark.django_db
+def test_explicit_ordering_fields_override_index_derivation(
+    api_client, appointment_factory, user_factory, monkeypatch
+):
+    monkeypatch.setattr(AppointmentViewSet, "ordering_fields", ("status",))
+    staff = user_factory(email="ordering-staff@example.com", is_staff=True)
+    appointment_factory(status="scheduled")
+    appointment_factory(status="completed")
+    api_client.force_authenticate(staff)
+
+    allowed = api_client.get(reverse("api:appointments-list"), {"ordering": "status"})
+    rejected = api_client.get(reverse("api:appointments-list"), {"ordering": "id"})
+
+    assert allowed.status_code == 200
+    statuses = [item["status"] for item in extract_results(allowed.json())]
+    # Statuses sort by their stored code, which follows the lifecycle.
+    assert statuses == ["scheduled", "completed"]
+    assert rejected.status_code == 400
+
+
+@pytest.mark.django_db
+def test_schema_lists_allowed_orderings(api_client):
+    response = api_client.get(reverse("schema"), HTTP_ACCEPT="application/json")
+
+    parameters = response.json()["paths"]["/api/v1/appointments/"]["get"]["parameters"]
+    ordering = next(param for param in parameters if param["name"] == "ordering")
+    assert ordering["schema"]["items"]["enum"] == [
+        "id",
+        "created_at",
+        "-id",
+        "-created_at",
+    ]
@@ -0,0 +1,126 @@
+"""Tests for keyset pagination on high-volume list endpoints."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from notifications.models import Notification
+
+
+@pytest.fixture
+def recipient_with_notifications(user_factory, notification_factory):
+    """Return a user owning 25 notifications, several sharing a timestamp."""
+
+    recipient = user_factory(email="keyset@example.com")
+    created = [
+        notification_factory(recipient=recipient, subject=f"n{i}") for i in range(25)
+    ]
+    base = timezone.now()
+    for index, notification in enumerate(created):
+        # Collapse timestamps into groups of five to exercise the pk tie-breaker.
+        stamp = base - timedelta(minutes=index // 5)
+        Notification.objects.filter(pk=notification.pk).update(created_at=stamp)
+    return recipient
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_walks_all_rows_once(
+    api_client, recipient_with_notifications
+):
+    api_client.force_authenticate(recipient_with_notifications)
+
+    url = reverse("api:notifications-list") + "?page_size=7"
+    seen: list[int] = []
+    pages = 0
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        payload = response.json()
+        assert "count" not in payload
+        seen.extend(item["id"] for item in payload["results"])
+        url = payload["next"]
+        pages += 1
+
+    expected = list(
+        Notification.objects.filter(recipient=recipient_with_notifications)
+        .order_by("-created_at", "id")
+        .values_list("id", flat=True)
+    )
+    assert seen == expected
+    assert pages == 4
+
+
+@pytest.mark.django_db
+def test_keyset_previous_link_returns_preceding_page(
+    api_client, recipient_with_notifications
+):
+    api_client.force_authenticate(recipient_with_notifications)
+    list_url = reverse("api:notifications-list")
+
+    first = api_client.get(list_url, {"page_size": 5}).json()
+    second = api_client.get(first["next"]).json()
+    assert first["previous"] is None
+
+    back = api_client.get(second["previous"]).json()
+    assert [item["id"] for item in back["results"]] == [
+        item["id"] for item in first["results"]
+    ]
+
+
+@pytest.mark.django_db
+def test_keyset_optional_estimated_count(api_client, recipient_with_notifications):
+    api_client.force_authenticate(recipient_with_notifications)
+
+    response = api_client.get(reverse("api:notifications-list"), {"count": "estimate"})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["count"] == 25
+    assert "count=" not in payload["next"]
+
+
+@pytest.mark.django_db
+def test_keyset_rejects_unindexed_ordering(api_client, recipient_with_notifications):
+    api_client.force_authenticate(recipient_with_notifications)
+
+    response = api_client.get(
+        reverse("api:notifications-list"), {"ordering": "subject"}
+    )
+
+    assert response.status_code == 400
+    assert "ordering" in response.json()
+
+
+@pytest.mark.django_db
+def test_keyset_accepts_indexed_client_ordering(
+    api_client, recipient_with_notifications
+):
+    api_client.force_authenticate(recipient_with_notifications)
+
+    response = api_client.get(
+        reverse("api:notifications-list"), {"ordering": "created_at", "page_size": 100}
+    )
+
+    assert response.status_code == 200
+    ids = [item["id"] for item in response.json()["results"]]
+    expected = list(
+        Notification.objects.filter(recipient=recipient_with_notifications)
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)
+    )
+    assert ids == expected
+
+
+@pytest.mark.django_db
+def test_keyset_rejects_tampered_cursor(api_client, recipient_with_notifications):
+    api_client.force_authenticate(recipient_with_notifications)
+
+    response = api_client.get(
+        reverse("api:notifications-list"), {"cursor": "not-a-cursor"}
+    )
+
+    assert response.status_code == 404
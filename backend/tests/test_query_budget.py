@@ -0,0 +1,86 @@
+"""Tests for per-request query accounting and budgets."""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+from django.urls import reverse
+
+from api.routers import router
+from api.viewsets import NotificationViewSet
+from common.middleware import QueryBudgetExceeded, normalize_sql
+from services.models import Service
+
+
+@pytest.fixture
+def populated_api(
+    api_client,
+    user_factory,
+    listing_factory,
+    payment_transaction_factory,
+    notification_factory,
+):
+    """Return a staff-authenticated client with several rows per resource."""
+
+    staff = user_factory(email="budget-staff@example.com", is_staff=True)
+    for _ in range(6):
+        listing_factory()
+        payment_transaction_factory()
+        notification_factory(recipient=staff)
+    api_client.force_authenticate(staff)
+    return api_client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("basename", [basename for _, _, basename in router.registry])
+def test_every_route_reports_timing_within_budget(populated_api, basename):
+    # Strict mode in the test settings raises on budget or N+1 violations.
+    response = populated_api.get(reverse(f"api:{basename}-list"))
+
+    assert response.status_code == 200
+    assert response["Server-Timing"].startswith("db;dur=")
+    assert " queries" in response["Server-Timing"]
+
+
+@pytest.mark.django_db
+def test_exceeding_the_budget_fails_in_strict_mode(populated_api, monkeypatch):
+    monkeypatch.setattr(NotificationViewSet, "query_budget", 0)
+
+    with pytest.raises(QueryBudgetExceeded, match="exceed the budget of 0"):
+        populated_api.get(reverse("api:notifications-list"))
+
+
+@pytest.mark.django_db
+def test_violations_are_logged_outside_strict_mode(
+    populated_api, monkeypatch, settings, caplog
+):
+    settings.QUERY_BUDGET_STRICT = False
+    monkeypatch.setattr(NotificationViewSet, "query_budget", {"list": 0})
+
+    with caplog.at_level(logging.WARNING, logger="apatie.queries"):
+        response = populated_api.get(reverse("api:notifications-list"))
+
+    assert response.status_code == 200
+    assert "GET /api/v1/notifications/" in caplog.text
+
+
+@pytest.mark.django_db
+def test_query_counter_flags_repeated_shapes(service_factory, query_counter):
+    for _ in range(3):
+        service_factory()
+
+    with query_counter() as stats:
+        names = [service.business.name for service in Service.objects.all()]
+
+    assert len(names) == 3
+    assert stats.count == 4
+    [(shape, count)] = stats.repeated(3)
+    assert count == 3
+    assert 'FROM "business_businessprofile"' in shape
+
+
+def test_normalize_sql_collapses_in_lists():
+    assert normalize_sql('SELECT 1 WHERE "id" IN (%s, %s,\n %s)') == normalize_sql(
+        'SELECT 1 WHERE "id" IN (%s)'
+    )
@@ -0,0 +1,65 @@
+"""Tests for index declarations and the query index report command."""
+
+from __future__ import annotations
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.indexes import COVERED, MISSING, PARTIAL, index_coverage
+from appointments.models import Appointment
+from marketplace.models import Listing
+from notifications.models import Notification
+
+
+def test_index_coverage_classifies_query_shapes():
+    assert index_coverage(Notification, ["recipient"], ["-created_at"]) == COVERED
+    assert (
+        index_coverage(Listing, ["business", "is_active"], ["-created_at"]) == COVERED
+    )
+    assert (
+        index_coverage(Appointment, ["customer", "status"], ["-created_at"]) == PARTIAL
+    )
+    assert index_coverage(Appointment, ["notes"], ["-created_at"]) == MISSING
+    assert index_coverage(Appointment, ["id", "notes"]) == COVERED
+
+
+def test_range_lookups_close_the_index_prefix():
+    assert (
+        index_coverage(Appointment, ["business"], ["scheduled_for"], "scheduled_for")
+        == COVERED
+    )
+    # An equality on scheduled_for would let the index sort by ends_at; a
+    # range on it does not.
+    assert (
+        index_coverage(Appointment, ["business", "scheduled_for"], ["ends_at"])
+        == COVERED
+    )
+    assert (
+        index_coverage(Appointment, ["business"], ["ends_at"], "scheduled_for")
+        == PARTIAL
+    )
+
+
+def test_unread_notifications_have_partial_index():
+    unread = [index for index in Notification._meta.indexes if index.condition]
+    assert [index.name for index in unread] == ["notif_recipient_unread_idx"]
+
+
+@pytest.mark.django_db
+def test_report_query_indexes_lists_every_viewset():
+    stdout = StringIO()
+
+    call_command("report_query_indexes", "--all", "--fail-on-missing", stdout=stdout)
+
+    output = stdout.getvalue()
+    assert "NotificationViewSet          list      covered  WHERE recipient" in output
+    assert "ListingViewSet               list      covered  WHERE business" in output
+    assert "query shapes inspected" in output
+    assert (
+        "AppointmentViewSet           filter    covered  "
+        "WHERE customer RANGE created_at ORDER BY -created_at"
+    ) in output
+    lines = output.splitlines()
+    assert len(lines) == len(set(lines))
@@ -0,0 +1,209 @@
+"""Tests for reconciling payments against provider settlement reports."""
+
+from __future__ import annotations
+
+import json
+import tracemalloc
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from payments.models import PaymentTransaction
+from payments.reconciliation import (
+    AMOUNT_DRIFT,
+    MISSING_IN_LEDGER,
+    MISSING_IN_REPORT,
+    STATUS_DRIFT,
+    Entry,
+    ReportError,
+    ledger_entries,
+    read_report,
+    reconcile,
+)
+from payments.tasks import reconcile_payments
+
+
+def _entry(reference, amount="10.00", status="completed", currency="USD"):
+    return Entry(reference, Decimal(amount), currency, status)
+
+
+def test_merge_join_reports_each_kind_of_mismatch():
+    ledger = [
+        (1, _entry("a")),
+        (2, _entry("b")),
+        (3, _entry("c", amount="5.00")),
+        (4, _entry("d")),
+        (5, _entry("d")),
+    ]
+    report = [
+        _entry("a", amount="10.0"),
+        _entry("b", status="failed"),
+        _entry("bb"),
+        _entry("c", amount="5.50", status="failed"),
+        _entry("d"),
+    ]
+
+    found = [
+        (mismatch.kind, mismatch.reference, mismatch.payment)
+        for mismatch in reconcile(report, ledger)
+    ]
+
+    assert found == [
+        (STATUS_DRIFT, "b", 2),
+        (MISSING_IN_LEDGER, "bb", None),
+        (AMOUNT_DRIFT, "c", 3),
+        (STATUS_DRIFT, "c", 3),
+        (MISSING_IN_REPORT, "d", 5),
+    ]
+
+
+def test_merge_join_holds_constant_memory():
+    def stream(count):
+        for number in range(count):
+            yield _entry(f"ref-{number:08d}")
+
+    def measure(count):
+        tracemalloc.start()
+        mismatches = sum(
+            1
+            for _ in reconcile(
+                stream(count),
+                ((number, entry) for number, entry in enumerate(stream(count))),
+            )
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return mismatches, peak
+
+    small = measure(1_000)
+    large = measure(20_000)
+
+    assert small[0] == large[0] == 0
+    assert large[1] < small[1] * 2 + 16_384
+
+
+def test_reports_parse_as_csv_or_ndjson_and_must_be_sorted():
+    csv_lines = [
+        "reference,amount,currency,status\n",
+        "a,10.00,USD,completed\n",
+        "b,2.5,EUR,failed\n",
+    ]
+    ndjson_lines = [
+        '{"reference": "a", "amount": "10.00", "currency": "USD", "status": "completed"}\n',
+        "\n",
+        '{"reference": "b", "amount": 2.5, "currency": "EUR", "status": "failed"}\n',
+    ]
+
+    assert list(read_report(csv_lines, "csv")) == list(
+        read_report(ndjson_lines, "ndjson")
+    )
+
+    with pytest.raises(ReportError, match="Line 3"):
+        list(read_report([*csv_lines[:1], csv_lines[2], csv_lines[1]], "csv"))
+    with pytest.raises(ReportError, match="Line 2"):
+        list(read_report(["\n", "{"], "ndjson"))
+    with pytest.raises(ReportError, match="fields"):
+        list(read_report(['{"reference": "a"}\n'], "ndjson"))
+
+
+@pytest.mark.django_db
+def test_ledger_streams_in_byte_order_through_its_index(payment_transaction_factory):
+    for reference in ("b", "a-1", "B", "a1", ""):
+        payment_transaction_factory(external_reference=reference, status="completed")
+
+    references = [entry.reference for _pk, entry in ledger_entries()]
+    rows = PaymentTransaction.objects.by_reference().values_list("pk", flat=True)
+    sql, params = rows.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+
+    assert references == sorted(["b", "a-1", "B", "a1"])
+    assert "payment_reference_idx" in plan
+
+
+@pytest.fixture
+def settled(appointment_factory):
+    appointment = appointment_factory()
+    return PaymentTransaction.objects.bulk_create(
+        PaymentTransaction(
+            appointment=appointment,
+            external_reference=f"mock-{number:04d}",
+            amount=Decimal("10.00") + number,
+            status="completed",
+        )
+        for number in range(200)
+    )
+
+
+def _ledger_rows() -> list[list]:
+    return [
+        list(row)
+        for row in PaymentTransaction.objects.by_reference().values_list(
+            "external_reference", "amount", "currency", "status"
+        )
+    ]
+
+
+def _write_report(path, fmt, rows) -> None:
+    """Write ``rows`` of ``(reference, amount, currency, status)`` as a report."""
+
+    if fmt == "ndjson":
+        keys = ("reference", "amount", "currency", "status")
+        lines = [json.dumps(dict(zip(keys, map(str, row)))) + "\n" for row in rows]
+    else:
+        header = ["reference,amount,currency,status\n"]
+        lines = header + [",".join(map(str, row)) + "\n" for row in rows]
+    path.write_text("".join(lines))
+
+
+@pytest.mark.django_db
+def test_command_reports_drift_in_a_settlement_report(settled, tmp_path, capsys):
+    report = tmp_path / "settlement.csv"
+    output = tmp_path / "mismatches.ndjson"
+    rows = _ledger_rows()
+    del rows[3]
+    rows.insert(5, [f"{rows[4][0]}-x", Decimal("5.00"), "USD", "completed"])
+    rows[10][1] += 1
+    rows[20][3] = "failed"
+    _write_report(report, "csv", rows)
+
+    call_command("reconcile_payments", str(report), output=str(output))
+
+    mismatches = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(mismatch["kind"] for mismatch in mismatches) == sorted(
+        [MISSING_IN_LEDGER, MISSING_IN_REPORT, AMOUNT_DRIFT, STATUS_DRIFT]
+    )
+    drifted = next(item for item in mismatches if item["kind"] == AMOUNT_DRIFT)
+    assert (
+        Decimal(drifted["report"]["amount"]) == Decimal(drifted["ledger"]["amount"]) + 1
+    )
+    assert "4 mismatches." in capsys.readouterr().err
+
+    with pytest.raises(CommandError, match="does not match"):
+        call_command(
+            "reconcile_payments", str(report), output=str(output), fail_on_mismatch=True
+        )
+
+
+@pytest.mark.django_db
+def test_task_reconciles_a_clean_ndjson_report(settled, tmp_path):
+    report = tmp_path / "settlement.ndjson"
+    output = tmp_path / "mismatches.ndjson"
+    _write_report(report, "ndjson", _ledger_rows())
+
+    assert reconcile_payments.delay(str(report), str(output)).get() == {}
+    assert output.read_text() == ""
+
+
+@pytest.mark.django_db
+def test_command_rejects_unsorted_reports(tmp_path):
+    report = tmp_path / "settlement.csv"
+    report.write_text(
+        "reference,amount,currency,status\nb,1,USD,completed\na,1,USD,completed\n"
+    )
+
+    with pytest.raises(CommandError, match="Line 3"):
+        call_command("reconcile_payments", str(report))
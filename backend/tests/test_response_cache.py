@@ -0,0 +1,144 @@
+"""Tests for the read-through response cache on catalog endpoints."""
+
+from __future__ import annotations
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from api.cache import cache_stats
+from api.viewsets import ServiceViewSet
+from business.models import BusinessProfile
+from services.models import Service
+
+
+@pytest.fixture
+def staff_client(api_client, user_factory):
+    api_client.force_authenticate(
+        user_factory(email="cache-staff@example.com", is_staff=True)
+    )
+    return api_client
+
+
+@pytest.mark.django_db
+def test_repeated_reads_are_served_from_cache(
+    staff_client, service_factory, query_counter
+):
+    service = service_factory(name="Massage")
+    url = reverse("api:services-list")
+
+    first = staff_client.get(url, {"page_size": 5})
+    with query_counter() as stats:
+        second = staff_client.get(url, {"page_size": 5})
+
+    assert first["X-Cache"] == "MISS"
+    assert second["X-Cache"] == "HIT"
+    assert second.content == first.content
+    assert second["Content-Type"] == first["Content-Type"]
+    assert stats.count == 0
+
+    detail = reverse("api:services-detail", args=[service.pk])
+    assert staff_client.get(detail)["X-Cache"] == "MISS"
+    assert staff_client.get(detail)["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+def test_query_params_are_normalized_into_the_key(staff_client, service_factory):
+    service_factory()
+    url = reverse("api:services-list")
+
+    staff_client.get(url + "?page_size=5&ordering=id")
+
+    assert staff_client.get(url + "?ordering=id&page_size=5")["X-Cache"] == "HIT"
+    assert staff_client.get(url + "?ordering=-id&page_size=5")["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_writes_invalidate_cached_responses(
+    staff_client, service_factory, django_capture_on_commit_callbacks
+):
+    service = service_factory(name="Massage")
+    url = reverse("api:services-list")
+    staff_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        service.name = "Deep massage"
+        service.save()
+    response = staff_client.get(url)
+
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["results"][0]["name"] == "Deep massage"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Service.objects.filter(pk=service.pk).delete()
+    assert staff_client.get(url).json()["results"] == []
+
+
+@pytest.mark.django_db
+def test_reads_before_commit_do_not_outlive_the_write(
+    staff_client, service_factory, django_capture_on_commit_callbacks
+):
+    service = service_factory(name="Massage")
+    url = reverse("api:services-list")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        service.name = "Deep massage"
+        service.save()
+        # A reader between the write and its commit still sees the old rows
+        # on other connections; what it caches must not survive the commit.
+        assert staff_client.get(url)["X-Cache"] == "MISS"
+
+    assert staff_client.get(url)["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_related_writes_invalidate_dependent_views(
+    staff_client, service_factory, django_capture_on_commit_callbacks
+):
+    service_factory()
+    url = reverse("api:services-list")
+    staff_client.get(url, {"search": "lotus"})
+
+    business = BusinessProfile.objects.get()
+    with django_capture_on_commit_callbacks(execute=True):
+        business.name = "Lotus Spa"
+        business.save()
+
+    assert BusinessProfile in ServiceViewSet.get_cache_dependencies()
+    assert len(staff_client.get(url, {"search": "lotus"}).json()["results"]) == 1
+
+
+@pytest.mark.django_db
+def test_cached_responses_are_scoped_per_user(
+    api_client, business_profile_factory, service_factory, user_factory
+):
+    owner = user_factory(email="cache-owner@example.com")
+    other = user_factory(email="cache-other@example.com")
+    service_factory(business=business_profile_factory(owner=owner))
+    url = reverse("api:services-list")
+
+    api_client.force_authenticate(owner)
+    assert len(api_client.get(url).json()["results"]) == 1
+    api_client.force_authenticate(other)
+
+    response = api_client.get(url)
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["results"] == []
+
+
+@pytest.mark.django_db
+def test_response_cache_stats_reports_hits_and_misses(staff_client):
+    url = reverse("api:listings-list")
+    staff_client.get(url)
+    staff_client.get(url)
+    staff_client.get(url)
+
+    assert cache_stats(["ListingViewSet"]) == {
+        "ListingViewSet": {"hits": 2, "misses": 1}
+    }
+    stdout = StringIO()
+    call_command("response_cache_stats", stdout=stdout)
+    assert "ListingViewSet" in stdout.getvalue()
+    assert "hit-rate=66.7%" in stdout.getvalue()
@@ -0,0 +1,264 @@
+"""Tests for the per-business daily booking and revenue rollups."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from appointments.models import AppointmentStatus
+from business.models import DailyBookings, DailyRevenue
+from business.rollups import rebuild_rollups
+from business.tasks import rebuild_rollups as rebuild_rollups_task
+from payments.adapters import PaymentStatus
+
+TEHRAN = ZoneInfo("Asia/Tehran")
+MONDAY = date(2031, 3, 3)
+
+
+def _at(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, time(hour, minute), tzinfo=TEHRAN)
+
+
+def _bookings(business) -> dict[date, int]:
+    return dict(
+        DailyBookings.objects.filter(business=business).values_list("day", "bookings")
+    )
+
+
+def _revenue(business) -> dict[tuple[date, str], tuple[int, Decimal]]:
+    return {
+        (day, currency): (payments, revenue)
+        for day, currency, payments, revenue in DailyRevenue.objects.filter(
+            business=business
+        ).values_list("day", "currency", "payments", "revenue")
+    }
+
+
+@pytest.fixture
+def shop(business_profile_factory, service_factory):
+    business = business_profile_factory(timezone="Asia/Tehran")
+    return business, service_factory(business=business, duration_minutes=30)
+
+
+@pytest.mark.django_db
+def test_appointment_changes_move_bookings_between_local_days(
+    shop, appointment_factory, django_capture_on_commit_callbacks
+):
+    business, service = shop
+    with django_capture_on_commit_callbacks(execute=True):
+        # 00:30 in Tehran is the previous day in UTC.
+        early = appointment_factory(service=service, scheduled_for=_at(MONDAY, 0, 30))
+        late = appointment_factory(service=service, scheduled_for=_at(MONDAY, 23))
+    assert _bookings(business) == {MONDAY: 2}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        late.scheduled_for = _at(MONDAY + timedelta(days=1), 9)
+        late.save()
+        early.transition_to(AppointmentStatus.CANCELLED)
+    assert _bookings(business) == {MONDAY + timedelta(days=1): 1}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        late.delete()
+    assert _bookings(business) == {}
+
+
+@pytest.mark.django_db
+def test_time_zone_changes_rebucket_every_day(
+    business_profile_factory,
+    service_factory,
+    appointment_factory,
+    django_capture_on_commit_callbacks,
+):
+    business = business_profile_factory(timezone="UTC")
+    service = service_factory(business=business, duration_minutes=30)
+    with django_capture_on_commit_callbacks(execute=True):
+        # 01:30 on the next day in Tehran.
+        appointment_factory(
+            service=service,
+            scheduled_for=datetime(2031, 3, 3, 22, tzinfo=ZoneInfo("UTC")),
+        )
+    assert _bookings(business) == {MONDAY: 1}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        business.timezone = "Asia/Tehran"
+        business.save()
+    assert _bookings(business) == {MONDAY + timedelta(days=1): 1}
+
+    business.refresh_from_db()
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        business.name = "Renamed"
+        business.save()
+    assert not [
+        callback
+        for callback in callbacks
+        if getattr(callback, "func", None) is rebuild_rollups
+    ]
+
+
+@pytest.mark.django_db
+def test_completed_payments_add_exact_revenue_per_currency(
+    shop,
+    appointment_factory,
+    payment_transaction_factory,
+    django_capture_on_commit_callbacks,
+):
+    business, service = shop
+    amounts = [Decimal("0.10"), Decimal("0.20"), Decimal("99999999.99")]
+    with django_capture_on_commit_callbacks(execute=True):
+        appointment = appointment_factory(
+            service=service, scheduled_for=_at(MONDAY, 10)
+        )
+        payments = [
+            payment_transaction_factory(appointment=appointment, amount=amount)
+            for amount in amounts
+        ]
+        payment_transaction_factory(
+            appointment=appointment, amount=Decimal("5.00"), currency="EUR"
+        )
+    assert _revenue(business) == {}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for payment in payments:
+            payment.transition_to(PaymentStatus.COMPLETED)
+
+    assert _revenue(business) == {
+        (MONDAY, "USD"): (3, Decimal("100000000.29")),
+    }
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_rollups_and_repairs_drift(
+    shop,
+    appointment_factory,
+    payment_transaction_factory,
+    django_capture_on_commit_callbacks,
+):
+    business, service = shop
+    with django_capture_on_commit_callbacks(execute=True):
+        for offset, hour in ((0, 9), (0, 11), (1, 9), (2, 0)):
+            appointment = appointment_factory(
+                service=service,
+                scheduled_for=_at(MONDAY + timedelta(days=offset), hour),
+            )
+            payment_transaction_factory(
+                appointment=appointment,
+                amount=Decimal("12.35"),
+                status=PaymentStatus.COMPLETED,
+            )
+    bookings, revenue = _bookings(business), _revenue(business)
+    assert revenue[(MONDAY, "USD")] == (2, Decimal("24.70"))
+
+    DailyBookings.objects.all().delete()
+    DailyRevenue.objects.filter(day=MONDAY).update(revenue=0)
+    assert rebuild_rollups(chunk_size=1) >= 1
+
+    assert _bookings(business) == bookings
+    assert _revenue(business) == revenue
+
+    DailyBookings.objects.all().delete()
+    call_command("rebuild_rollups", business=[business.pk], stdout=StringIO())
+    assert _bookings(business) == bookings
+    DailyBookings.objects.all().delete()
+    assert rebuild_rollups_task.delay([business.pk]).get() == 1
+    assert _bookings(business) == bookings
+
+
+@pytest.mark.django_db
+def test_bulk_writes_refresh_rollups(
+    api_client,
+    shop,
+    appointment_factory,
+    payment_transaction_factory,
+    user_factory,
+    django_capture_on_commit_callbacks,
+):
+    business, service = shop
+    appointment = appointment_factory(service=service, scheduled_for=_at(MONDAY, 10))
+    payment_transaction_factory(appointment=appointment, amount=Decimal("7.50"))
+    api_client.force_authenticate(user_factory(is_staff=True))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(reverse("api:payments-bulk-capture"))
+    assert response.status_code == 202
+
+    assert _revenue(business) == {(MONDAY, "USD"): (1, Decimal("7.50"))}
+
+
+@pytest.mark.django_db
+def test_captures_refresh_rollups(
+    api_client,
+    shop,
+    appointment_factory,
+    payment_transaction_factory,
+    user_factory,
+    django_capture_on_commit_callbacks,
+):
+    business, service = shop
+    appointment = appointment_factory(service=service, scheduled_for=_at(MONDAY, 10))
+    payment = payment_transaction_factory(
+        appointment=appointment, amount=Decimal("7.50")
+    )
+    api_client.force_authenticate(user_factory(is_staff=True))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(reverse("api:payments-capture", args=[payment.pk]))
+    assert response.status_code == 200
+
+    assert _revenue(business) == {(MONDAY, "USD"): (1, Decimal("7.50"))}
+
+
+@pytest.mark.django_db
+def test_rollups_endpoint_reads_days_for_owners(
+    api_client,
+    user,
+    shop,
+    appointment_factory,
+    payment_transaction_factory,
+    django_capture_on_commit_callbacks,
+    query_counter,
+):
+    business, service = shop
+    with django_capture_on_commit_callbacks(execute=True):
+        appointment = appointment_factory(
+            service=service, scheduled_for=_at(MONDAY, 10)
+        )
+        appointment_factory(service=service, scheduled_for=_at(MONDAY, 12))
+        for currency in ("USD", "EUR"):
+            payment_transaction_factory(
+                appointment=appointment,
+                amount=Decimal("20.05"),
+                currency=currency,
+                status=PaymentStatus.COMPLETED,
+            )
+    url = reverse("api:businesses-rollups", args=[business.pk])
+    params = {"date_from": MONDAY, "date_to": MONDAY + timedelta(days=2)}
+
+    api_client.force_authenticate(user)
+    assert api_client.get(url, params).status_code == 403
+
+    api_client.force_authenticate(business.owner)
+    with query_counter() as stats:
+        response = api_client.get(url, params)
+
+    assert response.status_code == 200, response.content
+    body = response.json()
+    assert body["totals"] == {
+        "bookings": 2,
+        "revenue": [
+            {"currency": "EUR", "payments": 1, "revenue": "20.05"},
+            {"currency": "USD", "payments": 1, "revenue": "20.05"},
+        ],
+    }
+    assert [day["bookings"] for day in body["days"]] == [2, 0, 0]
+    assert body["days"][1] == {
+        "date": (MONDAY + timedelta(days=1)).isoformat(),
+        "bookings": 0,
+        "revenue": [],
+    }
+    assert stats.count <= 4
@@ -0,0 +1,127 @@
+"""Tests for the full-text search backend used by list endpoints."""
+
+from __future__ import annotations
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.search import get_search_backend, reindex
+from services.models import Service
+
+from backend.tests.utils import extract_results
+
+
+def _search(api_client, route: str, terms: str) -> list[int]:
+    response = api_client.get(reverse(route), {"search": terms})
+    assert response.status_code == 200
+    return [item["id"] for item in extract_results(response.json())]
+
+
+@pytest.mark.django_db
+def test_search_matches_prefixes_and_ranks_by_relevance(
+    api_client, service_factory, user_factory
+):
+    staff = user_factory(email="search-staff@example.com", is_staff=True)
+    strong = service_factory(name="Massage", description="Deep massage, hot stones")
+    weak = service_factory(name="Facial", description="Includes a short massage")
+    service_factory(name="Yoga", description="Morning class")
+    api_client.force_authenticate(staff)
+
+    # The weaker match is newer, so relevance must beat the default ordering.
+    assert _search(api_client, "api:services-list", "mass") == [strong.id, weak.id]
+    assert _search(api_client, "api:services-list", "massage short") == [weak.id]
+
+
+@pytest.mark.django_db
+def test_common_terms_rank_in_sql(api_client, business_profile_factory, user_factory):
+    staff = user_factory(email="search-staff@example.com", is_staff=True)
+    business = business_profile_factory()
+    services = Service.objects.bulk_create(
+        Service(business=business, name=f"Massage {number}") for number in range(1_000)
+    )
+    best = Service.objects.create(
+        business=business, name="Massage", description="Massage massage massage"
+    )
+    reindex(Service, [service.pk for service in services])
+    api_client.force_authenticate(staff)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse("api:services-list"), {"search": "massage"})
+
+    assert response.status_code == 200
+    assert extract_results(response.json())[0]["id"] == best.id
+    # The matches are filtered and ranked in the statement, never bound as ids.
+    searches = [query["sql"] for query in queries if "MATCH" in query["sql"]]
+    assert searches
+    assert all(len(sql) < 2_000 for sql in searches)
+
+
+@pytest.mark.django_db
+def test_notification_search_is_scoped_to_recipient(
+    api_client, notification_factory, user_factory
+):
+    recipient = user_factory(email="search@example.com")
+    own = notification_factory(recipient=recipient, body="Your invoice is ready")
+    notification_factory(body="Another invoice")
+    api_client.force_authenticate(recipient)
+
+    assert _search(api_client, "api:notifications-list", "invoice") == [own.id]
+
+
+@pytest.mark.django_db
+def test_search_matches_related_email(api_client, appointment_factory, user_factory):
+    staff = user_factory(email="search-staff@example.com", is_staff=True)
+    customer = user_factory(email="jane.doe@example.com")
+    match = appointment_factory(customer=customer)
+    appointment_factory()
+    api_client.force_authenticate(staff)
+
+    assert _search(api_client, "api:appointments-list", "jane.doe") == [match.id]
+
+
+@pytest.mark.django_db
+def test_related_rename_reindexes_dependents(
+    api_client, service_factory, business_profile_factory, user_factory
+):
+    staff = user_factory(email="search-staff@example.com", is_staff=True)
+    business = business_profile_factory(name="Old Name")
+    service = service_factory(business=business, name="Massage")
+    api_client.force_authenticate(staff)
+
+    business.name = "Lotus Spa"
+    business.save()
+
+    assert _search(api_client, "api:services-list", "lotus") == [service.id]
+    assert _search(api_client, "api:services-list", "old") == []
+
+
+@pytest.mark.django_db
+def test_deleted_rows_leave_the_index(api_client, service_factory, user_factory):
+    staff = user_factory(email="search-staff@example.com", is_staff=True)
+    service = service_factory(name="Acupuncture")
+    api_client.force_authenticate(staff)
+
+    Service.objects.filter(pk=service.pk).delete()
+    service_factory(name="Acupuncture")
+
+    assert service.id not in _search(api_client, "api:services-list", "acupuncture")
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index_backfills_documents(
+    api_client, service_factory, user_factory
+):
+    staff = user_factory(email="search-staff@example.com", is_staff=True)
+    service = service_factory(name="Reflexology")
+    get_search_backend().remove(Service, service.pk)
+    api_client.force_authenticate(staff)
+    assert _search(api_client, "api:services-list", "reflexology") == []
+
+    call_command("rebuild_search_index", stdout=StringIO())
+
+    assert _search(api_client, "api:services-list", "reflexology") == [service.id]
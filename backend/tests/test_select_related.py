@@ -0,0 +1,84 @@
+"""Tests for request-driven joins and column trimming on auto viewsets."""
+
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import serializers
+
+from api.serializers import build_model_serializer, serializer_relation_paths
+from api.viewsets import ListingViewSet
+from marketplace.models import Listing
+from services.models import Service
+
+
+def _list_queries(api_client, route: str) -> list[str]:
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse(route))
+    assert response.status_code == 200
+    return [query["sql"] for query in queries]
+
+
+@pytest.mark.django_db
+def test_primary_key_relations_are_not_joined(
+    api_client, listing_factory, user_factory
+):
+    staff = user_factory(email="joins-staff@example.com", is_staff=True)
+    listing_factory()
+    api_client.force_authenticate(staff)
+
+    selects = [
+        sql
+        for sql in _list_queries(api_client, "api:listings-list")
+        if 'FROM "marketplace_listing"' in sql
+    ]
+
+    assert selects
+    assert not any("JOIN" in sql for sql in selects)
+
+
+@pytest.mark.django_db
+def test_list_defers_unrendered_columns(api_client, user_factory):
+    staff = user_factory(email="joins-staff@example.com", is_staff=True)
+    api_client.force_authenticate(staff)
+
+    selects = [
+        sql
+        for sql in _list_queries(api_client, "api:users-list")
+        if 'FROM "users_user"' in sql and "LIMIT" in sql
+    ]
+
+    assert selects
+    assert not any('"password"' in sql for sql in selects)
+
+
+def test_dereferenced_relations_are_joined():
+    base = build_model_serializer(Service, fields=("id", "business", "name"))
+
+    class Nested(base):
+        business = serializers.StringRelatedField()
+
+    class Dotted(base):
+        owner_email = serializers.EmailField(source="business.owner.email")
+
+        class Meta(base.Meta):
+            fields = (*base.Meta.fields, "owner_email")
+
+    assert serializer_relation_paths(base) == ()
+    assert serializer_relation_paths(Nested) == ("business",)
+    assert serializer_relation_paths(Dotted) == ("business__owner",)
+
+
+def test_declared_select_related_follows_serializer(monkeypatch):
+    base = build_model_serializer(Listing, fields=("id", "service", "business"))
+
+    class Nested(base):
+        service = serializers.StringRelatedField()
+
+    view = ListingViewSet()
+    assert view.get_select_related() == ()
+
+    monkeypatch.setattr(ListingViewSet, "serializer_class", Nested)
+    assert view.get_select_related() == ("service",)
@@ -0,0 +1,60 @@
+"""Tests for the auto-built serializer fast path."""
+
+from __future__ import annotations
+
+import pytest
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from api.routers import router
+from api.serializers import FastModelSerializer, build_model_serializer
+from business.models import OpeningHours
+from services.models import Service
+
+
+@pytest.mark.django_db
+def test_fast_path_matches_model_serializer_for_every_viewset(
+    listing_factory, payment_transaction_factory, notification_factory
+):
+    listing = listing_factory()
+    payment_transaction_factory()
+    notification_factory()
+    OpeningHours.objects.create(
+        business=listing.business, weekday=0, opens_at="09:00", closes_at="17:00"
+    )
+
+    renderer = JSONRenderer()
+    for _prefix, viewset, _basename in router.registry:
+        serializer_class = viewset.serializer_class
+        assert issubclass(serializer_class, FastModelSerializer), viewset.__name__
+        assert serializer_class.get_field_plan() is not None, viewset.__name__
+
+        reference_class = type(
+            "Reference", (serializers.ModelSerializer,), {"Meta": serializer_class.Meta}
+        )
+        instances = list(viewset.model._default_manager.all())
+        assert instances, viewset.__name__
+
+        fast = serializer_class(instances, many=True).data
+        reference = reference_class(instances, many=True).data
+        assert renderer.render(fast) == renderer.render(reference), viewset.__name__
+
+
+def test_build_model_serializer_caches_classes_per_configuration():
+    first = build_model_serializer(Service, fields=("id", "name"), fast=True)
+
+    assert build_model_serializer(Service, fields=("id", "name"), fast=True) is first
+    assert build_model_serializer(Service, fields=("id",), fast=True) is not first
+    assert build_model_serializer(Service, fields=("id", "name")) is not first
+
+
+def test_unplannable_fields_fall_back_to_model_serializer():
+    serializer_class = build_model_serializer(
+        Service, fields=("id", "business"), fast=True
+    )
+
+    class Nested(serializer_class):
+        business = serializers.StringRelatedField()
+
+    assert serializer_class.get_field_plan() is not None
+    assert Nested.get_field_plan() is None
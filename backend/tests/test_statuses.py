@@ -0,0 +1,181 @@
+"""Tests for status storage, transitions and the hot-status indexes."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from appointments.models import Appointment, AppointmentStatus, SlotUnavailable
+from common.models import TransitionError
+from payments.adapters import MockPaymentGateway, PaymentStatus
+from payments.models import PaymentTransaction
+
+from backend.tests.utils import extract_results
+
+
+def _plan(queryset) -> str:
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return " ".join(str(row[-1]) for row in cursor.fetchall())
+
+
+@pytest.mark.django_db
+def test_statuses_are_stored_as_small_codes(appointment_factory):
+    appointment = appointment_factory(status="cancelled")
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT status FROM appointments_appointment WHERE id = %s",
+            [appointment.pk],
+        )
+        assert cursor.fetchone() == (2,)
+
+    loaded = Appointment.objects.get(status="cancelled")
+    assert loaded.status is AppointmentStatus.CANCELLED
+    assert loaded.status == "cancelled"
+    assert list(Appointment.objects.values_list("status", flat=True)) == [
+        AppointmentStatus.CANCELLED
+    ]
+
+
+@pytest.mark.django_db
+def test_transitions_follow_the_table(appointment_factory):
+    appointment = appointment_factory()
+
+    appointment.transition_to(AppointmentStatus.COMPLETED)
+    appointment.refresh_from_db()
+    assert appointment.status is AppointmentStatus.COMPLETED
+
+    with pytest.raises(TransitionError):
+        appointment.transition_to(AppointmentStatus.SCHEDULED)
+    assert not appointment.can_transition(AppointmentStatus.CANCELLED)
+
+
+@pytest.mark.django_db
+def test_transitions_check_the_stored_status(appointment_factory):
+    appointment = appointment_factory()
+    stale = Appointment.objects.get(pk=appointment.pk)
+
+    appointment.transition_to(AppointmentStatus.CANCELLED)
+
+    with pytest.raises(TransitionError):
+        stale.transition_to(AppointmentStatus.COMPLETED)
+
+
+@pytest.mark.django_db
+def test_rebooking_a_cancelled_appointment_reclaims_its_slot(
+    appointment_factory, service_factory
+):
+    service = service_factory(duration_minutes=60)
+    start = timezone.now() + timedelta(days=3)
+    cancelled = appointment_factory(
+        service=service, scheduled_for=start, status="cancelled"
+    )
+    appointment_factory(service=service, scheduled_for=start)
+
+    with pytest.raises(SlotUnavailable):
+        cancelled.transition_to(AppointmentStatus.SCHEDULED)
+    cancelled.refresh_from_db()
+    assert cancelled.status is AppointmentStatus.CANCELLED
+
+
+@pytest.mark.django_db
+def test_appointment_status_changes_go_through_transition_action(
+    api_client, appointment_factory, user_factory
+):
+    customer = user_factory(email="transition@example.com")
+    appointment = appointment_factory(customer=customer)
+    api_client.force_authenticate(customer)
+    detail = reverse("api:appointments-detail", args=[appointment.pk])
+    transition = reverse("api:appointments-transition", args=[appointment.pk])
+
+    api_client.patch(detail, {"status": "completed"}, format="json")
+    appointment.refresh_from_db()
+    assert appointment.status is AppointmentStatus.SCHEDULED
+
+    cancelled = api_client.post(transition, {"status": "cancelled"}, format="json")
+    assert cancelled.status_code == 200, cancelled.content
+    assert cancelled.json()["status"] == "cancelled"
+
+    refused = api_client.post(transition, {"status": "completed"}, format="json")
+    assert refused.status_code == 409
+    assert refused.json() == {
+        "detail": "Cannot change status from cancelled to completed."
+    }
+
+    unknown = api_client.post(transition, {"status": "lost"}, format="json")
+    assert unknown.status_code == 400
+
+
+@pytest.mark.django_db
+def test_status_filters_accept_names_and_reject_unknown_values(
+    api_client, appointment_factory, user_factory
+):
+    appointment_factory(status="completed")
+    scheduled = appointment_factory()
+    api_client.force_authenticate(user_factory(is_staff=True))
+    url = reverse("api:appointments-list")
+
+    response = api_client.get(url, {"status": "scheduled"})
+
+    assert [item["id"] for item in extract_results(response.json())] == [scheduled.pk]
+    assert api_client.get(url, {"status": "lost"}).status_code == 400
+
+
+class CountingGateway(MockPaymentGateway):
+    charges: list[dict] = []
+
+    def charge(self, **kwargs):
+        self.charges.append(kwargs)
+        return super().charge(**kwargs)
+
+
+@pytest.mark.django_db
+def test_captured_payments_cannot_be_charged_again(
+    api_client, payment_transaction_factory, user, settings
+):
+    charges = CountingGateway.charges = []
+    settings.PAYMENT_GATEWAY = {"BACKEND": f"{__name__}.CountingGateway"}
+    payment = payment_transaction_factory()
+    api_client.force_authenticate(user)
+    url = reverse("api:payments-capture", args=[payment.pk])
+
+    assert api_client.post(url).status_code == 200
+    again = api_client.post(url)
+
+    assert again.status_code == 409
+    assert len(charges) == 1
+    payment.refresh_from_db()
+    assert payment.status is PaymentStatus.COMPLETED
+
+
+@pytest.mark.django_db
+def test_hot_status_queues_use_partial_indexes(
+    appointment_factory, payment_transaction_factory
+):
+    appointment = appointment_factory()
+    pending = payment_transaction_factory(appointment=appointment)
+    # Hot statuses are a small share of the table, which the planner learns
+    # from ANALYZE.
+    PaymentTransaction.objects.bulk_create(
+        PaymentTransaction(
+            appointment=appointment,
+            amount=pending.amount,
+            status=PaymentStatus.COMPLETED,
+        )
+        for _ in range(200)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    upcoming = Appointment.objects.upcoming().values_list("pk", flat=True)
+    queue = PaymentTransaction.objects.pending().values_list("pk", flat=True)
+
+    assert "appt_upcoming_idx" in _plan(upcoming)
+    assert "payment_pending_idx" in _plan(queue)
+    assert list(queue) == [pending.pk]
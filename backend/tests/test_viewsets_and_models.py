@@ -9,7 +9,7 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 
-from api.viewsets import NotificationViewSet, PaymentTransactionViewSet
+from api.viewsets import NotificationViewSet
 from business.models import BusinessProfile
 from notifications.adapters import NotificationResult
 from payments.adapters import MockPaymentGateway, PaymentResult, PaymentStatus
@@ -205,26 +205,27 @@ def test_notification_send_test_action_invokes_adapter(
     ]
 
 
-@pytest.mark.django_db
-def test_payment_capture_updates_transaction(
-    api_client, payment_transaction_factory, user_factory, monkeypatch
-):
-    class DummyGateway(MockPaymentGateway):
-        calls: list[dict[str, object]] = []
+class DummyGateway(MockPaymentGateway):
+    calls: list[dict[str, object]] = []
 
-        def __init__(self):
-            self.__class__.calls.clear()
+    def __init__(self):
+        self.__class__.calls.clear()
+
+    def charge(self, *, amount: float, currency: str, metadata=None) -> PaymentResult:
+        payload = {"amount": amount, "currency": currency, "metadata": metadata}
+        self.__class__.calls.append(payload)
+        return PaymentResult(
+            reference="gateway-ref",
+            status=PaymentStatus.COMPLETED,
+            details={"amount": amount, "currency": currency},
+        )
 
-        def charge(self, *, amount: float, currency: str, metadata=None) -> PaymentResult:
-            payload = {"amount": amount, "currency": currency, "metadata": metadata}
-            self.__class__.calls.append(payload)
-            return PaymentResult(
-                reference="gateway-ref",
-                status=PaymentStatus.COMPLETED,
-                details={"amount": amount, "currency": currency},
-            )
 
-    monkeypatch.setattr(PaymentTransactionViewSet, "gateway_class", DummyGateway)
+@pytest.mark.django_db
+def test_payment_capture_updates_transaction(
+    api_client, payment_transaction_factory, user_factory, settings
+):
+    settings.PAYMENT_GATEWAY = {"BACKEND": f"{__name__}.DummyGateway"}
 
     payment = payment_transaction_factory()
     user = user_factory(email="payments@example.com")
@@ -250,7 +251,7 @@ def test_payment_capture_updates_transaction(
 
 
 @pytest.mark.django_db
-def test_payment_mark_completed_and_gateway_charge(payment_transaction_factory):
+def test_payment_transition_and_gateway_charge(payment_transaction_factory):
     payment = payment_transaction_factory()
     gateway = MockPaymentGateway()
 
@@ -264,7 +265,7 @@ def test_payment_mark_completed_and_gateway_charge(payment_transaction_factory):
     assert result.reference == "ext-123"
     assert result.details == {"amount": float(payment.amount), "currency": payment.currency}
 
-    payment.mark_completed(result.reference)
+    payment.transition_to(result.status, external_reference=result.reference)
     payment.refresh_from_db()
 
     assert payment.status == "completed"